@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: cards.markdown_renderer vs building a Markdown instance
+and compiling the symbol regex on every call (the old card_filters code).
+
+Renders a synthetic card page (20 components + complete analysis) and a
+stream of mana costs / oracle text, checks both paths produce identical
+HTML, and prints per-call timings.
+
+    python benchmark_markdown_renderer.py [--pages 50]
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+import markdown
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from cards.markdown_renderer import mana_cost_html, oracle_text_html, render_many, render_markdown  # noqa: E402
+
+
+def old_markdown_to_html(value):
+    md = markdown.Markdown(extensions=['extra', 'codehilite'])
+    html_content = md.convert(value)
+
+    def replace_card_link(match):
+        card_name = match.group(1).strip()
+        return f'<a href="/browse/?q={card_name}" class="card-link" title="Search for {card_name}"><strong>{card_name}</strong></a>'
+
+    return re.sub(r'\[\[([^\]]+)\]\]', replace_card_link, html_content)
+
+
+def old_symbols(text, css_class, title):
+    symbol_map = {'W': 'w', 'U': 'u', 'B': 'b', 'R': 'r', 'G': 'g', 'C': 'c',
+                  'X': 'x', 'S': 's', 'T': 't', 'Q': 'q', 'E': 'e'}
+
+    def replace_symbol(match):
+        symbol = match.group(1).upper()
+        if '/' in symbol:
+            parts = symbol.split('/')
+            if len(parts) == 2:
+                name = ''.join(part.lower() for part in parts)
+                return f'<img src="https://svgs.scryfall.io/card-symbols/{name}.svg" alt="{{{symbol}}}" class="{css_class}" title="{title}{{{symbol}}}">'
+        if symbol.isdigit():
+            num = int(symbol)
+            if 0 <= num <= 20:
+                return f'<img src="https://svgs.scryfall.io/card-symbols/{num}.svg" alt="{{{symbol}}}" class="{css_class}" title="{title}{{{symbol}}}">'
+        name = symbol_map.get(symbol, symbol.lower())
+        return f'<img src="https://svgs.scryfall.io/card-symbols/{name}.svg" alt="{{{symbol}}}" class="{css_class}" title="{title}{{{symbol}}}">'
+
+    return re.sub(re.compile(r'\{([^}]+)\}'), replace_symbol, text)
+
+
+def sample_component(rng, index):
+    paragraphs = [
+        f"## Section {index}",
+        "**{name}** slots into most [[Sol Ring]] shells. " * rng.randint(3, 8),
+        "\n".join(f"- Point {n}: pairs with [[Rhystic Study]] and *card draw*" for n in range(rng.randint(3, 7))),
+        "| Format | Rating |\n|---|---|\n| Commander | 8/10 |\n| Modern | 5/10 |",
+        "Closing thoughts. " * rng.randint(10, 30),
+    ]
+    return "\n\n".join(paragraphs)
+
+
+def timed(label, fn, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    elapsed = (time.perf_counter() - started) / repeat
+    print(f"  {label:<32} {elapsed * 1000:8.3f} ms")
+    return elapsed, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the markdown renderer')
+    parser.add_argument('--pages', type=int, default=50, help='card pages rendered per measurement')
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    page = {f'component_{i}': sample_component(rng, i) for i in range(20)}
+    page['complete_analysis'] = "\n\n".join(sample_component(rng, i) for i in range(3))
+
+    costs = [''.join(f'{{{s}}}' for s in rng.sample(['1', '2', '3', 'W', 'U', 'B', 'R', 'G', 'W/U', 'X', 'C'], rng.randint(1, 4)))
+             for _ in range(300)]
+    stream = [rng.choice(costs) for _ in range(20000)]
+    oracle = [f"{{T}}: Add {{{c}}}. {{2}}{{{c}}}, Sacrifice this: draw a card." for c in 'WUBRG'] * 2000
+
+    # Same output from both paths
+    assert all(str(render_markdown(text)) == old_markdown_to_html(text) for text in page.values())
+    assert {k: str(v) for k, v in render_many(page).items()} == {k: old_markdown_to_html(v) for k, v in page.items()}
+    assert all(str(mana_cost_html(c)) == old_symbols(c, 'mana-symbol', 'Mana cost: ') for c in costs)
+    assert all(str(oracle_text_html(t)) == old_symbols(t, 'mana-symbol-text', '') for t in oracle[:5])
+    print("Output identical to the previous implementation\n")
+
+    print(f"Card page (21 markdown documents), per page, {args.pages} pages:")
+    old, _ = timed('new Markdown() per document', lambda: [old_markdown_to_html(t) for t in page.values()], args.pages)
+    batch, _ = timed('render_many() batch', lambda: render_many(page), args.pages)
+    print(f"  speedup: {old / batch:.2f}x (conversion dominates; instance setup is a small share)\n")
+
+    print(f"Mana costs ({len(stream):,} renders, {len(set(stream))} distinct), total:")
+    old, _ = timed('regex compiled per call', lambda: [old_symbols(c, 'mana-symbol', 'Mana cost: ') for c in stream], 1)
+    mana_cost_html.cache_clear()
+    new, _ = timed('memoized mana_cost_html()', lambda: [mana_cost_html(c) for c in stream], 1)
+    print(f"  speedup: {old / new:.1f}x\n")
+
+    print(f"Oracle text ({len(oracle):,} renders), total:")
+    old, _ = timed('regex compiled per call', lambda: [old_symbols(t, 'mana-symbol-text', '') for t in oracle], 1)
+    oracle_text_html.cache_clear()
+    new, _ = timed('memoized oracle_text_html()', lambda: [oracle_text_html(t) for t in oracle], 1)
+    print(f"  speedup: {old / new:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
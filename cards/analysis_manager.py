@@ -3,16 +3,18 @@ Minimal analysis manager for basic functionality.
 """
 
 from .models import get_cards_collection
+from .analysis_stats import analysis_stats
+from .projections import card_projection
 
 
 class AnalysisManager:
     """Basic analysis manager for card operations."""
     
-    def get_card_by_uuid(self, card_uuid):
-        """Get a card by its UUID."""
+    def get_card_by_uuid(self, card_uuid, shape='detail_full'):
+        """Get a card by its UUID, in one of the shapes from cards/projections.py."""
         try:
             cards_collection = get_cards_collection()
-            return cards_collection.find_one({'uuid': card_uuid})
+            return cards_collection.find_one({'uuid': card_uuid}, card_projection(shape))
         except Exception as e:
             print(f"Error getting card {card_uuid}: {e}")
             return None
@@ -20,9 +22,9 @@ class AnalysisManager:
     def get_analysis_progress(self):
         """Get basic analysis progress stats."""
         try:
-            cards_collection = get_cards_collection()
-            total_cards = cards_collection.count_documents({})
-            analyzed_cards = cards_collection.count_documents({'analysis.fully_analyzed': True})
+            stats = analysis_stats.get()
+            total_cards = stats['total_cards']
+            analyzed_cards = stats['fully_analyzed']
             
             return {
                 'total_cards': total_cards,
@@ -0,0 +1,230 @@
+"""
+Materialized analysis counters.
+
+One document in the analysis_stats collection holds the numbers the home
+page and the swarm dashboards show, so those pages read a single document
+instead of running count_documents over the whole cards collection. The
+submission and synthesis paths keep it current with $inc; reconcile()
+recomputes everything from the cards collection and is run periodically by
+`python manage.py reconcile_analysis_stats` to correct any drift.
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, Optional
+
+from .models import get_mongodb_collection
+from .swarm_logging import enhanced_swarm_logger
+
+
+# Components scoring at least this are counted as high coherence
+HIGH_QUALITY_SCORE = 0.8
+
+
+def _is_score(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def quality_delta(previous_scores: Dict[str, Any], new_scores: Dict[str, Any]) -> Dict[str, float]:
+    """Change to a card's analysis.quality rollup when new_scores are stored.
+
+    Scores replace any previous score for the same component; components
+    without a numeric coherence_score are not counted.
+    """
+    delta = {'sum': 0.0, 'count': 0, 'high_count': 0}
+    for name, score in new_scores.items():
+        previous = previous_scores.get(name)
+        if _is_score(previous):
+            delta['sum'] -= previous
+            delta['count'] -= 1
+            delta['high_count'] -= int(previous >= HIGH_QUALITY_SCORE)
+        if _is_score(score):
+            delta['sum'] += score
+            delta['count'] += 1
+            delta['high_count'] += int(score >= HIGH_QUALITY_SCORE)
+    return delta
+
+
+def quality_rollup(scores: Iterable[Any]) -> Dict[str, float]:
+    """analysis.quality rollup for a complete set of component scores."""
+    return quality_delta({}, dict(enumerate(scores)))
+
+
+class AnalysisStats:
+    """Reads and maintains the analysis_stats document"""
+
+    STATS_ID = 'global'
+
+    # Daily buckets older than this are dropped on reconcile
+    DAILY_RETENTION_DAYS = 30
+
+    COUNTERS = [
+        'cards_with_components', 'components_generated', 'fully_analyzed', 'synthesized',
+        # Global coherence-score accumulator (sum of the per-card analysis.quality rollups)
+        'quality_sum', 'quality_count', 'quality_high_count',
+    ]
+
+    @property
+    def stats(self):
+        return get_mongodb_collection('analysis_stats')
+
+    @property
+    def cards(self):
+        return get_mongodb_collection('cards')
+
+    @staticmethod
+    def day_key(when: Optional[datetime] = None) -> str:
+        return (when or datetime.now(timezone.utc)).strftime('%Y-%m-%d')
+
+    def get(self) -> Dict[str, Any]:
+        """Current counters, plus today's bucket as analyzed_today/components_today.
+
+        The first read on an empty database runs a reconcile.
+        """
+        doc = self.stats.find_one({'_id': self.STATS_ID})
+        if doc is None:
+            doc = self.reconcile()
+
+        today = (doc.get('daily') or {}).get(self.day_key(), {})
+        result = {counter: doc.get(counter, 0) for counter in self.COUNTERS}
+        result.update({
+            # Cheap metadata count, so imports show up without a reconcile
+            'total_cards': self.cards.estimated_document_count(),
+            'analyzed_today': today.get('cards', 0),
+            'components_today': today.get('components', 0),
+            'fully_analyzed_today': today.get('fully_analyzed', 0),
+            **self._quality_metrics(result),
+            'daily': doc.get('daily') or {},
+            'reconciled_at': doc.get('reconciled_at'),
+            'updated_at': doc.get('updated_at'),
+        })
+        return result
+
+    @staticmethod
+    def _quality_metrics(counters: Dict[str, Any]) -> Dict[str, float]:
+        count = counters.get('quality_count', 0)
+        return {
+            'avg_coherence_score': round(counters.get('quality_sum', 0) / count, 4) if count else 0.0,
+            'high_quality_percentage': counters.get('quality_high_count', 0) / count * 100 if count else 0,
+        }
+
+    def record_submission(self, new_components: int = 0, new_cards_with_components: int = 0,
+                          newly_fully_analyzed: int = 0, cards_first_today: int = 0,
+                          quality_sum: float = 0.0, quality_count: int = 0, quality_high_count: int = 0,
+                          when: Optional[datetime] = None) -> None:
+        """Apply the counter changes from one batch of stored results."""
+        when = when or datetime.now(timezone.utc)
+        day = f'daily.{self.day_key(when)}'
+        increments = {
+            'components_generated': new_components,
+            'cards_with_components': new_cards_with_components,
+            'fully_analyzed': newly_fully_analyzed,
+            'quality_sum': quality_sum,
+            'quality_count': quality_count,
+            'quality_high_count': quality_high_count,
+            f'{day}.components': new_components,
+            f'{day}.cards': cards_first_today,
+            f'{day}.fully_analyzed': newly_fully_analyzed,
+        }
+        increments = {field: value for field, value in increments.items() if value}
+        if not increments:
+            return
+        self.stats.update_one(
+            {'_id': self.STATS_ID},
+            {'$inc': increments, '$set': {'updated_at': when}},
+            upsert=True
+        )
+
+    def record_synthesis(self, count: int = 1, when: Optional[datetime] = None) -> None:
+        """Count newly saved complete analyses."""
+        when = when or datetime.now(timezone.utc)
+        self.stats.update_one(
+            {'_id': self.STATS_ID},
+            {
+                '$inc': {'synthesized': count, f'daily.{self.day_key(when)}.synthesized': count},
+                '$set': {'updated_at': when}
+            },
+            upsert=True
+        )
+
+    def reconcile(self) -> Dict[str, Any]:
+        """Recompute every counter from the cards collection and overwrite the document.
+
+        Increments that land while this runs may be counted twice or not at
+        all; the next reconcile corrects them.
+        """
+        now = datetime.now(timezone.utc)
+        component_count = {'$cond': {
+            'if': {'$eq': [{'$type': '$analysis.components'}, 'object']},
+            'then': {'$size': {'$objectToArray': '$analysis.components'}},
+            'else': 0
+        }}
+        totals = next(self.cards.aggregate([
+            {'$project': {
+                'component_count': component_count,
+                'fully_analyzed': {'$cond': [{'$eq': ['$analysis.fully_analyzed', True]}, 1, 0]},
+                'synthesized': {'$cond': [{'$ifNull': ['$analysis.complete_analysis', False]}, 1, 0]},
+                'quality': '$analysis.quality',
+            }},
+            {'$group': {
+                '_id': None,
+                'total_cards': {'$sum': 1},
+                'cards_with_components': {'$sum': {'$cond': [{'$gt': ['$component_count', 0]}, 1, 0]}},
+                'components_generated': {'$sum': '$component_count'},
+                'fully_analyzed': {'$sum': '$fully_analyzed'},
+                'synthesized': {'$sum': '$synthesized'},
+                # Per-card rollups are rebuilt from components by backfill_quality_rollups
+                'quality_sum': {'$sum': '$quality.sum'},
+                'quality_count': {'$sum': '$quality.count'},
+                'quality_high_count': {'$sum': '$quality.high_count'},
+            }}
+        ], allowDiskUse=True), {})
+
+        since = (now - timedelta(days=self.DAILY_RETENTION_DAYS)).replace(hour=0, minute=0, second=0, microsecond=0)
+        daily = {}
+
+        def add_daily(field, pipeline):
+            for row in self.cards.aggregate(pipeline, allowDiskUse=True):
+                if row['_id']:
+                    daily.setdefault(row['_id'], {})[field] = row['count']
+
+        def by_day(date_field):
+            return {'$dateToString': {'format': '%Y-%m-%d', 'date': date_field}}
+
+        add_daily('cards', [
+            {'$match': {'analysis.last_updated': {'$gte': since}}},
+            {'$group': {'_id': by_day('$analysis.last_updated'), 'count': {'$sum': 1}}}
+        ])
+        add_daily('fully_analyzed', [
+            {'$match': {'analysis.analysis_completed_at': {'$gte': since}}},
+            {'$group': {'_id': by_day('$analysis.analysis_completed_at'), 'count': {'$sum': 1}}}
+        ])
+        add_daily('synthesized', [
+            {'$match': {'analysis.synthesis_generated_at': {'$gte': since}}},
+            {'$group': {'_id': by_day('$analysis.synthesis_generated_at'), 'count': {'$sum': 1}}}
+        ])
+        add_daily('components', [
+            {'$match': {'analysis.last_updated': {'$gte': since}}},
+            {'$project': {'component': {'$objectToArray': '$analysis.components'}}},
+            {'$unwind': '$component'},
+            {'$match': {'component.v.generated_at': {'$gte': since}}},
+            {'$group': {'_id': by_day('$component.v.generated_at'), 'count': {'$sum': 1}}}
+        ])
+
+        doc = {
+            '_id': self.STATS_ID,
+            **{counter: totals.get(counter, 0) for counter in self.COUNTERS},
+            'total_cards': totals.get('total_cards', 0),
+            'daily': daily,
+            'reconciled_at': now,
+            'updated_at': now,
+        }
+        self.stats.replace_one({'_id': self.STATS_ID}, doc, upsert=True)
+        enhanced_swarm_logger.info(
+            f"📊 Analysis stats reconciled: {doc['cards_with_components']:,} cards with components, "
+            f"{doc['fully_analyzed']:,} fully analyzed, {doc['components_generated']:,} components"
+        )
+        return doc
+
+
+# Global instance
+analysis_stats = AnalysisStats()
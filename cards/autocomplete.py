@@ -0,0 +1,365 @@
+"""
+Autocomplete index for /api/autocomplete/.
+
+Card names, set names, card types/subtypes and keywords are normalized
+(lowercase, accents stripped, punctuation collapsed to spaces) and kept in
+one sorted array of keys, so a prefix lookup is a bisect plus a short scan.
+Every word start of a name is indexed as well, so "bolt" finds
+"Lightning Bolt". Matches are ranked by popularity: edhrecRank for cards,
+card count for sets, types and keywords. When prefix matches run short,
+edit-distance-1 variants of the query (typos) are looked up the same way;
+only edits that keep the query a prefix of some key are tried, so a
+lookup stays well under a millisecond on ~30k entries.
+
+The index is loaded from a compact gzipped JSON snapshot written by
+`python manage.py build_autocomplete_index`; without a snapshot it is
+built from the cards collection on first use and the snapshot is saved.
+Responses for hot prefixes are kept in a small LRU.
+"""
+
+import gzip
+import heapq
+import json
+import logging
+import os
+import re
+import threading
+import time
+import unicodedata
+from bisect import bisect_left
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.conf import settings
+
+from .models import get_mongodb_collection
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+
+# Cards without an EDHREC rank sort after every ranked card
+UNRANKED = 10 ** 7
+
+# Prefixes up to this length are answered from precomputed top lists
+SHORT_PREFIX = 4
+TOP_PER_PREFIX = 50
+
+# Longer prefixes get a top list too when they match more keys than this,
+# so a lookup never scans and ranks more than MAX_SCAN keys
+MAX_SCAN = 256
+
+# Keys scanned per edit-distance-1 variant of the query
+FUZZY_SCAN = 20
+
+# Typo matches gathered before the variant scan stops
+FUZZY_MATCHES = 100
+
+# Letters NFKD does not decompose into ASCII
+LIGATURES = str.maketrans({'Æ': 'AE', 'æ': 'ae', 'Œ': 'OE', 'œ': 'oe', 'Ø': 'O', 'ø': 'o', 'ß': 'ss'})
+
+NON_ALNUM_RE = re.compile(r'[^a-z0-9]+')
+
+
+def get_autocomplete_setting(name: str, default: Any) -> Any:
+    """Read a value from settings.AUTOCOMPLETE_SETTINGS with a default."""
+    return getattr(settings, 'AUTOCOMPLETE_SETTINGS', {}).get(name, default)
+
+
+def normalize(text: str) -> str:
+    """Lowercase, strip accents and collapse everything else to single spaces."""
+    text = unicodedata.normalize('NFKD', str(text).translate(LIGATURES)).encode('ascii', 'ignore').decode('ascii')
+    return NON_ALNUM_RE.sub(' ', text.lower()).strip()
+
+
+class AutocompleteIndex:
+    """Sorted-array prefix index with popularity ranking and a hot-prefix LRU"""
+
+    def __init__(self):
+        # entries[i] = [kind, text, subtext, url, image, rank]
+        self.entries: List[list] = []
+        # (entries, normalized entry texts, sorted keys, entry position per key,
+        # top entries per short prefix),
+        # swapped as one tuple so lookups never see a half-loaded index
+        self._index: tuple = ([], [], [], [], {})
+        self.built_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._cache: 'OrderedDict[Tuple[str, int], List[Dict[str, Any]]]' = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+        self.snapshot_path = Path(get_autocomplete_setting(
+            'snapshot_path', Path(settings.BASE_DIR) / 'data' / 'autocomplete.json.gz'
+        ))
+        self.cache_size = int(get_autocomplete_setting('cache_size', 2048))
+        self.max_age = int(get_autocomplete_setting('max_age', 24 * 3600))
+
+    # ------------------------------------------------------------------
+    # Building and snapshots
+    # ------------------------------------------------------------------
+
+    def collect_entries(self) -> List[list]:
+        """Read suggestion entries from the cards collection."""
+        cards = get_mongodb_collection('cards')
+        names: Dict[str, list] = {}
+        sets: Dict[str, list] = {}
+        types: Dict[str, int] = {}
+        keywords: Dict[str, int] = {}
+
+        projection = {'name': 1, 'type': 1, 'uuid': 1, 'edhrecRank': 1, 'imageUris.small': 1,
+                      'setCode': 1, 'setName': 1, 'types': 1, 'subtypes': 1, 'keywords': 1}
+        for card in cards.find({}, projection):
+            name = card.get('name')
+            if name:
+                rank = card.get('edhrecRank')
+                rank = int(rank) if isinstance(rank, (int, float)) else UNRANKED
+                # One entry per name: the most popular printing
+                if name not in names or rank < names[name][5]:
+                    names[name] = ['card', name, card.get('type', ''), f"/card/{card.get('uuid', '')}/",
+                                   (card.get('imageUris') or {}).get('small', ''), rank]
+
+            set_code = card.get('setCode')
+            if set_code:
+                entry = sets.setdefault(set_code, [
+                    'set', card.get('setName') or set_code, set_code, f'/abyss/?set={set_code}', '', 0
+                ])
+                entry[5] -= 1
+
+            for card_type in (card.get('types') or []) + (card.get('subtypes') or []):
+                types[card_type] = types.get(card_type, 0) + 1
+            for keyword in card.get('keywords') or []:
+                keywords[keyword] = keywords.get(keyword, 0) + 1
+
+        entries = list(names.values()) + list(sets.values())
+        entries += [['filter', card_type, f'Filter by {card_type.lower()}',
+                     f'/abyss/?type={card_type.lower()}', '', -count]
+                    for card_type, count in types.items()]
+        entries += [['keyword', keyword, f'{count:,} cards with {keyword.lower()}',
+                     f'/abyss/?q={keyword}', '', -count]
+                    for keyword, count in keywords.items()]
+        return entries
+
+    def load_entries(self, entries: List[list]) -> None:
+        """Index entries and swap them in."""
+        keyed = []
+        normalized_texts = [normalize(entry[1]) for entry in entries]
+        for position, entry in enumerate(entries):
+            normalized = normalized_texts[position]
+            if not normalized:
+                continue
+            words = normalized.split(' ')
+            starts = {0}
+            offset = 0
+            for word in words[:-1]:
+                offset += len(word) + 1
+                starts.add(offset)
+            for start in starts:
+                keyed.append((normalized[start:], position))
+            if entry[0] == 'set':
+                keyed.append((normalize(entry[2]), position))
+        keyed.sort()
+        keys = [key for key, _ in keyed]
+        key_entries = [position for _, position in keyed]
+
+        # Short prefixes, and longer ones shared by many keys, match too many
+        # keys to rank on every request
+        top = {}
+        ranges = [(0, len(keys))]
+        length = 1
+        while ranges:
+            next_ranges = []
+            for start, stop in ranges:
+                while start < stop:
+                    prefix = keys[start][:length]
+                    if len(prefix) < length:
+                        start += 1
+                        continue
+                    end = bisect_left(keys, prefix + '\x7f', start, stop)
+                    if length <= SHORT_PREFIX or end - start > MAX_SCAN:
+                        top[prefix] = self._top_entries(entries, key_entries[start:end], TOP_PER_PREFIX)
+                    if length < SHORT_PREFIX or end - start > MAX_SCAN:
+                        next_ranges.append((start, end))
+                    start = end
+            ranges = next_ranges
+            length += 1
+
+        with self._lock:
+            self.entries = entries
+            self._index = (entries, normalized_texts, keys, key_entries, top)
+            self.built_at = time.time()
+        self.clear_cache()
+
+    @staticmethod
+    def _top_entries(entries: List[list], positions: List[int], count: int) -> List[int]:
+        unique = set(positions)
+        cards = heapq.nsmallest(count, (p for p in unique if entries[p][0] == 'card'),
+                                key=lambda p: entries[p][5])
+        others = heapq.nsmallest(3, (p for p in unique if entries[p][0] != 'card'),
+                                 key=lambda p: entries[p][5])
+        return cards + others
+
+    def build(self) -> int:
+        """Rebuild from Mongo and write the snapshot."""
+        started = time.time()
+        entries = self.collect_entries()
+        self.load_entries(entries)
+        self.save_snapshot()
+        logger.info(f"Autocomplete index built: {len(entries):,} entries in {time.time() - started:.1f}s")
+        return len(entries)
+
+    def save_snapshot(self) -> None:
+        self.snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {'version': SNAPSHOT_VERSION, 'built_at': self.built_at, 'entries': self.entries}
+        temp_path = self.snapshot_path.with_suffix('.tmp')
+        with gzip.open(temp_path, 'wt', encoding='utf-8') as f:
+            json.dump(payload, f, separators=(',', ':'))
+        os.replace(temp_path, self.snapshot_path)
+
+    def load_snapshot(self) -> bool:
+        """Load the snapshot file; False if it is missing, stale or unreadable."""
+        try:
+            with gzip.open(self.snapshot_path, 'rt', encoding='utf-8') as f:
+                payload = json.load(f)
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError) as e:
+            logger.warning(f"Autocomplete snapshot unreadable: {e}")
+            return False
+        if payload.get('version') != SNAPSHOT_VERSION or time.time() - payload.get('built_at', 0) > self.max_age:
+            return False
+        self.load_entries(payload['entries'])
+        self.built_at = payload['built_at']
+        return True
+
+    def ensure_loaded(self) -> None:
+        if self.built_at is not None:
+            return
+        with self._load_lock:
+            if self.built_at is None and not self.load_snapshot():
+                self.build()
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _prefix_matches(keys: List[str], key_entries: List[int], prefix: str, seen: set,
+                        found: List[int], scan_limit: int) -> None:
+        position = bisect_left(keys, prefix)
+        end = min(len(keys), position + scan_limit)
+        while position < end and keys[position].startswith(prefix):
+            entry = key_entries[position]
+            if entry not in seen:
+                seen.add(entry)
+                found.append(entry)
+            position += 1
+
+    @staticmethod
+    def _next_chars(keys: List[str], prefix: str) -> List[str]:
+        """Characters that follow prefix in some key, one bisect per character."""
+        chars = []
+        position = bisect_left(keys, prefix)
+        while position < len(keys) and keys[position].startswith(prefix):
+            if len(keys[position]) == len(prefix):
+                position += 1
+                continue
+            char = keys[position][len(prefix)]
+            chars.append(char)
+            position = bisect_left(keys, prefix + chr(ord(char) + 1), position)
+        return chars
+
+    def _fuzzy_matches(self, keys: List[str], key_entries: List[int], prefix: str, seen: set,
+                       found: List[int]) -> None:
+        """Entries one deletion, transposition, substitution or insertion away from prefix.
+
+        An edit at position i can only match if prefix[:i] starts some key, and
+        only characters that follow it in a key are tried, so the variants
+        probed are far fewer than every edit over the whole alphabet.
+        """
+        probed = set()
+        for i in range(len(prefix) + 1):
+            left, right = prefix[:i], prefix[i:]
+            following = self._next_chars(keys, left)
+            if not following:
+                break  # No key starts with left, nor with any longer piece of prefix
+            variants = [left + c + right for c in following]
+            if right:
+                variants.append(left + right[1:])
+                variants += [left + c + right[1:] for c in following if c != right[0]]
+            if len(right) > 1:
+                variants.append(left + right[1] + right[0] + right[2:])
+            for variant in variants:
+                variant = variant.strip()
+                if variant and variant != prefix and variant not in probed:
+                    probed.add(variant)
+                    self._prefix_matches(keys, key_entries, variant, seen, found, FUZZY_SCAN)
+            if len(found) >= FUZZY_MATCHES:
+                return
+
+    def suggest(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Ranked suggestions for a typed prefix, including one-typo matches."""
+        prefix = normalize(query)
+        if not prefix:
+            return []
+        cache_key = (prefix, limit)
+        with self._cache_lock:
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                self._cache.move_to_end(cache_key)
+                return cached
+
+        self.ensure_loaded()
+        entries, texts, keys, key_entries, top = self._index
+        seen: set = set()
+        if len(prefix) <= SHORT_PREFIX or prefix in top:
+            exact = list(top.get(prefix, []))
+            seen.update(exact)
+        else:
+            exact = []
+            self._prefix_matches(keys, key_entries, prefix, seen, exact, MAX_SCAN)
+
+        fuzzy: List[int] = []
+        if len(exact) < limit and len(prefix) >= 3:
+            self._fuzzy_matches(keys, key_entries, prefix, seen, fuzzy)
+
+        ordered = self._rank(entries, texts, exact, prefix, limit)
+        ordered += self._rank(entries, texts, fuzzy, prefix, limit - len(ordered))
+        fuzzy_positions = set(fuzzy)
+
+        suggestions = []
+        for position in ordered:
+            kind, text, subtext, url, image, _ = entries[position]
+            suggestion = {'text': text, 'type': kind, 'subtext': subtext, 'url': url}
+            if kind == 'card':
+                suggestion['image'] = image
+            if position in fuzzy_positions:
+                suggestion['fuzzy'] = True
+            suggestions.append(suggestion)
+
+        with self._cache_lock:
+            self._cache[cache_key] = suggestions
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return suggestions
+
+    @staticmethod
+    def _rank(entries: List[list], texts: List[str], positions: List[int], prefix: str,
+              limit: int) -> List[int]:
+        """Exact names first, then cards by popularity, then up to three
+        set/type/keyword suggestions."""
+        if limit <= 0:
+            return []
+        key = lambda position: (texts[position] != prefix, entries[position][5])
+        others = heapq.nsmallest(3, (p for p in positions if entries[p][0] != 'card'), key=key)
+        cards = heapq.nsmallest(max(limit - len(others), 0), (p for p in positions if entries[p][0] == 'card'), key=key)
+        ordered = sorted(cards + others, key=lambda p: (key(p)[0], entries[p][0] != 'card'))
+        return ordered[:limit]
+
+    def clear_cache(self) -> None:
+        with self._cache_lock:
+            self._cache.clear()
+
+
+# Global instance
+autocomplete_index = AutocompleteIndex()
@@ -0,0 +1,108 @@
+"""
+Canonical card identity resolution.
+
+Cards reach the swarm under several keys: the MTGJSON uuid, the Scryfall id
+(top-level `id` or `identifiers.scryfallId`) and the Mongo _id as a string.
+CardIdentityResolver maps all of them to the card's _id from an in-memory
+index, warmed once per process with a projected scan. Cards imported after
+the warm-up (importers run in other processes) are picked up lazily: the
+first lookup of such a card misses, costs one indexed $or query and
+registers the card, so later lookups are served from memory. Card names are
+never used for lookups.
+"""
+
+import threading
+from typing import Any, Dict, Iterable, Optional
+
+from bson import ObjectId
+
+from .models import get_mongodb_collection
+from .swarm_logging import enhanced_swarm_logger
+
+
+class CardIdentityResolver:
+    """Maps external card identifiers to the canonical card _id"""
+
+    # Card fields that identify a card (indexed via mongo_indexes / ensure_indexes)
+    IDENTITY_FIELDS = ['uuid', 'id', 'identifiers.scryfallId']
+
+    def __init__(self):
+        self._index: Dict[str, ObjectId] = {}
+        self._lock = threading.Lock()
+        self._warmed = False
+
+    @property
+    def cards(self):
+        return get_mongodb_collection('cards')
+
+    @staticmethod
+    def _identity_keys(card: Dict[str, Any]) -> Iterable[str]:
+        for key in (card.get('uuid'), card.get('id'), (card.get('identifiers') or {}).get('scryfallId')):
+            if key:
+                yield str(key)
+
+    def register(self, card: Dict[str, Any]) -> None:
+        """Add a card's identifiers to the index (on warm-up and after a lookup miss)."""
+        if card.get('_id') is None:
+            return
+        for key in self._identity_keys(card):
+            self._index[key] = card['_id']
+
+    def register_many(self, cards: Iterable[Dict[str, Any]]) -> None:
+        for card in cards:
+            self.register(card)
+
+    def warm(self, force: bool = False) -> int:
+        """Load every card's identifiers with a single projected scan."""
+        with self._lock:
+            if self._warmed and not force:
+                return len(self._index)
+            projection = {field: 1 for field in self.IDENTITY_FIELDS}
+            self._index.clear()
+            self.register_many(self.cards.find({}, projection))
+            self._warmed = True
+        enhanced_swarm_logger.info(f"🪪 Card identity index warmed with {len(self._index):,} keys")
+        return len(self._index)
+
+    def resolve(self, key: Any) -> Optional[ObjectId]:
+        """Return the canonical _id for a uuid, Scryfall id or _id string."""
+        if not key:
+            return None
+        if isinstance(key, ObjectId):
+            return key
+        key = str(key)
+        if ObjectId.is_valid(key):
+            return ObjectId(key)
+
+        if not self._warmed:
+            self.warm()
+        card_oid = self._index.get(key)
+        if card_oid is not None:
+            return card_oid
+
+        # Card imported after warm-up: look it up once, then serve it from memory
+        card = self.cards.find_one(
+            {'$or': [{field: key} for field in self.IDENTITY_FIELDS]},
+            {field: 1 for field in self.IDENTITY_FIELDS}
+        )
+        if card is None:
+            return None
+        self.register(card)
+        return card['_id']
+
+    def resolve_task(self, task: Dict[str, Any], hint: Any = None) -> Optional[ObjectId]:
+        """Canonical _id for a swarm task: card_oid, then card_id, card_uuid and an optional caller hint."""
+        for key in (task.get('card_oid'), task.get('card_id'), task.get('card_uuid'), hint):
+            card_oid = self.resolve(key)
+            if card_oid is not None:
+                return card_oid
+        return None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._index.clear()
+            self._warmed = False
+
+
+# Global instance
+card_identity = CardIdentityResolver()
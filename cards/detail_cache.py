@@ -0,0 +1,182 @@
+"""
+Rendered card detail cache.
+
+A card detail page renders up to 20 analysis components and the synthesized
+complete analysis from markdown, which used to happen on every view. The
+rendered HTML is now cached per card together with the analysis stamp it
+was rendered from (component count, last_updated, synthesis time):
+
+- the page loads the card in its detail_header shape, which carries the
+  stamp but no component text;
+- a cached entry with the same stamp is served as is, so a popular card
+  costs one slim find and one cache get;
+- on a miss the component text is loaded, rendered and cached.
+
+Any write that touches the analysis moves the stamp, so stale HTML is never
+served. Submissions also drop the cached entries of the cards they touch,
+and re-render cards that have just been fully analyzed in the background.
+"""
+
+import logging
+import threading
+from typing import Any, Dict, Iterable, Optional
+
+from django.core.cache import caches
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .markdown_renderer import render_many
+from .models import get_cards_collection
+from .page_cache import get_page_cache_setting
+
+logger = logging.getLogger(__name__)
+
+# Bump when the rendering below changes so old entries are not served
+RENDER_VERSION = 1
+
+# Separate cache alias (settings.CACHES), so one entry per card cannot crowd
+# out the page contexts in 'default'
+CACHE_ALIAS = 'card_details'
+
+ANALYSIS_PROJECTION = {
+    'analysis.components': 1, 'analysis.complete_analysis': 1, 'analysis.component_count': 1,
+    'analysis.last_updated': 1, 'analysis.synthesis_generated_at': 1,
+    'analysis.synthesis_generated_by': 1, 'analysis.synthesis_version': 1,
+}
+
+
+def _cache_key(card_id: Any) -> str:
+    return f'card_detail:{card_id}'
+
+
+def analysis_stamp(analysis: Dict[str, Any]) -> str:
+    """Version stamp of a card's analysis; changes whenever its content does."""
+    last_updated = analysis.get('last_updated')
+    synthesized = analysis.get('synthesis_generated_at')
+    return ':'.join([
+        str(RENDER_VERSION),
+        str(analysis.get('component_count') or 0),
+        last_updated.isoformat() if hasattr(last_updated, 'isoformat') else str(last_updated or ''),
+        synthesized.isoformat() if hasattr(synthesized, 'isoformat') else str(synthesized or ''),
+    ])
+
+
+def render_analysis(analysis: Dict[str, Any]) -> Dict[str, Any]:
+    """Render a card's components and complete analysis to HTML.
+
+    Components come back normalized (legacy string components become dicts)
+    with their rendered markdown under 'html'.
+    """
+    components = {}
+    coherence_summary = {'high': 0, 'medium': 0, 'low': 0}
+    markdown_texts = {}
+    for comp_type, comp_data in (analysis.get('components') or {}).items():
+        if isinstance(comp_data, dict):
+            content = comp_data.get('content', '')
+            coherence_score = comp_data.get('coherence_score', 0.0) or 0.0
+            components[comp_type] = {
+                'content': content,
+                'coherence_score': coherence_score,
+                'generated_by': comp_data.get('generated_by'),
+                'generated_at': comp_data.get('generated_at'),
+                'batch_processed': comp_data.get('batch_processed', False),
+            }
+            markdown_texts[comp_type] = content
+            if coherence_score >= 0.8:
+                coherence_summary['high'] += 1
+            elif coherence_score >= 0.6:
+                coherence_summary['medium'] += 1
+            else:
+                coherence_summary['low'] += 1
+        else:
+            # Legacy format - just a content string; short ones are shown verbatim
+            content = str(comp_data) if comp_data else ''
+            components[comp_type] = {
+                'content': content,
+                'html': mark_safe(f'<p>{escape(content)}</p>') if content else '',
+                'coherence_score': 0.0,
+                'generated_by': 'Legacy',
+                'generated_at': None,
+                'batch_processed': False,
+            }
+            if len(content) > 50:
+                markdown_texts[comp_type] = content
+
+    complete_analysis = analysis.get('complete_analysis', '')
+    synthesis_metadata = {}
+    if complete_analysis:
+        synthesis_metadata = {
+            'generated_at': analysis.get('synthesis_generated_at'),
+            'generated_by': analysis.get('synthesis_generated_by', 'Unknown'),
+            'version': analysis.get('synthesis_version', 1.0),
+        }
+
+    # All of the card's markdown in one batch (component names never clash with the key below)
+    rendered = render_many({**markdown_texts, '__complete_analysis__': complete_analysis})
+    for comp_type, html in rendered.items():
+        if comp_type in components:
+            components[comp_type]['html'] = html
+
+    return {
+        'components': components,
+        'coherence_summary': coherence_summary,
+        'complete_analysis': complete_analysis,
+        'complete_analysis_html': rendered['__complete_analysis__'],
+        'synthesis_metadata': synthesis_metadata,
+    }
+
+
+def _load_and_render(card_id: Any) -> Optional[Dict[str, Any]]:
+    doc = get_cards_collection().find_one({'_id': card_id}, ANALYSIS_PROJECTION)
+    if doc is None:
+        return None
+    analysis = doc.get('analysis') or {}
+    entry = {'stamp': analysis_stamp(analysis), 'rendered': render_analysis(analysis)}
+    try:
+        caches[CACHE_ALIAS].set(_cache_key(card_id), entry, int(get_page_cache_setting('detail_ttl', 86400)))
+    except Exception as e:
+        logger.warning(f"Card detail cache unavailable: {e}")
+    return entry
+
+
+def get_rendered_analysis(card: Dict[str, Any]) -> Dict[str, Any]:
+    """Rendered analysis for a card loaded in the detail_header shape."""
+    stamp = analysis_stamp(card.get('analysis') or {})
+    try:
+        entry = caches[CACHE_ALIAS].get(_cache_key(card['_id']))
+    except Exception as e:
+        logger.warning(f"Card detail cache unavailable: {e}")
+        entry = None
+    if entry is None or entry['stamp'] != stamp:
+        entry = _load_and_render(card['_id'])
+    return entry['rendered'] if entry else render_analysis({})
+
+
+def invalidate_card_details(card_ids: Iterable[Any]) -> None:
+    """Drop the rendered pages of cards whose analysis changed.
+
+    Never raises: a cache outage must not fail the write that triggered it.
+    """
+    keys = [_cache_key(card_id) for card_id in card_ids]
+    if not keys:
+        return
+    try:
+        caches[CACHE_ALIAS].delete_many(keys)
+    except Exception as e:
+        logger.warning(f"Card detail cache invalidation failed: {e}")
+
+
+def warm_card_details(card_ids: Iterable[Any]) -> None:
+    """Render card pages in a background thread (used for newly completed cards)."""
+    card_ids = list(card_ids)
+    if not card_ids:
+        return
+
+    def warm():
+        for card_id in card_ids:
+            try:
+                _load_and_render(card_id)
+            except Exception as e:
+                logger.warning(f"Card detail pre-render failed for {card_id}: {e}")
+
+    threading.Thread(target=warm, name='card-detail-warm', daemon=True).start()
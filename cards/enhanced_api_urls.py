@@ -11,6 +11,8 @@ urlpatterns = [
     path('register', enhanced_swarm_api.register_worker, name='enhanced_swarm_register'),
     path('get_work', enhanced_swarm_api.get_work, name='enhanced_swarm_get_work'),
     path('submit_results', enhanced_swarm_api.submit_results, name='enhanced_swarm_submit_results'),
+    path('submit_results_bulk', enhanced_swarm_api.submit_results_bulk, name='enhanced_swarm_submit_results_bulk'),
+    path('release', enhanced_swarm_api.release_work, name='enhanced_swarm_release'),
     path('heartbeat', enhanced_swarm_api.heartbeat, name='enhanced_swarm_heartbeat'),
     path('status', enhanced_swarm_api.enhanced_swarm_status, name='enhanced_swarm_status'),
     path('workers', enhanced_swarm_api.worker_health, name='enhanced_swarm_workers'),
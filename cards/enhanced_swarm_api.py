@@ -9,9 +9,13 @@ from django.views.decorators.http import require_http_methods
 import json
 import sys
 import os
+import zlib
 from bson import ObjectId
 from datetime import datetime, timezone
 
+from .models import get_mongodb_pool_stats
+from .analysis_stats import analysis_stats
+
 # Custom JSON encoder to handle MongoDB ObjectId and datetime objects
 class MongoJSONEncoder(json.JSONEncoder):
     def default(self, obj):
@@ -21,6 +25,22 @@ class MongoJSONEncoder(json.JSONEncoder):
             return obj.isoformat()
         return super().default(obj)
 
+# Largest decompressed request body accepted (a full card submission is ~100 KB)
+MAX_DECODED_BODY = 16 * 1024 * 1024
+
+def _request_json(request):
+    """Parse a JSON request body, decoding Content-Encoding: gzip (sent by swarm_client.SwarmClient)"""
+    body = request.body
+    encoding = request.headers.get('Content-Encoding', '').strip().lower()
+    if encoding == 'gzip':
+        decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        body = decoder.decompress(body, MAX_DECODED_BODY)
+        if decoder.unconsumed_tail:
+            raise ValueError('Decompressed request body too large')
+    elif encoding not in ('', 'identity'):
+        raise ValueError(f'Unsupported Content-Encoding: {encoding}')
+    return json.loads(body)
+
 try:
     from .enhanced_swarm_manager import enhanced_swarm
     from .swarm_logging import get_swarm_logger
@@ -35,7 +55,7 @@ except ImportError as e:
 def register_worker(request):
     """Register a new worker node with enhanced capabilities"""
     try:
-        data = json.loads(request.body)
+        data = _request_json(request)
         worker_id = data.get('worker_id')
         capabilities = data.get('capabilities', {})
         
@@ -60,30 +80,36 @@ def register_worker(request):
 @csrf_exempt
 @require_http_methods(["POST"])
 def get_work(request):
-    """Get work assignments for workers - ALWAYS RANDOM"""
+    """Lease work from the swarm queue"""
     if request.method != 'POST':
         return JsonResponse({'error': 'POST method required'}, status=405)
     
     try:
-        data = json.loads(request.body)
+        data = _request_json(request)
         worker_id = data.get('worker_id')
         
         if not worker_id:
             return JsonResponse({'error': 'worker_id required'}, status=400)
         
-        # ALWAYS use random assignment - ignore any priority parameters
-        tasks = enhanced_swarm.get_work(worker_id)
+        try:
+            max_tasks = int(data.get('max_tasks', 1))
+            max_components = int(data['max_components']) if data.get('max_components') else None
+        except (TypeError, ValueError):
+            return JsonResponse({'error': 'max_tasks and max_components must be integers'}, status=400)
+        
+        tasks = enhanced_swarm.get_work(worker_id, max_tasks=max_tasks, max_components=max_components)
         
         # Convert ObjectId fields to strings for JSON serialization
         json_tasks = json.loads(json.dumps(tasks, cls=MongoJSONEncoder))
         
         if logger:
-            logger.info(f"✅ API returning {len(json_tasks)} RANDOM tasks to {worker_id}")
+            logger.info(f"✅ API returning {len(json_tasks)} leased tasks to {worker_id}")
         
         return JsonResponse({
             'tasks': json_tasks,
-            'assignment_type': 'RANDOM',  # Make it clear this is random
-            'count': len(json_tasks)
+            'assignment_type': 'QUEUE',
+            'count': len(json_tasks),
+            'lease_seconds': enhanced_swarm.queue.lease_seconds
         })
         
     except Exception as e:
@@ -96,7 +122,7 @@ def get_work(request):
 def submit_results(request):
     """Accept completed work from a worker with enhanced validation"""
     try:
-        data = json.loads(request.body)
+        data = _request_json(request)
         worker_id = data.get('worker_id')
         task_id = data.get('task_id')
         card_id = data.get('card_id')
@@ -128,6 +154,63 @@ def submit_results(request):
             logger.error(f"❌ Submit results failed for {worker_id}: {str(e)}")
         return JsonResponse({'error': str(e)}, status=500)
 
+@csrf_exempt
+@require_http_methods(["POST"])
+def submit_results_bulk(request):
+    """Accept many completed tasks from a worker in one request"""
+    worker_id = None
+    try:
+        data = _request_json(request)
+        worker_id = data.get('worker_id')
+        submissions = data.get('results', [])
+        
+        if not worker_id or not isinstance(submissions, list) or not submissions:
+            return JsonResponse({'error': 'worker_id and a non-empty results list required'}, status=400)
+        
+        if enhanced_swarm is None:
+            return JsonResponse({'error': 'Enhanced SwarmManager not available'}, status=500)
+        
+        task_results = enhanced_swarm.submit_task_results_bulk(worker_id, submissions)
+        accepted = sum(1 for result in task_results if result['status'] == 'success')
+        failed = len(task_results) - accepted
+        
+        if logger:
+            logger.info(f"✅ Bulk results from {worker_id}: {accepted} accepted, {failed} failed")
+        return JsonResponse({
+            'status': 'success' if not failed else ('partial' if accepted else 'error'),
+            'accepted': accepted,
+            'failed': failed,
+            'results': task_results
+        })
+        
+    except Exception as e:
+        if logger:
+            logger.error(f"❌ Bulk submit failed for {worker_id}: {str(e)}")
+        return JsonResponse({'error': str(e)}, status=500)
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def release_work(request):
+    """Hand leased tasks back to the queue before their leases expire"""
+    try:
+        data = _request_json(request)
+        worker_id = data.get('worker_id')
+        task_ids = data.get('task_ids', [])
+        
+        if not worker_id or not isinstance(task_ids, list):
+            return JsonResponse({'error': 'worker_id and a task_ids list required'}, status=400)
+        
+        if enhanced_swarm is None:
+            return JsonResponse({'error': 'Enhanced SwarmManager not available'}, status=500)
+        
+        released = enhanced_swarm.release_tasks(worker_id, task_ids)
+        return JsonResponse({'status': 'success', 'released': released})
+        
+    except Exception as e:
+        if logger:
+            logger.error(f"❌ Release work error: {e}")
+        return JsonResponse({'error': str(e)}, status=500)
+
 @require_http_methods(["GET"])
 def enhanced_swarm_status(request):
     """Get comprehensive enhanced swarm system status"""
@@ -184,7 +267,7 @@ def worker_health(request):
 def heartbeat(request):
     """Enhanced worker heartbeat endpoint with detailed status tracking"""
     try:
-        data = json.loads(request.body)
+        data = _request_json(request)
         worker_id = data.get('worker_id')
         
         if not worker_id:
@@ -239,10 +322,9 @@ def system_metrics(request):
             return JsonResponse({'error': 'Enhanced SwarmManager not available'}, status=500)
         
         # Get comprehensive metrics
-        total_cards = enhanced_swarm.cards.count_documents({})
-        analyzed_cards = enhanced_swarm.cards.count_documents({
-            'analysis.status.fully_analyzed': True
-        })
+        card_stats = analysis_stats.get()
+        total_cards = card_stats['total_cards']
+        analyzed_cards = card_stats['fully_analyzed']
         
         active_workers = enhanced_swarm.workers.count_documents({
             'status': 'active',
@@ -283,7 +365,8 @@ def system_metrics(request):
             'system': {
                 'timestamp': datetime.now(timezone.utc).isoformat(),
                 'version': '2.0-enhanced'
-            }
+            },
+            'mongodb_pool': get_mongodb_pool_stats()
         }
         
         return JsonResponse(metrics)
@@ -15,12 +15,19 @@ from bson import ObjectId
 
 sys.path.append('.')
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'emteegee.settings')
-django.setup()
 
 from django.conf import settings
+from django.utils.functional import SimpleLazyObject
+from pymongo import UpdateOne
 from cards.models import get_mongodb_collection
+from cards.card_identity import card_identity
+from cards.analysis_stats import analysis_stats, quality_delta
+from cards.page_cache import invalidate_home_page
+from cards.detail_cache import invalidate_card_details, warm_card_details
 from cards.coherence_manager import coherence_manager
 from cards.swarm_logging import get_swarm_logger, enhanced_swarm_logger
+from cards.swarm_queue import SwarmWorkQueue
+from cards.projections import card_projection
 
 class EnhancedSwarmManager:
     """Enhanced swarm manager with smart prioritization and batch processing"""
@@ -50,44 +57,132 @@ class EnhancedSwarmManager:
         'completion_rate': 0.1   # Cards with some analysis
     }
     
+    # Upper bound on cards leased by a single get_work call
+    MAX_LEASE_BATCH = int(getattr(settings, 'SWARM_SETTINGS', {}).get('max_lease_batch', 10))
+    
+    # Priority cache maintenance
+    PRIORITY_CACHE_STATE_ID = 'priority_cache'
+    PRIORITY_CACHE_BATCH_SIZE = 1000
+    PRIORITY_CACHE_LOCK_SECONDS = 600
+    PRIORITY_CACHE_PROJECTION = {
+        'uuid': 1, 'id': 1, 'name': 1, 'edhrecRank': 1, 'prices': 1,
+        'analysis.component_count': 1, 'analysis.last_updated': 1,
+        'view_count': 1, 'recent_views': 1
+    }
+    
     def __init__(self):
-        # Use existing MongoDB connection pattern
+        # Use existing MongoDB connection pattern. Construction is cheap: no
+        # queries run here, the priority cache is maintained out of band by
+        # the refresh_priority_cache management command.
         self.cards = get_mongodb_collection('cards')
         self.workers = get_mongodb_collection('swarm_workers')
         self.tasks = get_mongodb_collection('swarm_tasks')
         self.priority_cache = get_mongodb_collection('priority_cache')
-          # Initialize priority cache
-        self._initialize_priority_cache()
-        
-    def _initialize_priority_cache(self):
-        """Initialize or update the priority cache for smart queuing"""
-        enhanced_swarm_logger.info("Initializing priority cache...")
-        
-        # Calculate priority scores for all cards
-        cards_cursor = self.cards.find({}, {
-            'uuid': 1, 'id': 1, 'name': 1, 'edhrecRank': 1, 'prices': 1,
-            'analysis.component_count': 1, 'view_count': 1
-        })
-        
-        priority_updates = []
-        for card in cards_cursor:
-            priority_score = self._calculate_priority_score(card)
-            # Handle both 'uuid' and 'id' fields for card identification
-            card_id = card.get('uuid') or card.get('id') or str(card.get('_id'))
-            if not card_id:
-                enhanced_swarm_logger.error(f"Card missing identification field: {card.get('name', 'Unknown')}")
-                continue
-            priority_updates.append({
-                'card_uuid': card_id,
-                'priority_score': priority_score,
-                'last_updated': datetime.now(timezone.utc)
-            })
+        self.swarm_state = get_mongodb_collection('swarm_state')
+        self.queue = SwarmWorkQueue(priority_fn=self._calculate_priority_score)
+    
+    def refresh_priority_cache(self, full: bool = False) -> Dict[str, Any]:
+        """Incrementally bring the priority cache up to date.
+        
+        Entries are upserted in place, so the cache is never empty while it is
+        being rebuilt. Progress is tracked in a swarm_state document holding a
+        cache version, an analysis.last_updated high-water mark and the last
+        card _id seen; an incremental run only rescans cards changed or added
+        since then. A full run stamps every entry with a new version and then
+        drops entries left on the old one (cards that no longer exist).
+        """
+        now = datetime.now(timezone.utc)
+        state = self.swarm_state.find_one_and_update(
+            {
+                '_id': self.PRIORITY_CACHE_STATE_ID,
+                '$or': [
+                    {'locked_until': {'$exists': False}},
+                    {'locked_until': {'$lt': now}}
+                ]
+            },
+            {'$set': {'locked_until': now + timedelta(seconds=self.PRIORITY_CACHE_LOCK_SECONDS)}},
+            return_document=True
+        )
+        if state is None:
+            if self.swarm_state.count_documents({'_id': self.PRIORITY_CACHE_STATE_ID}, limit=1):
+                enhanced_swarm_logger.info("Priority cache refresh already running elsewhere - skipping")
+                return {'status': 'locked', 'updated': 0}
+            # First run ever - nothing to be incremental against
+            self.swarm_state.update_one(
+                {'_id': self.PRIORITY_CACHE_STATE_ID},
+                {'$setOnInsert': {'version': 0}},
+                upsert=True
+            )
+            return self.refresh_priority_cache(full=True)
         
-        # Batch insert priority scores
-        if priority_updates:
-            self.priority_cache.delete_many({})  # Clear old cache
-            self.priority_cache.insert_many(priority_updates)
-            enhanced_swarm_logger.priority_cache_updated(len(priority_updates))
+        try:
+            full = full or not state.get('high_water_mark')
+            version = state.get('version', 0) + 1 if full else state.get('version', 0)
+            
+            if full:
+                card_query = {}
+            else:
+                card_query = {'$or': [{'analysis.last_updated': {'$gt': state['high_water_mark']}}]}
+                if state.get('last_card_id'):
+                    card_query['$or'].append({'_id': {'$gt': state['last_card_id']}})
+            
+            enhanced_swarm_logger.info(
+                f"Refreshing priority cache ({'full' if full else 'incremental'}, version {version})..."
+            )
+            
+            updated = 0
+            last_card_id = state.get('last_card_id')
+            batch = []
+            for card in self.cards.find(card_query, self.PRIORITY_CACHE_PROJECTION).sort('_id', 1):
+                # Handle both 'uuid' and 'id' fields for card identification
+                card_id = card.get('uuid') or card.get('id') or str(card.get('_id'))
+                if last_card_id is None or card['_id'] > last_card_id:
+                    last_card_id = card['_id']
+                batch.append(UpdateOne(
+                    {'card_uuid': card_id},
+                    {'$set': {
+                        'card_uuid': card_id,
+                        'card_id': str(card['_id']),
+                        'priority_score': self._calculate_priority_score(card),
+                        'last_updated': now,
+                        'version': version
+                    }},
+                    upsert=True
+                ))
+                if len(batch) >= self.PRIORITY_CACHE_BATCH_SIZE:
+                    self.priority_cache.bulk_write(batch, ordered=False)
+                    updated += len(batch)
+                    batch = []
+            if batch:
+                self.priority_cache.bulk_write(batch, ordered=False)
+                updated += len(batch)
+            
+            removed = 0
+            if full:
+                removed = self.priority_cache.delete_many({
+                    '$or': [{'version': {'$lt': version}}, {'version': {'$exists': False}}]
+                }).deleted_count
+            
+            # The high-water mark is the start of this run, so cards updated
+            # while we were scanning are picked up again next time.
+            state_update = {'version': version, 'high_water_mark': now}
+            if last_card_id is not None:
+                state_update['last_card_id'] = last_card_id
+            if full:
+                state_update['last_full_rebuild'] = now
+            self.swarm_state.update_one(
+                {'_id': self.PRIORITY_CACHE_STATE_ID},
+                {'$set': state_update, '$unset': {'locked_until': ''}}
+            )
+        except Exception:
+            self.swarm_state.update_one(
+                {'_id': self.PRIORITY_CACHE_STATE_ID},
+                {'$unset': {'locked_until': ''}}
+            )
+            raise
+        
+        enhanced_swarm_logger.priority_cache_updated(updated)
+        return {'status': 'success', 'full': full, 'version': version, 'updated': updated, 'removed': removed}
     
     def _calculate_priority_score(self, card: Dict[str, Any]) -> float:
         """Calculate smart priority score for a card"""
@@ -150,9 +245,10 @@ class EnhancedSwarmManager:
             ],
             'edhrecRank': {'$exists': True, '$ne': None}
         }, {
-            'uuid': 1, 'id': 1, 'name': 1, 'edhrecRank': 1, 'analysis': 1,
+            # Component names only, plus the legacy field names _create_simple_task sends
+            **card_projection('worker_task'),
             'types': 1, 'subtypes': 1, 'rarity': 1, 'manaValue': 1, 'mana_cost': 1,
-            'type_line': 1, 'oracle_text': 1, 'power': 1, 'toughness': 1
+            'type_line': 1, 'oracle_text': 1
         }).sort('edhrecRank', 1).limit(max_tasks * 10))  # Strongest EDHREC rank first
         
         enhanced_swarm_logger.info(f"📊 Found {len(cards_needing_work)} cards needing analysis")
@@ -271,6 +367,7 @@ class EnhancedSwarmManager:
         task = {
             'task_id': task_id,
             'card_id': str(primary_card['card_data']['_id']),
+            'card_oid': primary_card['card_data']['_id'],
             'card_uuid': primary_card['card_data']['uuid'],
             'card_name': primary_card['card_data'].get('name', 'Unknown'),
             'components': components_to_generate,
@@ -312,8 +409,11 @@ class EnhancedSwarmManager:
             enhanced_swarm_logger.error(f"Card missing identification field: {card.get('name', 'Unknown')}")
             return None
         
-        # Determine what components are missing
-        existing_components = card.get('analysis', {}).get('components', {})
+        # Determine what components are missing (worker_task-shaped cards carry only the names)
+        existing_components = card.get('component_names')
+        if existing_components is None:
+            existing_components = card.get('analysis', {}).get('components', {})
+        existing_components = set(existing_components)
         current_count = len(existing_components)
         
         # Find components that need to be generated
@@ -333,6 +433,7 @@ class EnhancedSwarmManager:
         task = {
             'task_id': task_id,
             'card_id': str(card.get('_id')),
+            'card_oid': card.get('_id'),
             'card_uuid': card_uuid,
             'card_name': card.get('name', 'Unknown'),
             'components': components_to_generate,
@@ -370,12 +471,10 @@ class EnhancedSwarmManager:
             return {'status': 'error', 'message': 'Task not assigned to this worker'}
         
         card_uuid = task['card_uuid']
-        # Try to find card by uuid first, then by id
-        card = self.cards.find_one({'uuid': card_uuid})
-        if not card:
-            card = self.cards.find_one({'id': card_uuid})
+        card_oid = card_identity.resolve_task(task)
+        card = self.cards.find_one({'_id': card_oid}) if card_oid else None
         if not card:
-            enhanced_swarm_logger.error(f"Card not found with uuid/id: {card_uuid}")
+            enhanced_swarm_logger.error(f"Card not found for task {task_id} (uuid: {card_uuid})")
             return {'status': 'error', 'message': 'Card not found'}
           # Get existing analysis for coherence checking
         existing_components = {}
@@ -414,28 +513,53 @@ class EnhancedSwarmManager:
                 'batch_processed': task.get('batch_processing', False)
             }
         
+        # Quality rollup change: new scores replace any previous ones
+        quality = quality_delta(
+            {
+                name: component.get('coherence_score') if isinstance(component, dict) else None
+                for name, component in existing_components.items()
+            },
+            {key.rsplit('.', 1)[-1]: component['coherence_score'] for key, component in validated_components.items()}
+        )
+        
         # Update card with new analysis
-        from bson import ObjectId
         self.cards.update_one(
-            {'_id': ObjectId(task['card_id'])},
+            {'_id': card_oid},
             {
                 '$set': validated_components,
-                '$inc': {'analysis.component_count': len(results.get('components', {}))},
+                '$inc': {
+                    'analysis.component_count': len(results.get('components', {})),
+                    'analysis.quality.sum': quality['sum'],
+                    'analysis.quality.count': quality['count'],
+                    'analysis.quality.high_count': quality['high_count']
+                },
                 '$currentDate': {'analysis.last_updated': True}
             }
         )
         
         # Check if card is now fully analyzed
-        updated_card = self.cards.find_one({'_id': ObjectId(task['card_id'])})
+        updated_card = self.cards.find_one({'_id': card_oid})
         if updated_card and 'analysis' in updated_card and 'components' in updated_card['analysis']:
             all_components = set(self.GPU_COMPONENTS + self.CPU_HEAVY_COMPONENTS + self.BALANCED_COMPONENTS)
             existing_components = set(updated_card['analysis']['components'].keys())
             
             if existing_components >= all_components:
                 self.cards.update_one(
-                    {'_id': ObjectId(task['card_id'])},
+                    {'_id': card_oid},
                     {'$set': {'analysis.fully_analyzed': True}}
                 )
+            
+            self._record_submission_stats(card, existing_components, existing_components >= all_components, quality)
+            invalidate_home_page()
+            invalidate_card_details([card_oid])
+            if existing_components >= all_components:
+                warm_card_details([card_oid])
+            
+            # Release the queue lease (requeues the card if components are still missing)
+            self.queue.complete(
+                card_oid, task_id,
+                [component for component in self.queue_components() if component not in existing_components]
+            )
         
         # Mark task as completed
         self.tasks.update_one(
@@ -532,18 +656,10 @@ class EnhancedSwarmManager:
             pending_tasks = self.tasks.count_documents({'status': 'assigned'})
             completed_tasks = self.tasks.count_documents({'status': 'completed'})
             
-            total_cards = self.cards.count_documents({})            # Count analyzed cards using comprehensive criteria
-            # This catches all cards with ANY analysis components from both legacy and new formats
-            analyzed_cards = self.cards.count_documents({
-                '$or': [
-                    {'analysis.components': {'$exists': True, '$ne': {}}},  # Cards with analysis components
-                    {'analysis.component_count': {'$gt': 0}},  # Cards with component count > 0  
-                    {'analysis.fully_analyzed': True},  # Fully analyzed cards
-                    {'analysis.analysis_completed_at': {'$exists': True, '$ne': None}},  # Legacy completed
-                    {'fully_analyzed': True},  # Legacy fully_analyzed field
-                    {'analysis_completed_at': {'$exists': True, '$ne': None}}  # Legacy analysis_completed_at
-                ]
-            })
+            # Card counts come from the materialized analysis_stats document
+            card_stats = analysis_stats.get()
+            total_cards = card_stats['total_cards']
+            analyzed_cards = card_stats['cards_with_components']
             
             # Priority queue stats
             high_priority_pending = self.priority_cache.count_documents({
@@ -592,208 +708,312 @@ class EnhancedSwarmManager:
                 'cards': {'total': 0, 'analyzed': 0, 'completion_rate': '0%'}
             }
 
-    def get_work(self, worker_id: str) -> List[Dict[str, Any]]:
-        """Get work assignments - TRUE RANDOM card selection (NO EDHREC PRIORITY)"""
+    def get_work(self, worker_id: str, max_tasks: int = 1,
+                 max_components: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Lease up to max_tasks cards from the swarm queue in one call.
+        
+        Every card gets its own lease and task_id, and each lease is settled
+        independently:
+        - submitting a task closes only that task's lease;
+        - a submission covering some of the task's components stores them and
+          requeues the card with just the missing components;
+        - a task never submitted is requeued when its lease_expires_at passes.
+        
+        max_components optionally caps the batch by work instead of by cards:
+        leasing stops once the leased tasks hold at least that many components.
+        """
         try:
-            enhanced_swarm_logger.info(f"Getting RANDOM work for worker {worker_id}")
-            
             # Update worker heartbeat
             self.workers.update_one(
                 {'worker_id': worker_id},
                 {'$set': {'last_heartbeat': datetime.now(timezone.utc)}}
             )
             
-            # Get ALL 20 components (fixed list)
-            all_components = (
-                self.GPU_COMPONENTS + 
-                self.CPU_HEAVY_COMPONENTS + 
-                self.BALANCED_COMPONENTS
-            )
-    
-            # Use MongoDB $sample for TRUE RANDOM selection
-            pipeline = [
-                {
-                    '$match': {
-                        '$or': [
-                            {'analysis.fully_analyzed': {'$ne': True}},
-                            {'analysis': {'$exists': False}},
-                            {'analysis.component_count': {'$lt': 20}}
-                        ]
-                    }
-                },
-                {'$sample': {'size': 1}},  # TRUE RANDOM - MongoDB native random sampling
-                {
-                    '$project': {
-                        '_id': 1,
-                        'name': 1,
-                        'manaCost': 1,
-                        'type': 1,
-                        'text': 1,
-                        'power': 1,
-                        'toughness': 1
-                    }
-                }
-            ]
+            max_tasks = max(1, min(int(max_tasks or 1), self.MAX_LEASE_BATCH))
+            
+            tasks = []
+            leased_components = 0
+            while len(tasks) < max_tasks:
+                if max_components and leased_components >= max_components:
+                    break
+                task_id = f"task_{uuid.uuid4().hex[:16]}"
+                entry = self.queue.claim(worker_id, task_id)
+                if not entry:
+                    break
+                task = self._create_task_from_lease(entry, worker_id)
+                tasks.append(task)
+                leased_components += len(task['components'])
             
-            unanalyzed_cards = list(self.cards.aggregate(pipeline))
-    
-            if not unanalyzed_cards:
+            if not tasks:
                 enhanced_swarm_logger.info(f"No remaining work - all cards analyzed!")
                 return []
-    
-            card = unanalyzed_cards[0]
-            card_name = card.get('name', 'Unknown')
-            card_id = str(card['_id'])
-            
-            # FIXED: Generate simple task ID without uuid4
-            import time
-            import random
-            task_id = f"task_{int(time.time())}_{random.randint(1000, 9999)}"
-            
-            task = {
-                'task_id': task_id,
-                'card_id': card_id,
-                'card_name': card_name,
-                'assigned_to': worker_id,
-                'status': 'assigned',
-                'created_at': datetime.now(timezone.utc),
-                'components': all_components,
-                'card_data': {
-                    'name': card.get('name', ''),
-                    'manaCost': card.get('manaCost', ''),
-                    'type': card.get('type', ''),
-                    'text': card.get('text', ''),
-                    'power': card.get('power', ''),
-                    'toughness': card.get('toughness', '')
-                }
-            }
             
-            # Store the assignment
-            self.tasks.insert_one(task)
+            # Store the assignments
+            self.tasks.insert_many(tasks)
             
-            enhanced_swarm_logger.info(f"RANDOM ASSIGNMENT: {card_name} -> {worker_id}")
-            enhanced_swarm_logger.info(f"Task ID: {task_id}, Card ID: {card_id}")
+            enhanced_swarm_logger.info(
+                f"LEASED {len(tasks)} card(s) -> {worker_id}: "
+                f"{', '.join(task['card_name'] for task in tasks)}"
+            )
             
-            return [task]
+            return tasks
             
         except Exception as e:
             enhanced_swarm_logger.error(f"Error getting work: {e}")
             return []
+    
+    def _create_task_from_lease(self, entry: Dict[str, Any], worker_id: str) -> Dict[str, Any]:
+        """Build the swarm_tasks record for a leased queue entry"""
+        return {
+            'task_id': entry['task_id'],
+            'card_id': str(entry['_id']),
+            'card_oid': entry['_id'],
+            'card_uuid': entry.get('card_uuid'),
+            'card_name': entry.get('card_name', 'Unknown'),
+            'assigned_to': worker_id,
+            'status': 'assigned',
+            'created_at': entry['leased_at'],
+            'lease_expires_at': entry['lease_expires_at'],
+            'components': entry.get('components') or self.queue_components(),
+            'card_data': entry.get('card_data', {})
+        }
+    
+    def queue_components(self) -> List[str]:
+        """All 20 components, in assignment order"""
+        return self.GPU_COMPONENTS + self.CPU_HEAVY_COMPONENTS + self.BALANCED_COMPONENTS
             
 
     def submit_task_result(self, task_id: str, worker_id: str, card_id: str, results: Dict[str, Any]) -> bool:
-        """Submit task results with robust card lookup"""
+        """Submit one task's results; the card is resolved from the task's canonical id"""
         try:
             enhanced_swarm_logger.info(f"📥 Receiving results from worker {worker_id} for card {card_id}")
-            
-            # Find the task
-            task = self.tasks.find_one({'task_id': task_id})
-            if not task:
-                enhanced_swarm_logger.error(f"❌ Task {task_id} not found")
-                return False
-            
-            # Find the card using multiple lookup methods
-            card = None
-            
-            # Method 1: Try by uuid
-            if card_id:
-                card = self.cards.find_one({'uuid': card_id})
-            
-            # Method 2: Try by MongoDB _id
-            if not card:
-                try:
-                    from bson import ObjectId
-                    card = self.cards.find_one({'_id': ObjectId(card_id)})
-                except:
-                    pass
-            
-            # Method 3: Try by task's card_uuid
-            if not card and 'card_uuid' in task:
-                card = self.cards.find_one({'uuid': task['card_uuid']})
-            
-            # Method 4: Try by task's card_id  
-            if not card and 'card_id' in task:
-                try:
-                    from bson import ObjectId
-                    card = self.cards.find_one({'_id': ObjectId(task['card_id'])})
-                except:
-                    pass
-            
-            # Method 5: Last resort - find by name
-            if not card and 'card_name' in task:
-                card = self.cards.find_one({'name': task['card_name']})
-            
-            if not card:
-                enhanced_swarm_logger.error(f"❌ Card not found for task {task_id}")
+            status = self.submit_task_results_bulk(
+                worker_id, [{'task_id': task_id, 'card_id': card_id, 'results': results}]
+            )[0]
+            if status['status'] != 'success':
+                enhanced_swarm_logger.error(f"❌ Task {task_id}: {status.get('message')}")
                 return False
+            return True
             
-            enhanced_swarm_logger.info(f"✅ Found card {card.get('name')} for result submission")
-              # Update card with new analysis
-            analysis_update = {}
-            component_count = 0
-            
-            if 'results' in results and isinstance(results['results'], dict):
-                for component_type, content in results['results'].items():
-                    if content and content != 'placeholder':  # Skip placeholder content
-                        analysis_update[f'analysis.components.{component_type}'] = {
-                            'content': content,
-                            'generated_at': datetime.now(timezone.utc),
-                            'generated_by': worker_id,
-                            'coherence_score': 0.8  # Default coherence score
-                        }
-                        component_count += 1
-            
-            # Calculate total components after update
-            existing_components = card.get('analysis', {}).get('components', {})
-            total_components_after = len(existing_components) + component_count
-            
-            # Prepare card update
-            card_update = {
-                '$set': analysis_update,
-                '$inc': {'analysis.component_count': component_count},
-                '$currentDate': {'analysis.last_updated': True}
+        except Exception as e:
+            enhanced_swarm_logger.error(f"❌ Submit task result failed: {str(e)}")
+            return False
+
+    def _record_submission_stats(self, card_before: Dict[str, Any], components_after: set,
+                                 fully_analyzed: bool, quality: Dict[str, float]) -> None:
+        """Update analysis_stats for a single stored result, given the card as it was before the write"""
+        analysis = card_before.get('analysis') or {}
+        components_before = analysis.get('components') if isinstance(analysis.get('components'), dict) else {}
+        now = datetime.now(timezone.utc)
+        last_updated = analysis.get('last_updated')
+        if last_updated is not None and last_updated.tzinfo is None:
+            last_updated = last_updated.replace(tzinfo=timezone.utc)
+        analysis_stats.record_submission(
+            new_components=len(set(components_after) - set(components_before)),
+            new_cards_with_components=int(not components_before and bool(components_after)),
+            newly_fully_analyzed=int(fully_analyzed and analysis.get('fully_analyzed') is not True),
+            cards_first_today=int(
+                last_updated is None or last_updated < now.replace(hour=0, minute=0, second=0, microsecond=0)
+            ),
+            quality_sum=quality['sum'],
+            quality_count=quality['count'],
+            quality_high_count=quality['high_count'],
+            when=now
+        )
+
+    def _extract_result_components(self, results: Dict[str, Any]) -> Dict[str, str]:
+        """Pull component texts out of a worker payload.
+        
+        Workers send them under 'components' (v3 worker) or 'results' (older
+        workers); empty and placeholder texts are dropped.
+        """
+        components = results.get('components')
+        if not isinstance(components, dict):
+            components = results.get('results')
+        if not isinstance(components, dict):
+            return {}
+        return {
+            component_type: content
+            for component_type, content in components.items()
+            if content and content != 'placeholder'
+        }
+    
+    def release_tasks(self, worker_id: str, task_ids: List[str]) -> int:
+        """Requeue cards a worker leased but will not process; returns how many were released"""
+        released = self.queue.release(worker_id, task_ids)
+        if task_ids:
+            self.tasks.update_many(
+                {'task_id': {'$in': list(task_ids)}, 'assigned_to': worker_id, 'status': 'assigned'},
+                {'$set': {'status': 'released', 'released_at': datetime.now(timezone.utc)}}
+            )
+        enhanced_swarm_logger.info(f"RELEASED {released}/{len(task_ids)} lease(s) from {worker_id}")
+        return released
+    
+    def submit_task_results_bulk(self, worker_id: str, submissions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Store many task results with a fixed number of round trips.
+        
+        Tasks are fetched with one query and their cards with one aggregation
+        (component names only), keyed by the canonical card _id resolved from
+        the task.
+        All card, task, queue and worker mutations are then applied with
+        unordered bulk_writes. Returns one status dict per submission, in the
+        order given.
+        """
+        now = datetime.now(timezone.utc)
+        statuses = [{'task_id': sub.get('task_id'), 'status': 'error'} for sub in submissions]
+        
+        task_ids = [sub.get('task_id') for sub in submissions if sub.get('task_id')]
+        tasks_by_id = {
+            task['task_id']: task
+            for task in self.tasks.find(
+                {'task_id': {'$in': task_ids}},
+                {'task_id': 1, 'card_oid': 1, 'card_id': 1, 'card_uuid': 1, 'assigned_to': 1, 'card_name': 1, 'status': 1}
+            )
+        }
+        
+        # Validate submissions and resolve the canonical card _id for each
+        accepted = []
+        for index, sub in enumerate(submissions):
+            task = tasks_by_id.get(sub.get('task_id'))
+            if not task:
+                statuses[index]['message'] = 'Task not found'
+                continue
+            if task.get('assigned_to') != worker_id:
+                statuses[index]['message'] = 'Task not assigned to this worker'
+                continue
+            card_oid = card_identity.resolve_task(task, hint=sub.get('card_id'))
+            if card_oid is None:
+                statuses[index]['message'] = 'Card not found'
+                continue
+            components = self._extract_result_components(sub.get('results') or {})
+            if not components:
+                statuses[index]['message'] = 'No valid analysis content'
+                continue
+            accepted.append((index, task, card_oid, components, sub.get('results') or {}))
+        
+        if not accepted:
+            return statuses
+        
+        existing_by_card = {
+            card['_id']: {
+                'name': card.get('name'),
+                # component name -> stored coherence_score
+                'components': {entry['k']: entry.get('s') for entry in card.get('component_scores') or []},
+                'fully_analyzed': card.get('fully_analyzed') is True,
+                'last_updated': card.get('last_updated')
             }
+            for card in self.cards.aggregate([
+                {'$match': {'_id': {'$in': list({item[2] for item in accepted})}}},
+                {'$project': {
+                    'name': 1,
+                    'fully_analyzed': '$analysis.fully_analyzed',
+                    'last_updated': '$analysis.last_updated',
+                    'component_scores': {'$map': {
+                        'input': {'$objectToArray': {'$ifNull': ['$analysis.components', {}]}},
+                        'in': {'k': '$$this.k', 's': '$$this.v.coherence_score'}
+                    }}
+                }}
+            ])
+        }
+        
+        card_ops, task_ops, completions, completed_cards = [], [], [], []
+        all_components = self.queue_components()
+        today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        stats_delta = defaultdict(int)
+        for index, task, card_oid, components, results in accepted:
+            card = existing_by_card.get(card_oid)
+            if card is None:
+                statuses[index]['message'] = 'Card not found'
+                continue
             
-            # If we now have 20 components, mark as fully analyzed
-            if total_components_after >= 20:
-                card_update['$set']['analysis.fully_analyzed'] = True
-                card_update['$set']['analysis.analysis_completed_at'] = datetime.now(timezone.utc)
-                enhanced_swarm_logger.info(f"🎉 Card {card.get('name')} is now FULLY ANALYZED with {total_components_after} components!")
-            
-            if analysis_update:
-                self.cards.update_one({'_id': card['_id']}, card_update)
-                enhanced_swarm_logger.info(f"📊 Updated {card.get('name')} with {component_count} new components (total: {total_components_after})")
-            else:
-                enhanced_swarm_logger.warning(f"⚠️ No valid analysis content received for {card.get('name')}")
-            
-            # Mark task as completed
-            self.tasks.update_one(
-                {'task_id': task_id},
-                {
-                    '$set': {
-                        'status': 'completed',
-                        'completed_at': datetime.now(timezone.utc)
-                    }
+            coherence_score = 0.8  # Default coherence score
+            new_scores = {component_type: coherence_score for component_type in components}
+            quality = quality_delta(card['components'], new_scores)
+            
+            had_components = bool(card['components'])
+            new_count = len([name for name in components if name not in card['components']])
+            card['components'].update(new_scores)
+            fully_analyzed = len(card['components']) >= 20
+            
+            # Counter changes for the materialized analysis_stats document
+            last_updated = card['last_updated']
+            if last_updated is not None and last_updated.tzinfo is None:
+                last_updated = last_updated.replace(tzinfo=timezone.utc)
+            stats_delta['new_components'] += new_count
+            stats_delta['new_cards_with_components'] += int(not had_components and bool(card['components']))
+            stats_delta['newly_fully_analyzed'] += int(fully_analyzed and not card['fully_analyzed'])
+            stats_delta['cards_first_today'] += int(last_updated is None or last_updated < today_start)
+            stats_delta['quality_sum'] += quality['sum']
+            stats_delta['quality_count'] += quality['count']
+            stats_delta['quality_high_count'] += quality['high_count']
+            card['fully_analyzed'] = card['fully_analyzed'] or fully_analyzed
+            card['last_updated'] = now
+            
+            analysis_update = {
+                f'analysis.components.{component_type}': {
+                    'content': content,
+                    'generated_at': now,
+                    'generated_by': worker_id,
+                    'model_info': results.get('model_info', {}),
+                    'coherence_score': coherence_score
                 }
-            )
+                for component_type, content in components.items()
+            }
+            if fully_analyzed:
+                analysis_update['analysis.fully_analyzed'] = True
+                analysis_update['analysis.analysis_completed_at'] = now
+                completed_cards.append(card_oid)
             
-            # Update worker stats
+            card_ops.append(UpdateOne({'_id': card_oid}, {
+                '$set': analysis_update,
+                '$inc': {
+                    'analysis.component_count': new_count,
+                    'analysis.quality.sum': quality['sum'],
+                    'analysis.quality.count': quality['count'],
+                    'analysis.quality.high_count': quality['high_count']
+                },
+                '$currentDate': {'analysis.last_updated': True}
+            }))
+            task_ops.append(UpdateOne({'task_id': task['task_id']}, {'$set': {
+                'status': 'completed',
+                'completed_at': now,
+                'execution_time': results.get('execution_time', 0)
+            }}))
+            completions.append((
+                card_oid, task['task_id'],
+                [component for component in all_components if component not in card['components']]
+            ))
+            statuses[index].update({
+                'status': 'success',
+                'card_id': str(card_oid),
+                'components_stored': len(components),
+                'fully_analyzed': fully_analyzed
+            })
+        
+        if card_ops:
+            self.cards.bulk_write(card_ops, ordered=False)
+            self.tasks.bulk_write(task_ops, ordered=False)
+            self.queue.complete_many(completions)
             self.workers.update_one(
                 {'worker_id': worker_id},
-                {'$inc': {'tasks_completed': 1}}
+                {'$inc': {'tasks_completed': len(card_ops)}}
             )
-            
-            enhanced_swarm_logger.info(f"✅ Results processed successfully for card {card.get('name')}")
-            return True
-            
-        except Exception as e:
-            enhanced_swarm_logger.error(f"❌ Submit task result failed: {str(e)}")
-            return False
+            analysis_stats.record_submission(when=now, **stats_delta)
+            invalidate_home_page()
+            invalidate_card_details(card_oid for card_oid, _, _ in completions)
+            warm_card_details(completed_cards)
+        
+        enhanced_swarm_logger.info(
+            f"📥 Bulk submission from {worker_id}: {len(card_ops)}/{len(submissions)} tasks stored"
+        )
+        return statuses
 
-# Global instance
-enhanced_swarm = EnhancedSwarmManager()
+# Global instance - built on first use so importing this module (views, API,
+# dashboard) never touches the database
+enhanced_swarm = SimpleLazyObject(EnhancedSwarmManager)
 
 if __name__ == "__main__":
+    django.setup()
     enhanced_swarm_logger.info("Enhanced Swarm Manager initialized")
     status = enhanced_swarm.get_enhanced_swarm_status()
     enhanced_swarm_logger.info(f"Current status: {json.dumps(status, indent=2, default=str)}")
@@ -0,0 +1,126 @@
+"""
+Single-pass result statistics for card listings.
+
+One $facet aggregation returns the total count, price min/avg/max and
+color/rarity/type/set facet counts, instead of a count_documents and a
+price $group. The page of rows is always a separate keyset find: a $sort
+inside a $facet branch cannot use an index and would sort the whole match
+set in memory. The statistics depend only on the query, so they are cached
+per query signature; while they are cached, a page costs the find alone.
+"""
+
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.core.cache import cache
+
+from .pagination import keyset_page, keyset_plan, page_cursors, query_signature
+
+logger = logging.getLogger(__name__)
+
+# Seconds cached statistics are reused
+STATS_CACHE_TTL = 300
+
+# Facet buckets kept per facet (sets can run into the hundreds)
+MAX_FACET_BUCKETS = 50
+
+
+def _bucket_pipeline(field: str, unwind: bool = False, missing: Any = None) -> List[Dict[str, Any]]:
+    pipeline = []
+    if unwind:
+        pipeline.append({'$unwind': {'path': f'${field}', 'preserveNullAndEmptyArrays': missing is not None}})
+    pipeline += [
+        {'$group': {'_id': {'$ifNull': [f'${field}', missing]}, 'count': {'$sum': 1}}},
+        {'$sort': {'count': -1}},
+        {'$limit': MAX_FACET_BUCKETS},
+    ]
+    return pipeline
+
+
+def stats_facets(price_field: str, facets: bool = True) -> Dict[str, List[Dict[str, Any]]]:
+    """$facet sub-pipelines for the count, price statistics and (optionally) facet counts."""
+    pipelines = {
+        'total': [{'$count': 'count'}],
+        'price': [
+            {'$match': {price_field: {'$gt': 0}}},
+            {'$group': {
+                '_id': None,
+                'avg_price': {'$avg': f'${price_field}'},
+                'min_price': {'$min': f'${price_field}'},
+                'max_price': {'$max': f'${price_field}'},
+                'count_with_price': {'$sum': 1},
+            }},
+        ],
+    }
+    if facets:
+        pipelines.update({
+            # Cards with no colors are counted as colorless
+            'colors': _bucket_pipeline('colors', unwind=True, missing='C'),
+            'rarity': _bucket_pipeline('rarity'),
+            'type': _bucket_pipeline('types', unwind=True),
+            'set': _bucket_pipeline('setCode'),
+        })
+    return pipelines
+
+
+def _parse_stats(result: Dict[str, Any]) -> Dict[str, Any]:
+    total = result['total'][0]['count'] if result.get('total') else 0
+    price = result['price'][0] if result.get('price') else None
+    facets = {
+        name: {str(bucket['_id']): bucket['count'] for bucket in result.get(name, []) if bucket['_id'] is not None}
+        for name in ('colors', 'rarity', 'type', 'set')
+    }
+    price_stats = None
+    if price and price.get('count_with_price'):
+        price_stats = {
+            'average': price['avg_price'],
+            'minimum': price['min_price'],
+            'maximum': price['max_price'],
+            'count_with_price': price['count_with_price'],
+        }
+    return {'total': total, 'price_stats': price_stats, 'facets': facets}
+
+
+def faceted_page(collection, query: Dict[str, Any], sort: List[Tuple[str, int]], per_page: int,
+                 cursor: Optional[Dict[str, Any]] = None, skip: int = 0,
+                 price_field: str = 'prices.usd', projection: Optional[Dict[str, Any]] = None,
+                 facets: bool = True) -> Dict[str, Any]:
+    """One page of query results plus total, price stats and facet counts.
+
+    Pages are fetched by keyset when a cursor is given, otherwise with skip,
+    and trimmed to projection if one is given. facets=False skips the four
+    facet group branches (facets come back empty) for pages that show none.
+    Returns the keyset_page() result extended with total/price_stats/facets.
+    """
+    key = f'facets:{query_signature(collection.name, {"q": query, "price": price_field, "facets": facets})}'
+    try:
+        stats = cache.get(key)
+    except Exception as e:
+        logger.warning(f"Facet cache unavailable: {e}")
+        stats = None
+
+    # Rows come from an index-backed sort; one extra row tells whether there is another page
+    mongo_query, fetch_sort = keyset_plan(query, sort, cursor)
+    rows = collection.find(mongo_query, projection).sort(fetch_sort)
+    if not cursor and skip:
+        rows = rows.skip(skip)
+    docs = list(rows.limit(per_page + 1))
+
+    if stats is None:
+        result = next(collection.aggregate([
+            {'$match': query},
+            {'$facet': stats_facets(price_field, facets)},
+        ], allowDiskUse=True), {})
+        stats = _parse_stats(result)
+        try:
+            cache.set(key, stats, STATS_CACHE_TTL)
+        except Exception as e:
+            logger.warning(f"Facet cache unavailable: {e}")
+
+    if cursor or not skip:
+        page = keyset_page(docs, sort, per_page, cursor)
+    else:
+        number = skip // per_page + 1
+        page = {'docs': docs[:per_page], 'page': number,
+                **page_cursors(docs[:per_page], sort, number, True, len(docs) > per_page)}
+    return {**page, **stats}
@@ -0,0 +1,164 @@
+"""
+Pre-shuffled art gallery pool.
+
+The gallery used to run $sample over every card with art on each view.
+Instead, each process keeps a compact, shuffled list of the cards with
+art_crop images and serves pages as slices of it, so a gallery view needs
+no Mongo reads at all. The pool is rebuilt in the background every
+refresh_interval seconds.
+
+Pages are deterministic for a seed: the seed picks a starting offset and a
+stride through the pool, so infinite scroll can ask for page 2, 3, ... of
+the same seed without repeating cards until the pool is exhausted.
+"""
+
+import logging
+import math
+import random
+import threading
+import time
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from django.conf import settings
+
+from .models import get_mongodb_collection
+
+logger = logging.getLogger(__name__)
+
+
+def get_gallery_setting(name: str, default: Any) -> Any:
+    """Read a value from settings.GALLERY_POOL_SETTINGS with a default."""
+    return getattr(settings, 'GALLERY_POOL_SETTINGS', {}).get(name, default)
+
+
+class GalleryCard(NamedTuple):
+    uuid: str
+    name: str
+    artist: str
+    set_code: str
+    set_name: str
+    rarity: str
+    type: str
+    art_url: str
+    image_url: str
+    is_analyzed: bool
+
+    def as_dict(self) -> Dict[str, Any]:
+        """The card dict the art gallery template expects."""
+        return {
+            'uuid': self.uuid,
+            'name': self.name,
+            'artist': self.artist,
+            'setCode': self.set_code,
+            'setName': self.set_name,
+            'rarity': self.rarity,
+            'type': self.type,
+            'is_analyzed': self.is_analyzed,
+            'detail_url': f'/card/{self.uuid}/',
+            'art_url': self.art_url,
+            'imageUris': {'art_crop': self.art_url, 'large': self.image_url, 'normal': self.image_url},
+        }
+
+
+class GalleryPool:
+    """Shuffled in-memory pool of gallery cards"""
+
+    PROJECTION = {
+        'uuid': 1, 'name': 1, 'artist': 1, 'setCode': 1, 'setName': 1, 'rarity': 1, 'type': 1,
+        'imageUris.art_crop': 1, 'imageUris.large': 1, 'imageUris.normal': 1,
+        'analysis.component_count': 1,
+    }
+
+    def __init__(self):
+        self._cards: List[GalleryCard] = []
+        self._built_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self.refresh_interval = int(get_gallery_setting('refresh_interval', 3600))
+
+    @property
+    def ready(self) -> bool:
+        return self._built_at is not None
+
+    def refresh(self) -> int:
+        """Rebuild the pool from the cards collection and shuffle it."""
+        started = time.time()
+        cards = get_mongodb_collection('cards')
+        pool = []
+        for card in cards.find({'imageUris.art_crop': {'$exists': True}}, self.PROJECTION):
+            if not card.get('uuid'):
+                continue
+            images = card.get('imageUris') or {}
+            pool.append(GalleryCard(
+                uuid=card['uuid'],
+                name=card.get('name', ''),
+                artist=card.get('artist', 'Unknown Artist'),
+                set_code=card.get('setCode', ''),
+                set_name=card.get('setName', ''),
+                rarity=card.get('rarity', ''),
+                type=card.get('type', ''),
+                art_url=images['art_crop'],
+                image_url=images.get('large') or images.get('normal', ''),
+                is_analyzed=bool((card.get('analysis') or {}).get('component_count')),
+            ))
+        random.shuffle(pool)
+        with self._lock:
+            self._cards = pool
+            self._built_at = time.time()
+        logger.info(f"Gallery pool refreshed: {len(pool):,} cards in {time.time() - started:.1f}s")
+        return len(pool)
+
+    def _refresh_in_background(self) -> None:
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def refresh():
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error(f"Gallery pool refresh failed: {e}")
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=refresh, name='gallery-pool-refresh', daemon=True).start()
+
+    def page(self, seed: Optional[int] = None, page: int = 1, per_page: int = 100) -> Dict[str, Any]:
+        """One page of gallery cards for seed (a random seed if None).
+
+        Raises RuntimeError until the first build has finished; that build
+        is started in the background by the first call.
+        """
+        if self._built_at is None or time.time() - self._built_at > self.refresh_interval:
+            self._refresh_in_background()
+        if self._built_at is None:
+            raise RuntimeError('Gallery pool is still building')
+
+        cards = self._cards
+        size = len(cards)
+        if seed is None:
+            seed = random.randrange(2 ** 31)
+        page = max(page, 1)
+
+        # Walk the pool from a seeded offset with a seeded stride coprime to its size
+        rng = random.Random(seed)
+        start = rng.randrange(size) if size else 0
+        stride = rng.randrange(1, size) if size > 1 else 1
+        while size > 1 and math.gcd(stride, size) != 1:
+            stride = stride % (size - 1) + 1
+
+        first = (page - 1) * per_page
+        last = min(first + per_page, size)
+        selected = [cards[(start + i * stride) % size] for i in range(first, last)]
+        return {
+            'cards': [card.as_dict() for card in selected],
+            'seed': seed,
+            'page': page,
+            'has_next': last < size,
+            'pool_size': size,
+        }
+
+
+# Global instance
+gallery_pool = GalleryPool()
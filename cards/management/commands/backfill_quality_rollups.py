@@ -0,0 +1,62 @@
+"""
+Rebuild the per-card analysis.quality rollups from stored components.
+
+Result submission keeps analysis.quality.{sum,count,high_count} current for
+new results; this computes it for cards analyzed before the rollups existed
+(or repairs drift), then reconciles the global accumulator in analysis_stats.
+"""
+
+from django.core.management.base import BaseCommand
+from pymongo import UpdateOne
+
+from cards.analysis_stats import analysis_stats, quality_rollup
+from cards.models import get_mongodb_collection
+
+
+class Command(BaseCommand):
+    help = 'Backfill per-card coherence quality rollups (analysis.quality)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Cards updated per bulk write',
+        )
+
+    def handle(self, *args, **options):
+        cards = get_mongodb_collection('cards')
+        batch_size = options['batch_size']
+
+        updated = 0
+        operations = []
+        cursor = cards.aggregate([
+            {'$match': {'analysis.components': {'$exists': True, '$ne': {}}}},
+            {'$project': {
+                'scores': {'$map': {
+                    'input': {'$objectToArray': '$analysis.components'},
+                    'in': '$$this.v.coherence_score'
+                }}
+            }}
+        ], allowDiskUse=True)
+        for card in cursor:
+            operations.append(UpdateOne(
+                {'_id': card['_id']},
+                {'$set': {'analysis.quality': quality_rollup(card.get('scores') or [])}}
+            ))
+            if len(operations) >= batch_size:
+                updated += cards.bulk_write(operations, ordered=False).modified_count
+                operations = []
+
+        if operations:
+            updated += cards.bulk_write(operations, ordered=False).modified_count
+
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt quality rollups on {updated:,} cards'))
+
+        stats = analysis_stats.reconcile()
+        count = stats['quality_count']
+        self.stdout.write(
+            f"Global: {count:,} scored components, "
+            f"avg {stats['quality_sum'] / count if count else 0:.3f}, "
+            f"{stats['quality_high_count']:,} high coherence"
+        )
@@ -0,0 +1,68 @@
+"""
+Record the canonical card _id (card_oid) on every swarm task.
+
+Older tasks only carry card_uuid, a card_id string or just card_name. This
+resolves each one once through the card identity index and stores the
+result, so result submission can always address the card by _id. Name
+matching is only used here, for legacy tasks, and only with --use-names.
+"""
+
+from django.core.management.base import BaseCommand
+from pymongo import UpdateOne
+
+from cards.card_identity import card_identity
+from cards.models import get_mongodb_collection
+
+
+class Command(BaseCommand):
+    help = 'Backfill the canonical card_oid on swarm_tasks'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Tasks updated per bulk write',
+        )
+        parser.add_argument(
+            '--use-names',
+            action='store_true',
+            help='Fall back to an exact card name match for tasks with no usable id',
+        )
+
+    def handle(self, *args, **options):
+        tasks = get_mongodb_collection('swarm_tasks')
+        cards = get_mongodb_collection('cards')
+        batch_size = options['batch_size']
+
+        card_identity.warm()
+
+        updated = unresolved = 0
+        operations = []
+        cursor = tasks.find(
+            {'card_oid': {'$exists': False}},
+            {'card_id': 1, 'card_uuid': 1, 'card_name': 1}
+        )
+        for task in cursor:
+            card_oid = card_identity.resolve_task(task)
+            if card_oid is None and options['use_names'] and task.get('card_name'):
+                card = cards.find_one({'name': task['card_name']}, {'_id': 1})
+                card_oid = card['_id'] if card else None
+            if card_oid is None:
+                unresolved += 1
+                continue
+
+            operations.append(UpdateOne(
+                {'_id': task['_id']},
+                {'$set': {'card_oid': card_oid, 'card_id': str(card_oid)}}
+            ))
+            if len(operations) >= batch_size:
+                updated += tasks.bulk_write(operations, ordered=False).modified_count
+                operations = []
+
+        if operations:
+            updated += tasks.bulk_write(operations, ordered=False).modified_count
+
+        self.stdout.write(self.style.SUCCESS(f'Recorded card_oid on {updated:,} tasks'))
+        if unresolved:
+            self.stdout.write(self.style.WARNING(f'{unresolved:,} tasks could not be resolved to a card'))
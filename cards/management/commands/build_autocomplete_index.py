@@ -0,0 +1,39 @@
+"""
+Build the autocomplete snapshot read by cards/autocomplete.py.
+
+Web processes load the snapshot at first use instead of scanning the cards
+collection, so run this after imports (or from cron) to refresh it.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from cards.autocomplete import autocomplete_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the autocomplete index snapshot from the cards collection'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--query',
+            action='append',
+            default=[],
+            help='Print suggestions for this prefix after building (repeatable)',
+        )
+
+    def handle(self, *args, **options):
+        count = autocomplete_index.build()
+        self.stdout.write(self.style.SUCCESS(
+            f'Wrote {count:,} entries to {autocomplete_index.snapshot_path}'
+        ))
+
+        for query in options['query']:
+            started = time.perf_counter()
+            suggestions = autocomplete_index.suggest(query)
+            elapsed = (time.perf_counter() - started) * 1000
+            self.stdout.write(f"{query!r} ({elapsed:.2f}ms):")
+            for suggestion in suggestions:
+                marker = ' ~' if suggestion.get('fuzzy') else ''
+                self.stdout.write(f"  [{suggestion['type']}] {suggestion['text']}{marker}")
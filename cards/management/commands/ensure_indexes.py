@@ -0,0 +1,121 @@
+"""
+Create and audit the MongoDB indexes declared in cards/mongo_indexes.py.
+
+By default every registered index is created (existing ones are left as
+they are). --check only lists registered indexes that are missing,
+--usage reports $indexStats access counts so unused and unregistered
+indexes stand out, and --explain prints the winning plan for the hot view
+and swarm queries.
+"""
+
+from django.core.management.base import BaseCommand
+from pymongo.errors import OperationFailure
+
+from cards.mongo_indexes import (
+    INDEXES, ensure_collection_indexes, explain_query, hot_queries, index_usage, missing_indexes
+)
+
+
+class Command(BaseCommand):
+    help = 'Create the registered MongoDB indexes and report unused/missing ones'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--collection',
+            action='append',
+            choices=sorted(INDEXES),
+            help='Limit to one collection (repeatable)',
+        )
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Only report missing indexes, do not create anything',
+        )
+        parser.add_argument(
+            '--usage',
+            action='store_true',
+            help='Report index access counts from $indexStats',
+        )
+        parser.add_argument(
+            '--explain',
+            action='store_true',
+            help='Print explain plans for the hot view/swarm queries',
+        )
+
+    def handle(self, *args, **options):
+        collections = options['collection'] or sorted(INDEXES)
+
+        for name in collections:
+            if options['check']:
+                self._report_missing(name)
+            else:
+                self._create(name)
+
+        if options['usage']:
+            self.stdout.write('')
+            for name in collections:
+                self._report_usage(name)
+
+        if options['explain']:
+            self.stdout.write('')
+            for query in hot_queries():
+                if query['collection'] in collections:
+                    self._report_explain(query)
+
+    def _create(self, name):
+        missing = missing_indexes(name)
+        result = ensure_collection_indexes(name, force=True)
+        created = [index for index in missing if index not in result['errors']]
+        self.stdout.write(self.style.SUCCESS(
+            f"{name}: {len(INDEXES[name])} registered, {len(created)} created"
+        ))
+        for index in created:
+            self.stdout.write(f"  + {index}")
+        for index, error in result['errors'].items():
+            self.stdout.write(self.style.ERROR(f"  ! {index}: {error}"))
+
+    def _report_missing(self, name):
+        missing = missing_indexes(name)
+        if not missing:
+            self.stdout.write(self.style.SUCCESS(f"{name}: all {len(INDEXES[name])} indexes present"))
+            return
+        self.stdout.write(self.style.WARNING(f"{name}: {len(missing)} missing"))
+        for index in missing:
+            self.stdout.write(f"  - {index}")
+
+    def _report_usage(self, name):
+        try:
+            usage = index_usage(name)
+        except OperationFailure as e:
+            self.stdout.write(self.style.WARNING(f"{name}: $indexStats unavailable ({e})"))
+            return
+
+        self.stdout.write(f"{name}:")
+        for row in usage:
+            notes = []
+            if not row['ops'] and row['name'] != '_id_':
+                notes.append('UNUSED')
+            if not row['registered']:
+                notes.append('not in registry')
+            line = f"  {row['name']:<50} {row['ops']:>12,} ops  {' '.join(notes)}"
+            self.stdout.write(self.style.WARNING(line) if notes else line)
+        for index in missing_indexes(name):
+            self.stdout.write(self.style.ERROR(f"  {index:<50} {'MISSING':>16}"))
+
+    def _report_explain(self, query):
+        try:
+            plan = explain_query(query)
+        except OperationFailure as e:
+            self.stdout.write(self.style.WARNING(f"{query['name']}: explain failed ({e})"))
+            return
+
+        line = (
+            f"{plan['collection']}: {plan['name']}\n"
+            f"    plan: {' <- '.join(plan['stages'])}  index: {', '.join(plan['indexes']) or '-'}\n"
+            f"    keys examined: {plan['keys_examined']}  docs examined: {plan['docs_examined']}  "
+            f"returned: {plan['returned']}  time: {plan['time_ms']}ms"
+        )
+        if plan['collection_scan'] or plan['in_memory_sort']:
+            self.stdout.write(self.style.WARNING(line))
+        else:
+            self.stdout.write(line)
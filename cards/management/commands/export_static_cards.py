@@ -0,0 +1,102 @@
+"""
+Render fully analyzed card pages to disk for StaticCardMiddleware / nginx.
+
+Incremental by default: only cards whose analysis.last_updated is newer
+than the previous run's high-water mark are re-rendered, so this is cheap
+enough to run from cron every few minutes. Every run also removes the pages
+of cards that are no longer fully analyzed (reset or cleaned up), so a stale
+analysis is never served ahead of Django.
+"""
+
+import shutil
+import time
+
+from django.core.management.base import BaseCommand
+
+from cards.models import get_cards_collection
+from cards.static_cards import (
+    BROTLI_AVAILABLE, export_root, load_state, remove_card_page, render_card_page, save_state,
+    write_card_page,
+)
+
+# Pages rendered between high-water mark checkpoints
+CHECKPOINT_EVERY = 200
+
+
+class Command(BaseCommand):
+    help = 'Export fully analyzed card detail pages as static (gzip/brotli) HTML'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Re-render every fully analyzed card (incremental runs only render cards changed since the last run)',
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=0,
+            help='Stop after this many pages (0 = no limit)',
+        )
+
+    def handle(self, *args, **options):
+        cards = get_cards_collection()
+        state = {} if options['full'] else load_state()
+        high_water_mark = state.get('high_water_mark')
+
+        query = {'analysis.fully_analyzed': True, 'uuid': {'$exists': True}}
+        if high_water_mark:
+            # $gte: cards sharing the mark's timestamp may not all have been written
+            query['analysis.last_updated'] = {'$gte': high_water_mark}
+
+        if not BROTLI_AVAILABLE:
+            self.stdout.write(self.style.WARNING('brotli is not installed - writing gzip side files only'))
+
+        started = time.time()
+        exported, skipped, total_bytes = 0, 0, 0
+        seen = set()
+        cursor = cards.find(query, {'uuid': 1, 'analysis.last_updated': 1}).sort('analysis.last_updated', 1)
+        for card in cursor:
+            uuid = card['uuid']
+            seen.add(uuid)
+            html = render_card_page(uuid)
+            if html is None:
+                skipped += 1
+                continue
+            total_bytes += write_card_page(uuid, html)
+            exported += 1
+
+            last_updated = (card.get('analysis') or {}).get('last_updated')
+            if last_updated and (high_water_mark is None or last_updated > high_water_mark):
+                high_water_mark = last_updated
+            if exported % CHECKPOINT_EVERY == 0:
+                save_state({**state, 'high_water_mark': high_water_mark})
+                self.stdout.write(f"  {exported:,} pages...")
+            if options['limit'] and exported >= options['limit']:
+                break
+        else:
+            if options['full']:
+                self._prune(seen)
+
+        if not options['full']:
+            # One distinct query: uuids whose pages may stay
+            self._prune(set(cards.distinct('uuid', {'analysis.fully_analyzed': True})))
+
+        save_state({**state, 'high_water_mark': high_water_mark, 'last_run_at': time.time()})
+        self.stdout.write(self.style.SUCCESS(
+            f'Exported {exported:,} pages ({total_bytes / 1024 / 1024:.1f} MB uncompressed, '
+            f'{skipped} skipped) to {export_root()} in {time.time() - started:.1f}s'
+        ))
+
+    def _prune(self, keep):
+        card_dir = export_root() / 'card'
+        if not card_dir.exists():
+            return
+        removed = 0
+        for page_dir in card_dir.iterdir():
+            if page_dir.is_dir() and page_dir.name not in keep:
+                remove_card_page(page_dir.name)
+                shutil.rmtree(page_dir, ignore_errors=True)
+                removed += 1
+        if removed:
+            self.stdout.write(f"Removed {removed:,} pages of cards that are no longer fully analyzed")
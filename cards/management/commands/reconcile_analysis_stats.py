@@ -0,0 +1,47 @@
+"""
+Recompute the materialized analysis_stats document from the cards collection.
+
+The submission and synthesis paths keep the counters current with $inc;
+this corrects any drift (failed writes, manual edits, imports). Use
+--interval to keep it running as a periodic job.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from cards.analysis_stats import analysis_stats
+
+
+class Command(BaseCommand):
+    help = 'Reconcile the analysis_stats counters with the cards collection'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=0,
+            help='Keep running, reconciling every N seconds (0 = run once)',
+        )
+
+    def handle(self, *args, **options):
+        interval = options['interval']
+
+        while True:
+            started = time.time()
+            before = analysis_stats.stats.find_one({'_id': analysis_stats.STATS_ID}) or {}
+            doc = analysis_stats.reconcile()
+            elapsed = time.time() - started
+
+            self.stdout.write(self.style.SUCCESS(f"Reconciled analysis stats ({elapsed:.1f}s)"))
+            for counter in analysis_stats.COUNTERS:
+                drift = doc[counter] - before.get(counter, 0)
+                line = f"  {counter:<24} {doc[counter]:>12,}"
+                if before and drift:
+                    self.stdout.write(self.style.WARNING(f"{line}  (drift {drift:+,})"))
+                else:
+                    self.stdout.write(line)
+
+            if not interval:
+                break
+            time.sleep(interval)
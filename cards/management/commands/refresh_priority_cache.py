@@ -0,0 +1,54 @@
+"""
+Maintain the enhanced swarm priority_cache collection.
+
+Runs incrementally by default (only cards changed or added since the last
+run are rescored). Use --full for a complete rebuild, and --interval to keep
+running as a background job.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from cards.enhanced_swarm_manager import enhanced_swarm
+
+
+class Command(BaseCommand):
+    help = 'Incrementally refresh the swarm priority cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Rescore every card instead of only those changed since the last run',
+        )
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=0,
+            help='Keep running, refreshing every N seconds (0 = run once)',
+        )
+
+    def handle(self, *args, **options):
+        full = options['full']
+        interval = options['interval']
+
+        while True:
+            started = time.time()
+            result = enhanced_swarm.refresh_priority_cache(full=full)
+            elapsed = time.time() - started
+
+            if result['status'] == 'locked':
+                self.stdout.write(self.style.WARNING('Another refresh is in progress, skipped'))
+            else:
+                self.stdout.write(self.style.SUCCESS(
+                    f"{'Full' if result['full'] else 'Incremental'} refresh: "
+                    f"{result['updated']:,} updated, {result['removed']:,} removed "
+                    f"(version {result['version']}, {elapsed:.1f}s)"
+                ))
+
+            if not interval:
+                break
+            # Only the first pass of a looping job is forced to be full
+            full = False
+            time.sleep(interval)
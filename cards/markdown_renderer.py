@@ -0,0 +1,89 @@
+"""
+Markdown and mana symbol rendering.
+
+Markdown conversion itself dominates for analysis-length documents, so a
+fresh markdown.Markdown instance is built per render (render_many() shares
+one, reset() between documents, across a card's components).
+
+Mana costs and oracle text repeat across thousands of cards (there are
+only a few hundred distinct mana costs), so their symbol HTML is memoized.
+"""
+
+import re
+from functools import lru_cache
+from typing import Dict
+
+import markdown
+from django.utils.safestring import SafeString, mark_safe
+
+MARKDOWN_EXTENSIONS = ['extra', 'codehilite']
+
+CARD_LINK_RE = re.compile(r'\[\[([^\]]+)\]\]')
+SYMBOL_RE = re.compile(r'\{([^}]+)\}')
+
+SYMBOL_URL = 'https://svgs.scryfall.io/card-symbols/{}.svg'
+
+# Symbols whose Scryfall file name is not simply the lowercased symbol
+SYMBOL_FILES = {
+    'W': 'w', 'U': 'u', 'B': 'b', 'R': 'r', 'G': 'g',  # Basic colors
+    'C': 'c',  # Colorless
+    'X': 'x',  # Variable
+    'S': 's',  # Snow
+    'T': 't',  # Tap
+    'Q': 'q',  # Untap
+    'E': 'e',  # Energy
+}
+
+def _link_card(match: re.Match) -> str:
+    card_name = match.group(1).strip()
+    # Link to a search for this card
+    return f'<a href="/browse/?q={card_name}" class="card-link" title="Search for {card_name}"><strong>{card_name}</strong></a>'
+
+
+def _convert(md: markdown.Markdown, text: str) -> SafeString:
+    html = md.convert(text)
+    md.reset()
+    return mark_safe(CARD_LINK_RE.sub(_link_card, html))
+
+
+def render_markdown(text: str) -> SafeString:
+    """Markdown to HTML, with [[card name]] turned into search links."""
+    if not text:
+        return mark_safe('')
+    return _convert(markdown.Markdown(extensions=MARKDOWN_EXTENSIONS), text)
+
+
+def render_many(texts: Dict[str, str]) -> Dict[str, SafeString]:
+    """Render several documents (all components of a card) with one instance."""
+    md = markdown.Markdown(extensions=MARKDOWN_EXTENSIONS)
+    return {key: _convert(md, text) if text else mark_safe('') for key, text in texts.items()}
+
+
+def _symbol_html(symbol: str, css_class: str, title: str) -> str:
+    symbol = symbol.upper()
+    name = None
+    if '/' in symbol:
+        # Hybrid/phyrexian symbols: {W/U} -> wu.svg
+        parts = symbol.split('/')
+        if len(parts) == 2:
+            name = ''.join(part.lower() for part in parts)
+    elif symbol.isdigit() and 0 <= int(symbol) <= 20:
+        name = str(int(symbol))
+    if name is None:
+        name = SYMBOL_FILES.get(symbol, symbol.lower())
+    return (f'<img src="{SYMBOL_URL.format(name)}" alt="{{{symbol}}}" class="{css_class}" '
+            f'title="{title}{{{symbol}}}">')
+
+
+@lru_cache(maxsize=4096)
+def mana_cost_html(mana_cost: str) -> SafeString:
+    """{2}{W}{U} -> Scryfall symbol images (memoized per distinct cost)."""
+    return mark_safe(SYMBOL_RE.sub(
+        lambda match: _symbol_html(match.group(1), 'mana-symbol', 'Mana cost: '), mana_cost))
+
+
+@lru_cache(maxsize=8192)
+def oracle_text_html(text: str) -> SafeString:
+    """Oracle text with inline mana symbols replaced by images (memoized)."""
+    return mark_safe(SYMBOL_RE.sub(
+        lambda match: _symbol_html(match.group(1), 'mana-symbol-text', ''), text))
@@ -1,32 +1,237 @@
 from django.db import models
 from django.conf import settings
+import os
+import threading
+import time
 import pymongo
+from pymongo import monitoring
 
 # Create your models here.
 
-def get_mongodb_collection(collection_name):
-    """Get a MongoDB collection using Django settings."""
-    mongodb_settings = settings.MONGODB_SETTINGS
-    
+# Process-wide MongoClient registry. MongoClient is thread-safe and owns its
+# own connection pool, so every view/manager in a process shares one client per
+# distinct set of connection settings instead of building a new one per call.
+_client_registry = {}
+_collection_cache = {}
+_registry_lock = threading.Lock()
+_registry_pid = os.getpid()
+
+
+class PoolMetricsListener(monitoring.ConnectionPoolListener):
+    """Track connection pool checkouts and wait times for saturation monitoring."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._checkout_started = {}
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._checkout_started.clear()
+            self.checkouts = 0
+            self.checkins = 0
+            self.checkout_failures = 0
+            self.checked_out = 0
+            self.max_checked_out = 0
+            self.waiting = 0
+            self.max_waiting = 0
+            self.total_wait_ms = 0.0
+            self.max_wait_ms = 0.0
+            self.connections_created = 0
+            self.connections_closed = 0
+            self.pool_clears = 0
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'checkouts': self.checkouts,
+                'checkins': self.checkins,
+                'checkout_failures': self.checkout_failures,
+                'checked_out': self.checked_out,
+                'max_checked_out': self.max_checked_out,
+                'waiting': self.waiting,
+                'max_waiting': self.max_waiting,
+                'avg_wait_ms': round(self.total_wait_ms / self.checkouts, 3) if self.checkouts else 0.0,
+                'max_wait_ms': round(self.max_wait_ms, 3),
+                'connections_created': self.connections_created,
+                'connections_closed': self.connections_closed,
+                'pool_clears': self.pool_clears,
+            }
+
+    def _finish_wait(self, thread_id):
+        started = self._checkout_started.pop(thread_id, None)
+        self.waiting = max(0, self.waiting - 1)
+        if started is None:
+            return 0.0
+        return (time.monotonic() - started) * 1000
+
+    # Checkout lifecycle
+    def connection_check_out_started(self, event):
+        with self._lock:
+            self._checkout_started[threading.get_ident()] = time.monotonic()
+            self.waiting += 1
+            self.max_waiting = max(self.max_waiting, self.waiting)
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            wait_ms = self._finish_wait(threading.get_ident())
+            self.checkouts += 1
+            self.total_wait_ms += wait_ms
+            self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+            self.checked_out += 1
+            self.max_checked_out = max(self.max_checked_out, self.checked_out)
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self._finish_wait(threading.get_ident())
+            self.checkout_failures += 1
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.checkins += 1
+            self.checked_out = max(0, self.checked_out - 1)
+
+    # Pool/connection lifecycle
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self.pool_clears += 1
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        with self._lock:
+            self.connections_created += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.connections_closed += 1
+
+
+pool_metrics = PoolMetricsListener()
+
+
+def _reset_registry_after_fork():
+    """Drop clients inherited from the parent; MongoClient is not fork-safe."""
+    global _registry_lock, _registry_pid
+    _registry_lock = threading.Lock()
+    _client_registry.clear()
+    _collection_cache.clear()
+    pool_metrics._lock = threading.Lock()
+    pool_metrics.reset()
+    _registry_pid = os.getpid()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_registry_after_fork)
+
+
+def _get_pool_options(mongodb_settings):
+    """Pool sizing options from MONGODB_SETTINGS."""
+    options = {}
+    if mongodb_settings.get('max_pool_size') is not None:
+        options['maxPoolSize'] = int(mongodb_settings['max_pool_size'])
+    if mongodb_settings.get('min_pool_size') is not None:
+        options['minPoolSize'] = int(mongodb_settings['min_pool_size'])
+    if mongodb_settings.get('wait_queue_timeout_ms') is not None:
+        options['waitQueueTimeoutMS'] = int(mongodb_settings['wait_queue_timeout_ms'])
+    return options
+
+
+def _registry_key(mongodb_settings):
+    """Key the registry by everything that affects the connection."""
+    return (
+        mongodb_settings.get('connection_string'),
+        mongodb_settings.get('host'),
+        mongodb_settings.get('username'),
+        mongodb_settings.get('password'),
+        mongodb_settings.get('auth_source', 'admin'),
+        tuple(sorted(_get_pool_options(mongodb_settings).items())),
+    )
+
+
+def _create_client(mongodb_settings):
+    """Build a MongoClient from settings."""
+    options = _get_pool_options(mongodb_settings)
+    options['event_listeners'] = [pool_metrics]
+
     # Handle both connection string and legacy settings
     if 'connection_string' in mongodb_settings:
         # Use connection string method
-        client = pymongo.MongoClient(mongodb_settings['connection_string'])
-    else:
-        # Use legacy host-based method
-        if mongodb_settings.get('username') and mongodb_settings.get('password'):
-            client = pymongo.MongoClient(
-                host=mongodb_settings['host'],
-                username=mongodb_settings['username'],
-                password=mongodb_settings['password'],
-                authSource=mongodb_settings.get('auth_source', 'admin')
-            )
-        else:
-            client = pymongo.MongoClient(mongodb_settings['host'])
-    
+        return pymongo.MongoClient(mongodb_settings['connection_string'], **options)
+
+    # Use legacy host-based method
+    if mongodb_settings.get('username') and mongodb_settings.get('password'):
+        return pymongo.MongoClient(
+            host=mongodb_settings['host'],
+            username=mongodb_settings['username'],
+            password=mongodb_settings['password'],
+            authSource=mongodb_settings.get('auth_source', 'admin'),
+            **options
+        )
+    return pymongo.MongoClient(mongodb_settings['host'], **options)
+
+
+def get_mongodb_client():
+    """Get the shared MongoClient for the current process and settings."""
+    mongodb_settings = settings.MONGODB_SETTINGS
+    key = _registry_key(mongodb_settings)
+
+    # Fallback for platforms without os.register_at_fork
+    if os.getpid() != _registry_pid:
+        _reset_registry_after_fork()
+
+    client = _client_registry.get(key)
+    if client is None:
+        with _registry_lock:
+            client = _client_registry.get(key)
+            if client is None:
+                client = _create_client(mongodb_settings)
+                _client_registry[key] = client
+    return client
+
+
+def get_mongodb_collection(collection_name):
+    """Get a MongoDB collection using Django settings."""
+    mongodb_settings = settings.MONGODB_SETTINGS
     db_name = mongodb_settings.get('db_name', 'emteegee_dev')
-    db = client[db_name]
-    return db[collection_name]
+    cache_key = (_registry_key(mongodb_settings), db_name, collection_name)
+
+    if os.getpid() != _registry_pid:
+        _reset_registry_after_fork()
+
+    collection = _collection_cache.get(cache_key)
+    if collection is None:
+        collection = get_mongodb_client()[db_name][collection_name]
+        _collection_cache[cache_key] = collection
+    return collection
+
+
+def get_mongodb_pool_stats():
+    """Connection pool checkout/wait metrics for this process."""
+    stats = pool_metrics.snapshot()
+    stats['pid'] = os.getpid()
+    stats['clients'] = len(_client_registry)
+    stats['pool_options'] = _get_pool_options(settings.MONGODB_SETTINGS)
+    return stats
+
+
+def close_mongodb_clients():
+    """Close all pooled clients (e.g. on worker shutdown)."""
+    with _registry_lock:
+        for client in _client_registry.values():
+            client.close()
+        _client_registry.clear()
+        _collection_cache.clear()
 
 
 def get_cards_collection():
@@ -0,0 +1,209 @@
+"""
+Declarative MongoDB index registry.
+
+Every index the application relies on is declared here, next to the query
+shapes it serves, and created by `python manage.py ensure_indexes`. Modules
+that own a collection and need its indexes at runtime (the swarm queue)
+call ensure_collection_indexes() instead of declaring their own.
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+from .models import get_mongodb_collection
+from .swarm_logging import enhanced_swarm_logger
+
+
+# Indexes use MongoDB's default names (e.g. uuid_1) so ones that were created
+# by hand with the same keys are recognised rather than duplicated.
+INDEXES: Dict[str, List[IndexModel]] = {
+    'cards': [
+        # Card identity lookups (detail pages, result submission)
+        IndexModel([('uuid', ASCENDING)]),
+        IndexModel([('id', ASCENDING)], sparse=True),
+        IndexModel([('identifiers.scryfallId', ASCENDING)], sparse=True),
+        # Default browse sort and name prefix lookups
+        IndexModel([('name', ASCENDING)]),
+        IndexModel([('setCode', ASCENDING), ('name', ASCENDING)]),
+        # Popularity sorts, with and without the fully-analyzed filter
+        IndexModel([('edhrecRank', ASCENDING)], sparse=True),
+        IndexModel([('analysis.fully_analyzed', ASCENDING), ('edhrecRank', ASCENDING)]),
+        # Recently completed analyses (home page, progress dashboard)
+        IndexModel(
+            [('analysis.analysis_completed_at', DESCENDING)],
+            partialFilterExpression={'analysis.analysis_completed_at': {'$exists': True}}
+        ),
+        IndexModel(
+            [('analysis.fully_analyzed', ASCENDING), ('analysis.analysis_completed_at', DESCENDING)],
+            partialFilterExpression={'analysis.analysis_completed_at': {'$exists': True}}
+        ),
+        # In-progress cards and incremental priority refresh
+        IndexModel([('analysis.component_count', ASCENDING)], sparse=True),
+        IndexModel([('analysis.last_updated', DESCENDING)], sparse=True),
+        # Price collections and filters
+        IndexModel([('prices.usd', DESCENDING)], sparse=True),
+        IndexModel([('prices.eur', DESCENDING)], sparse=True),
+        # Cards changed since the search index's last build (search_index.refresh)
+        IndexModel([('updated_at', DESCENDING)], sparse=True),
+    ],
+    'decks': [
+        IndexModel([('type', ASCENDING), ('name', ASCENDING)]),
+        IndexModel([('mainBoard.uuid', ASCENDING)]),
+        IndexModel([('commander.uuid', ASCENDING)], sparse=True),
+    ],
+    'swarm_tasks': [
+        IndexModel(
+            [('task_id', ASCENDING)],
+            unique=True,
+            partialFilterExpression={'task_id': {'$exists': True}}
+        ),
+        IndexModel([('status', ASCENDING), ('completed_at', DESCENDING)]),
+        IndexModel([('assigned_to', ASCENDING), ('completed_at', DESCENDING)]),
+        IndexModel([('completed_at', DESCENDING)], sparse=True),
+        IndexModel([('card_oid', ASCENDING)], sparse=True),
+    ],
+    'swarm_workers': [
+        IndexModel([('worker_id', ASCENDING)], unique=True),
+        IndexModel([('status', ASCENDING), ('last_heartbeat', DESCENDING)]),
+    ],
+    'priority_cache': [
+        IndexModel([('card_uuid', ASCENDING)], unique=True),
+        IndexModel([('priority_score', DESCENDING)]),
+        IndexModel([('version', ASCENDING)]),
+    ],
+    'swarm_queue': [
+        IndexModel(
+            [('status', ASCENDING), ('priority', DESCENDING), ('shuffle', ASCENDING)],
+            name='status_priority_shuffle'
+        ),
+        IndexModel(
+            [('status', ASCENDING), ('lease_expires_at', ASCENDING)],
+            name='status_lease_expires_at'
+        ),
+        IndexModel([('task_id', ASCENDING)], name='task_id', sparse=True),
+    ],
+}
+
+
+def hot_queries() -> List[Dict[str, Any]]:
+    """The busiest view/manager queries, for explain-plan checks."""
+    now = datetime.now(timezone.utc)
+    return [
+        {'name': 'card detail by uuid', 'collection': 'cards',
+         'filter': {'uuid': '00000000-0000-0000-0000-000000000000'}},
+        {'name': 'abyss default (name sort)', 'collection': 'cards',
+         'filter': {}, 'sort': [('name', ASCENDING)], 'limit': 24},
+        {'name': 'abyss edhrec collection', 'collection': 'cards',
+         'filter': {'edhrecRank': {'$exists': True, '$ne': None}}, 'sort': [('edhrecRank', ASCENDING)], 'limit': 24},
+        {'name': 'abyss expensive collection', 'collection': 'cards',
+         'filter': {'prices.usd': {'$gte': 20}}, 'sort': [('prices.usd', DESCENDING)], 'limit': 24},
+        {'name': 'home featured cards', 'collection': 'cards',
+         'filter': {'analysis.fully_analyzed': True, 'edhrecRank': {'$exists': True, '$lte': 5000}},
+         'sort': [('edhrecRank', ASCENDING)], 'limit': 6},
+        {'name': 'home recent completions', 'collection': 'cards',
+         'filter': {'analysis.fully_analyzed': True, 'analysis.analysis_completed_at': {'$exists': True}},
+         'sort': [('analysis.analysis_completed_at', DESCENDING)], 'limit': 12},
+        {'name': 'cards analyzed today', 'collection': 'cards',
+         'filter': {'analysis.last_updated': {'$gte': now - timedelta(days=1)}}},
+        {'name': 'cards in progress', 'collection': 'cards',
+         'filter': {'analysis.component_count': {'$gt': 0, '$lt': 20}}, 'limit': 10},
+        {'name': 'task by task_id', 'collection': 'swarm_tasks',
+         'filter': {'task_id': 'task_0000000000000000'}},
+        {'name': 'recent task completions', 'collection': 'swarm_tasks',
+         'filter': {'status': 'completed', 'completed_at': {'$gte': now - timedelta(hours=1)}},
+         'sort': [('completed_at', DESCENDING)], 'limit': 20},
+        {'name': 'worker recent tasks', 'collection': 'swarm_tasks',
+         'filter': {'assigned_to': 'worker', 'completed_at': {'$gte': now - timedelta(hours=6)}}},
+        {'name': 'active workers', 'collection': 'swarm_workers',
+         'filter': {'status': 'active', 'last_heartbeat': {'$gte': now - timedelta(minutes=5)}}},
+        {'name': 'high priority cards', 'collection': 'priority_cache',
+         'filter': {'priority_score': {'$gte': 0.7}}, 'sort': [('priority_score', DESCENDING)], 'limit': 50},
+        {'name': 'queue claim', 'collection': 'swarm_queue',
+         'filter': {'status': 'queued'}, 'sort': [('priority', DESCENDING), ('shuffle', ASCENDING)], 'limit': 1},
+    ]
+
+
+_ensured = set()
+
+
+def ensure_collection_indexes(collection_name: str, force: bool = False) -> Dict[str, Any]:
+    """Create the registered indexes for one collection (once per process unless forced).
+
+    Indexes are created one at a time so a conflicting definition already on
+    the server is reported without blocking the rest.
+    """
+    result = {'created': [], 'errors': {}}
+    if collection_name in _ensured and not force:
+        return result
+    collection = get_mongodb_collection(collection_name)
+    for model in INDEXES[collection_name]:
+        try:
+            result['created'].extend(collection.create_indexes([model]))
+        except OperationFailure as e:
+            result['errors'][model.document['name']] = str(e)
+            enhanced_swarm_logger.warning(
+                f"Index {collection_name}.{model.document['name']} not created: {e}"
+            )
+    _ensured.add(collection_name)
+    return result
+
+
+def missing_indexes(collection_name: str) -> List[str]:
+    """Registered index names that do not exist on the collection."""
+    existing = set(get_mongodb_collection(collection_name).index_information())
+    return [model.document['name'] for model in INDEXES[collection_name]
+            if model.document['name'] not in existing]
+
+
+def index_usage(collection_name: str) -> List[Dict[str, Any]]:
+    """Per-index access counts from $indexStats (counts reset on mongod restart)."""
+    registered = {model.document['name'] for model in INDEXES.get(collection_name, [])}
+    usage = []
+    for stat in get_mongodb_collection(collection_name).aggregate([{'$indexStats': {}}]):
+        usage.append({
+            'name': stat['name'],
+            'ops': stat.get('accesses', {}).get('ops', 0),
+            'since': stat.get('accesses', {}).get('since'),
+            'registered': stat['name'] in registered or stat['name'] == '_id_',
+        })
+    return sorted(usage, key=lambda row: row['ops'])
+
+
+def _plan_summary(plan: Dict[str, Any], stages: List[str], index_names: List[str]) -> None:
+    stages.append(plan.get('stage', '?'))
+    if plan.get('indexName'):
+        index_names.append(plan['indexName'])
+    for child_key in ('inputStage', 'queryPlan'):
+        if isinstance(plan.get(child_key), dict):
+            _plan_summary(plan[child_key], stages, index_names)
+    for child in plan.get('inputStages', []):
+        _plan_summary(child, stages, index_names)
+
+
+def explain_query(query: Dict[str, Any]) -> Dict[str, Any]:
+    """Winning plan, index used and documents examined for a hot query."""
+    cursor = get_mongodb_collection(query['collection']).find(query['filter'])
+    if query.get('sort'):
+        cursor = cursor.sort(query['sort'])
+    if query.get('limit'):
+        cursor = cursor.limit(query['limit'])
+    explain = cursor.explain()
+
+    stages, index_names = [], []
+    _plan_summary(explain.get('queryPlanner', {}).get('winningPlan', {}), stages, index_names)
+    execution = explain.get('executionStats', {})
+    return {
+        'name': query['name'],
+        'collection': query['collection'],
+        'stages': stages,
+        'indexes': index_names,
+        'collection_scan': 'COLLSCAN' in stages,
+        'in_memory_sort': 'SORT' in stages,
+        'keys_examined': execution.get('totalKeysExamined'),
+        'docs_examined': execution.get('totalDocsExamined'),
+        'returned': execution.get('nReturned'),
+        'time_ms': execution.get('executionTimeMillis'),
+    }
@@ -0,0 +1,98 @@
+"""
+Server-side page context cache.
+
+Expensive page contexts (the home page) are built once and served from the
+Django cache. Each entry carries its own fresh-until time and is stored
+for longer than that, so an expired entry can still be served while one
+request rebuilds it:
+
+- fresh entry: served as is;
+- expired entry: the request that wins a cache.add() lock rebuilds it and
+  the rest keep getting the stale copy until the rebuild lands;
+- no entry at all: one request builds it, the others wait briefly for it.
+
+invalidate() marks entries stale instead of deleting them, so a data change
+also triggers a single rebuild rather than a stampede. Entries are always
+kept for at least min_fresh seconds, so a stream of result submissions
+cannot force a rebuild on every hit.
+"""
+
+import logging
+import time
+from typing import Any, Callable, Dict, Iterable
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+HOME_PAGE_KEYS = ['page:home:view', 'page:home:working']
+
+
+def get_page_cache_setting(name: str, default: Any) -> Any:
+    """Read a value from settings.PAGE_CACHE_SETTINGS with a default."""
+    return getattr(settings, 'PAGE_CACHE_SETTINGS', {}).get(name, default)
+
+
+def get_cached_context(key: str, builder: Callable[[], Dict[str, Any]],
+                       ttl: int = None) -> Dict[str, Any]:
+    """Return the cached context for key, rebuilding it at most once at a time."""
+    ttl = ttl if ttl is not None else int(get_page_cache_setting('home_ttl', 60))
+    stale_ttl = int(get_page_cache_setting('stale_ttl', 3600))
+    lock_seconds = int(get_page_cache_setting('lock_seconds', 30))
+
+    entry = cache.get(key)
+    if entry is not None and time.time() < entry['fresh_until']:
+        return entry['value']
+
+    lock_key = f'{key}:lock'
+    if cache.add(lock_key, 1, lock_seconds):
+        try:
+            return _rebuild(key, builder, ttl, stale_ttl)
+        finally:
+            cache.delete(lock_key)
+
+    if entry is not None:
+        # Someone else is rebuilding - serve the stale copy meanwhile
+        return entry['value']
+
+    # Cold cache: wait for the rebuild in progress instead of piling on
+    deadline = time.time() + lock_seconds
+    while time.time() < deadline:
+        time.sleep(0.05)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry['value']
+    return _rebuild(key, builder, ttl, stale_ttl)
+
+
+def _rebuild(key: str, builder: Callable[[], Dict[str, Any]], ttl: int, stale_ttl: int) -> Dict[str, Any]:
+    value = builder()
+    now = time.time()
+    cache.set(key, {'value': value, 'built_at': now, 'fresh_until': now + ttl}, ttl + stale_ttl)
+    return value
+
+
+def invalidate(keys: Iterable[str]) -> None:
+    """Mark cached contexts stale so the next request rebuilds them.
+
+    Never raises: a cache outage must not fail the write that triggered it.
+    """
+    min_fresh = int(get_page_cache_setting('min_fresh', 10))
+    stale_ttl = int(get_page_cache_setting('stale_ttl', 3600))
+    try:
+        for key in keys:
+            entry = cache.get(key)
+            if entry is None:
+                continue
+            fresh_until = min(entry['fresh_until'], entry['built_at'] + min_fresh)
+            if fresh_until < entry['fresh_until']:
+                entry['fresh_until'] = fresh_until
+                cache.set(key, entry, stale_ttl)
+    except Exception as e:
+        logger.warning(f"Page cache invalidation failed: {e}")
+
+
+def invalidate_home_page() -> None:
+    """Called whenever analysis data shown on the home page changes."""
+    invalidate(HOME_PAGE_KEYS)
@@ -0,0 +1,172 @@
+"""
+Keyset (cursor) pagination for MongoDB card listings.
+
+Instead of .skip(), a page is fetched as "the next N cards after the last
+one shown", using the sort-key values and _id of that card as a range
+filter, so page 500 costs the same index range scan as page 1. The
+position travels in an opaque URL-safe cursor token.
+
+Ordering follows MongoDB: null/missing values sort before every number or
+string, so they come first ascending and last descending. _id is always
+appended as the final sort key so ties have a stable order.
+
+Total counts are cached per query signature, so paging through a result
+set runs count_documents once instead of on every request.
+"""
+
+import base64
+import hashlib
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from bson.json_util import dumps, loads
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+# Seconds a cached count is reused
+COUNT_CACHE_TTL = 300
+
+
+def _field_value(doc: Dict[str, Any], field: str) -> Any:
+    value = doc
+    for part in field.split('.'):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def with_tiebreak(sort: List[Tuple[str, int]]) -> List[Tuple[str, int]]:
+    """The sort spec with _id appended, so every position is unique."""
+    sort = list(sort)
+    if not sort or sort[-1][0] != '_id':
+        sort.append(('_id', 1))
+    return sort
+
+
+def encode_cursor(doc: Dict[str, Any], sort: List[Tuple[str, int]], page: int, backwards: bool = False) -> str:
+    """Opaque token for the position of doc under sort."""
+    payload = {
+        'v': [_field_value(doc, field) for field, _ in with_tiebreak(sort)],
+        'p': page,
+        'b': int(backwards),
+    }
+    return base64.urlsafe_b64encode(dumps(payload, separators=(',', ':')).encode()).decode().rstrip('=')
+
+
+def decode_cursor(token: str, sort: List[Tuple[str, int]]) -> Optional[Dict[str, Any]]:
+    """Decode a cursor token; None if it is malformed or was made for another sort."""
+    if not token:
+        return None
+    try:
+        payload = loads(base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)).decode())
+        values = payload['v']
+        if len(values) != len(with_tiebreak(sort)) or not isinstance(payload['p'], int):
+            return None
+        return {'values': values, 'page': max(payload['p'], 1), 'backwards': bool(payload.get('b'))}
+    except (ValueError, KeyError, TypeError) as e:
+        logger.debug(f"Ignoring bad cursor token: {e}")
+        return None
+
+
+def _after(field: str, value: Any, direction: int) -> Optional[Dict[str, Any]]:
+    """Filter for values strictly after value in the given direction (nulls lowest)."""
+    if direction > 0:
+        return {field: {'$ne': None}} if value is None else {field: {'$gt': value}}
+    if value is None:
+        return None
+    return {'$or': [{field: {'$lt': value}}, {field: None}]}
+
+
+def keyset_filter(sort: List[Tuple[str, int]], values: List[Any]) -> Dict[str, Any]:
+    """Mongo filter matching documents that sort after values under sort.
+
+    For sort keys (a, b, _id) this is
+    a > va OR (a = va AND b > vb) OR (a = va AND b = vb AND _id > vid).
+    """
+    branches = []
+    equal: List[Dict[str, Any]] = []
+    for (field, direction), value in zip(sort, values):
+        after = _after(field, value, direction)
+        if after is not None:
+            branches.append({'$and': equal + [after]} if equal else after)
+        equal = equal + [{field: value}]
+    if not branches:
+        # Nothing can sort after this position
+        return {'_id': {'$in': []}}
+    return {'$or': branches} if len(branches) > 1 else branches[0]
+
+
+def keyset_plan(query: Dict[str, Any], sort: List[Tuple[str, int]],
+                cursor: Optional[Dict[str, Any]] = None) -> Tuple[Dict[str, Any], List[Tuple[str, int]]]:
+    """Filter and sort that fetch the page at cursor (reversed for a backwards cursor)."""
+    sort = with_tiebreak(sort)
+    backwards = bool(cursor and cursor['backwards'])
+    fetch_sort = [(field, -direction) for field, direction in sort] if backwards else sort
+
+    filters = [query] if query else []
+    if cursor:
+        filters.append(keyset_filter(fetch_sort, cursor['values']))
+    mongo_query = {'$and': filters} if len(filters) > 1 else (filters[0] if filters else {})
+    return mongo_query, fetch_sort
+
+
+def keyset_page(docs: List[Dict[str, Any]], sort: List[Tuple[str, int]], per_page: int,
+                cursor: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Turn per_page + 1 documents fetched with keyset_plan() into a page."""
+    page = cursor['page'] if cursor else 1
+    backwards = bool(cursor and cursor['backwards'])
+    # The extra document tells whether there is another page in this direction
+    more = len(docs) > per_page
+    docs = docs[:per_page]
+    if backwards:
+        docs.reverse()
+
+    has_next = more if not backwards else bool(cursor)
+    has_previous = (more if backwards else bool(cursor)) and page > 1
+    return {'docs': docs, 'page': page, **page_cursors(docs, sort, page, has_previous, has_next)}
+
+
+def fetch_keyset_page(collection, query: Dict[str, Any], sort: List[Tuple[str, int]], per_page: int,
+                      cursor: Optional[Dict[str, Any]] = None,
+                      projection: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Fetch one page after (or, for a backwards cursor, before) the cursor position.
+
+    Returns the documents in display order, the page number, and tokens for
+    the next/previous pages (None at either end).
+    """
+    mongo_query, fetch_sort = keyset_plan(query, sort, cursor)
+    docs = list(collection.find(mongo_query, projection).sort(fetch_sort).limit(per_page + 1))
+    return keyset_page(docs, sort, per_page, cursor)
+
+
+def page_cursors(docs: List[Dict[str, Any]], sort: List[Tuple[str, int]], page: int,
+                 has_previous: bool, has_next: bool) -> Dict[str, Optional[str]]:
+    """Next/previous tokens for a page of docs shown in sort order."""
+    sort = with_tiebreak(sort)
+    return {
+        'next_cursor': encode_cursor(docs[-1], sort, page + 1) if docs and has_next else None,
+        'previous_cursor': encode_cursor(docs[0], sort, page - 1, backwards=True) if docs and has_previous else None,
+    }
+
+
+def query_signature(collection_name: str, query: Dict[str, Any]) -> str:
+    return hashlib.sha1(f'{collection_name}:{dumps(query, sort_keys=True)}'.encode()).hexdigest()
+
+
+def cached_count(collection, query: Dict[str, Any], ttl: int = COUNT_CACHE_TTL) -> int:
+    """count_documents for query, cached per query signature."""
+    key = f'count:{query_signature(collection.name, query)}'
+    try:
+        count = cache.get(key)
+    except Exception as e:
+        logger.warning(f"Count cache unavailable: {e}")
+        return collection.count_documents(query)
+    if count is None:
+        count = collection.count_documents(query) if query else collection.estimated_document_count()
+        try:
+            cache.set(key, count, ttl)
+        except Exception as e:
+            logger.warning(f"Count cache unavailable: {e}")
+    return count
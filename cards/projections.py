@@ -0,0 +1,112 @@
+"""
+Named card shapes.
+
+Card documents carry up to 20 analysis components plus the synthesized
+complete analysis, which is most of their size. List pages only need a
+handful of fields, so every query that fetches cards picks one of these
+shapes instead of loading whole documents:
+
+- tile:          grid/list tiles (The Abyss, admin list, home page)
+- detail_header: card face, prices and analysis status, no component text
+                 (enough to check the rendered detail cache)
+- detail_full:   the whole document
+- worker_task:   what the swarm needs to queue a card: identity, the
+                 prompt fields and the names of the components it has
+
+CardTile wraps a tile-shaped document for templates.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional
+
+# Card fields sent to workers with each task
+WORKER_CARD_FIELDS = ['name', 'manaCost', 'type', 'text', 'power', 'toughness']
+
+TILE_FIELDS = [
+    'uuid', 'name', 'type', 'rarity', 'setCode', 'edhrecRank', 'colors',
+    'imageUris.normal', 'imageUris.small', 'imageUris.art_crop',
+    'prices.usd', 'prices.eur',
+    'analysis.component_count', 'analysis.fully_analyzed',
+]
+
+DETAIL_HEADER_FIELDS = TILE_FIELDS + [
+    'id', 'set', 'cmc', 'manaCost', 'manaValue', 'text', 'flavorText', 'power', 'toughness', 'loyalty',
+    'colorIdentity', 'keywords', 'types', 'subtypes', 'supertypes', 'artist', 'setName',
+    'legalities', 'imageUris', 'prices',
+    'analysis.last_updated', 'analysis.analysis_completed_at', 'analysis.quality',
+    'analysis.synthesis_generated_at',
+]
+
+PROJECTIONS: Dict[str, Optional[Dict[str, Any]]] = {
+    'tile': {field: 1 for field in TILE_FIELDS},
+    # imageUris/prices supersede their sub-fields from the tile shape
+    'detail_header': {
+        field: 1 for field in DETAIL_HEADER_FIELDS
+        if not field.startswith(('imageUris.', 'prices.'))
+    },
+    'detail_full': None,
+    # Aggregation-expression projection (MongoDB 4.4+ in find() as well):
+    # component names only, never the component text
+    'worker_task': {
+        'uuid': 1, 'id': 1, 'edhrecRank': 1, 'prices': 1, 'view_count': 1, 'recent_views': 1,
+        'analysis.component_count': 1,
+        **{field: 1 for field in WORKER_CARD_FIELDS},
+        'component_names': {'$map': {
+            'input': {'$objectToArray': {'$ifNull': ['$analysis.components', {}]}},
+            'in': '$$this.k'
+        }},
+    },
+}
+
+
+def card_projection(shape: str) -> Optional[Dict[str, Any]]:
+    """Projection for a named card shape (None means the whole document)."""
+    projection = PROJECTIONS[shape]
+    return dict(projection) if projection is not None else None
+
+
+class CardTile:
+    """Slim, read-only card for list templates.
+
+    Supports card.name / card.imageUris.normal in templates and card.get()
+    for filters written against raw documents (card_image and friends).
+    """
+
+    __slots__ = ('_id', 'uuid', 'name', 'type', 'rarity', 'setCode', 'edhrecRank', 'colors',
+                 'imageUris', 'prices', 'component_count', 'fully_analyzed')
+
+    def __init__(self, doc: Dict[str, Any]):
+        analysis = doc.get('analysis') or {}
+        self._id = doc.get('_id')
+        self.uuid = doc.get('uuid', '')
+        self.name = doc.get('name', '')
+        self.type = doc.get('type', '')
+        self.rarity = doc.get('rarity', '')
+        self.setCode = doc.get('setCode', '')
+        self.edhrecRank = doc.get('edhrecRank')
+        self.colors = doc.get('colors') or []
+        self.imageUris = doc.get('imageUris') or {}
+        self.prices = doc.get('prices') or {}
+        self.component_count = doc.get('component_count', analysis.get('component_count', 0)) or 0
+        self.fully_analyzed = bool(analysis.get('fully_analyzed')) or self.component_count >= 20
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            return default
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.__slots__
+
+    def __repr__(self) -> str:
+        return f'CardTile({self.name!r})'
+
+
+def to_tiles(docs: Iterable[Dict[str, Any]]) -> List[CardTile]:
+    return [CardTile(doc) for doc in docs]
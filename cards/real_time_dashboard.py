@@ -14,6 +14,7 @@ from django.views.decorators.http import require_http_methods
 from django.template.response import TemplateResponse
 from cards.models import get_cards_collection
 from .enhanced_swarm_manager import enhanced_swarm
+from .analysis_stats import analysis_stats
 import logging
 
 logger = logging.getLogger(__name__)
@@ -52,62 +53,18 @@ class RealTimeAnalysisDashboard:
         }
     
     def _get_analysis_quality_metrics(self) -> Dict[str, Any]:
-        """Calculate analysis quality metrics"""
-        
-        # Get cards with coherence scores
-        coherence_pipeline = [
-            {
-                '$match': {
-                    'analysis.components': {'$exists': True, '$ne': {}}
-                }
-            },
-            {
-                '$project': {
-                    'name': 1,
-                    'components': {'$objectToArray': '$analysis.components'},
-                    'total_components': {'$size': {'$objectToArray': '$analysis.components'}}
-                }
-            },
-            {
-                '$unwind': '$components'
-            },
-            {
-                '$group': {
-                    '_id': None,
-                    'total_components_generated': {'$sum': 1},
-                    'avg_coherence_score': {
-                        '$avg': '$components.v.coherence_score'
-                    },
-                    'high_coherence_count': {
-                        '$sum': {
-                            '$cond': [
-                                {'$gte': ['$components.v.coherence_score', 0.8]},
-                                1, 0
-                            ]
-                        }
-                    }
-                }
-            }
-        ]
+        """Calculate analysis quality metrics (O(1) read of the global coherence accumulator)"""
         
         try:
-            coherence_result = list(self.cards_collection.aggregate(coherence_pipeline))
-            if coherence_result:
-                stats = coherence_result[0]
-                quality_percentage = (stats.get('high_coherence_count', 0) / 
-                                    stats.get('total_components_generated', 1)) * 100
-            else:
-                stats = {}
-                quality_percentage = 0
+            stats = analysis_stats.get()
         except Exception as e:
             logger.error(f"Error calculating quality metrics: {e}")
             stats = {}
-            quality_percentage = 0
         
         return {
-            'total_components': stats.get('total_components_generated', 0),
+            'total_components': stats.get('components_generated', 0),
             'avg_coherence_score': stats.get('avg_coherence_score', 0.0),
-            'high_quality_percentage': quality_percentage,
+            'high_quality_percentage': stats.get('high_quality_percentage', 0),
             'analysis_efficiency': self._calculate_analysis_efficiency()
         }
     
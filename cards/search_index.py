@@ -0,0 +1,555 @@
+"""
+In-memory search engine for The Abyss.
+
+A per-process index over the cards collection that answers text search,
+filters, sorting, pagination and facet counts without querying Mongo:
+
+- an inverted index of tokens from name, oracle text and type line, with
+  prefix matching through a sorted vocabulary, plus exact keywords;
+- column arrays for colors (bitmask), rarity, set code, prices, price
+  trend and edhrecRank, with value-sorted orders for range filters;
+- sort orders built on first use and cached per sort spec.
+
+The index is split into a large main segment and a small delta segment.
+refresh() rebuilds only the delta (cards added since the main build, cards
+whose updated_at is later than the build started, plus cards marked with
+touch()), hiding the old main rows of those cards. Writers that change
+indexed fields (importers, price updates) set updated_at, so other
+processes pick the change up on their next refresh; deleted cards are
+noticed from the collection count and trigger a rebuild. When the delta
+grows past max_delta or the main segment gets old, the main segment is
+rebuilt in a background thread while the old one keeps serving.
+Only the page of matching ids comes back from Mongo, by _id.
+"""
+
+import heapq
+import logging
+import math
+import re
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from django.conf import settings
+
+from .models import get_mongodb_collection
+
+logger = logging.getLogger(__name__)
+
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+COLOR_BITS = {'W': 1, 'U': 2, 'B': 4, 'R': 8, 'G': 16}
+
+NUMERIC_FIELDS = {
+    'prices.usd': 'usd',
+    'prices.eur': 'eur',
+    'edhrecRank': 'edhrec',
+    'prices.price_trend_30d': 'trend',
+}
+
+# Fields the index is built from
+INDEX_PROJECTION = {
+    'name': 1, 'text': 1, 'type': 1, 'keywords': 1, 'colors': 1, 'rarity': 1,
+    'setCode': 1, 'edhrecRank': 1, 'prices.usd': 1, 'prices.eur': 1, 'prices.price_trend_30d': 1,
+}
+
+# Set (to a UTC datetime) by anything that changes an indexed field of a card
+UPDATED_AT_FIELD = 'updated_at'
+
+# Writers' clocks may lag ours; updates this much older than a build are re-read
+UPDATE_CLOCK_SKEW = timedelta(minutes=5)
+
+MISSING = float('nan')
+
+
+def get_search_setting(name: str, default: Any) -> Any:
+    """Read a value from settings.SEARCH_INDEX_SETTINGS with a default."""
+    return getattr(settings, 'SEARCH_INDEX_SETTINGS', {}).get(name, default)
+
+
+def tokenize(text: Any) -> List[str]:
+    return TOKEN_RE.findall(str(text).lower()) if text else []
+
+
+def _number(value: Any) -> float:
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return MISSING
+    return number if not math.isnan(number) else MISSING
+
+
+class _Segment:
+    """Immutable index over a fixed list of cards; rows are positions in that list."""
+
+    def __init__(self, cards: Iterable[Dict[str, Any]]):
+        self.ids = []
+        self.names = []
+        self.type_lower = []
+        self.colors = array('B')
+        self.rarity = array('H')
+        self.set_code = array('H')
+        self.numeric = {column: array('d') for column in NUMERIC_FIELDS.values()}
+
+        self.rarity_values: List[str] = []
+        self.set_values: List[str] = []
+        rarity_codes: Dict[str, int] = {}
+        set_codes: Dict[str, int] = {}
+
+        postings: Dict[str, Dict[str, List[int]]] = {'all': {}, 'type': {}}
+        keywords: Dict[str, List[int]] = {}
+
+        for row, card in enumerate(cards):
+            self.ids.append(card['_id'])
+            self.names.append(card.get('name') or '')
+            self.type_lower.append((card.get('type') or '').lower())
+
+            mask = 0
+            for color in card.get('colors') or []:
+                mask |= COLOR_BITS.get(color, 0)
+            self.colors.append(mask)
+
+            rarity = card.get('rarity') or ''
+            self.rarity.append(rarity_codes.setdefault(rarity, len(rarity_codes)))
+            set_code = card.get('setCode') or ''
+            self.set_code.append(set_codes.setdefault(set_code, len(set_codes)))
+
+            prices = card.get('prices') if isinstance(card.get('prices'), dict) else {}
+            self.numeric['usd'].append(_number(prices.get('usd')))
+            self.numeric['eur'].append(_number(prices.get('eur')))
+            self.numeric['trend'].append(_number(prices.get('price_trend_30d')))
+            self.numeric['edhrec'].append(_number(card.get('edhrecRank')))
+
+            type_tokens = set(tokenize(card.get('type')))
+            for token in set(tokenize(card.get('name'))) | set(tokenize(card.get('text'))) | type_tokens:
+                postings['all'].setdefault(token, []).append(row)
+            for token in type_tokens:
+                postings['type'].setdefault(token, []).append(row)
+            for keyword in card.get('keywords') or []:
+                keywords.setdefault(str(keyword).lower(), []).append(row)
+
+        self.size = len(self.ids)
+        self.id_set = frozenset(self.ids)
+        self.rarity_values = list(rarity_codes)
+        self.set_values = list(set_codes)
+        # Rows are appended in order, so every postings list is already sorted
+        self.postings = {
+            field: {token: array('I', rows) for token, rows in index.items()}
+            for field, index in postings.items()
+        }
+        self.vocabulary = {field: sorted(index) for field, index in self.postings.items()}
+        self.keywords = {keyword: array('I', rows) for keyword, rows in keywords.items()}
+
+        # Value-sorted rows per numeric column (missing values left out) for range filters
+        self.numeric_order = {}
+        for column, values in self.numeric.items():
+            rows = sorted((row for row in range(self.size) if not math.isnan(values[row])),
+                          key=values.__getitem__)
+            self.numeric_order[column] = (array('d', (values[row] for row in rows)), array('I', rows))
+
+        self._sort_cache: Dict[tuple, tuple] = {}
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Matching
+    # ------------------------------------------------------------------
+
+    def _prefix_rows(self, field: str, prefix: str) -> Set[int]:
+        vocabulary = self.vocabulary[field]
+        rows: Set[int] = set()
+        position = bisect_left(vocabulary, prefix)
+        while position < len(vocabulary) and vocabulary[position].startswith(prefix):
+            rows.update(self.postings[field][vocabulary[position]])
+            position += 1
+        return rows
+
+    def _tokens_rows(self, field: str, text: str) -> Set[int]:
+        """Rows containing every token of text as a word prefix."""
+        result = None
+        for token in sorted(set(tokenize(text)), key=len, reverse=True):
+            rows = self._prefix_rows(field, token)
+            result = rows if result is None else result & rows
+            if not result:
+                return set()
+        return result if result is not None else set(range(self.size))
+
+    def _range_rows(self, column: str, low: float = None, high: float = None) -> Set[int]:
+        values, rows = self.numeric_order[column]
+        start = bisect_left(values, low) if low is not None else 0
+        end = bisect_right(values, high) if high is not None else len(values)
+        return set(rows[start:end])
+
+    def _has_value(self, column: str) -> Set[int]:
+        return set(self.numeric_order[column][1])
+
+    def match(self, query: Dict[str, Any]) -> Set[int]:
+        """Rows matching every filter in query (see CardSearchIndex.search)."""
+        filters: List[Set[int]] = []
+
+        if query.get('q'):
+            text = query['q']
+            rows = self._tokens_rows('all', text) if tokenize(text) else set()
+            rows |= set(self.keywords.get(text.lower(), ()))
+            filters.append(rows)
+
+        collection = query.get('collection')
+        if collection == 'commanders':
+            filters.append(self._tokens_rows('type', 'legendary creature') & self._has_value('edhrec'))
+        elif collection == 'expensive':
+            filters.append(self._range_rows('usd', low=20) | self._range_rows('eur', low=18))
+        elif collection == 'budget':
+            filters.append(self._range_rows('usd', high=1) | self._range_rows('eur', high=0.9))
+        elif collection == 'edhrec':
+            filters.append(self._has_value('edhrec'))
+
+        if query.get('type'):
+            filters.append(self._tokens_rows('type', query['type']))
+
+        currency = 'eur' if query.get('price_currency') == 'eur' else 'usd'
+        if query.get('price_min') is not None or query.get('price_max') is not None:
+            filters.append(self._range_rows(currency, low=query.get('price_min'), high=query.get('price_max')))
+
+        trend = query.get('trend')
+        if trend == 'rising':
+            filters.append(self._range_rows('trend', low=5) - self._range_rows('trend', high=5))
+        elif trend == 'falling':
+            filters.append(self._range_rows('trend', high=-5) - self._range_rows('trend', low=-5))
+        elif trend == 'stable':
+            filters.append(self._range_rows('trend', low=-5, high=5))
+
+        filters.sort(key=len)
+        rows = filters[0].intersection(*filters[1:]) if filters else None
+
+        # Column scans over whatever is left
+        color = query.get('colors')
+        if color:
+            bit = COLOR_BITS.get(color)
+            if color == 'C':
+                test = lambda row: self.colors[row] == 0
+            elif bit:
+                test = lambda row: self.colors[row] & bit
+            else:
+                test = lambda row: False
+            rows = {row for row in (rows if rows is not None else range(self.size)) if test(row)}
+
+        if query.get('rarity'):
+            code = self.rarity_values.index(query['rarity']) if query['rarity'] in self.rarity_values else -1
+            rows = {row for row in (rows if rows is not None else range(self.size)) if self.rarity[row] == code}
+
+        if query.get('set'):
+            needle = query['set'].lower()
+            codes = {code for code, value in enumerate(self.set_values) if needle in value.lower()}
+            rows = {row for row in (rows if rows is not None else range(self.size)) if self.set_code[row] in codes}
+
+        return rows if rows is not None else set(range(self.size))
+
+    # ------------------------------------------------------------------
+    # Sorting
+    # ------------------------------------------------------------------
+
+    def sort_key(self, row: int, sort: tuple) -> tuple:
+        """Mongo-compatible ordering: missing values sort first ascending, last descending."""
+        key = []
+        for field, direction in sort:
+            if field == 'name':
+                key.append(self.names[row] if direction > 0 else _Reversed(self.names[row]))
+            else:
+                value = self.numeric[NUMERIC_FIELDS[field]][row]
+                value = -math.inf if math.isnan(value) else value
+                key.append(value if direction > 0 else -value)
+        return tuple(key)
+
+    def _order(self, sort: tuple) -> tuple:
+        cached = self._sort_cache.get(sort)
+        if cached is None:
+            with self._lock:
+                cached = self._sort_cache.get(sort)
+                if cached is None:
+                    order = sorted(range(self.size), key=lambda row: (self.sort_key(row, sort), row))
+                    rank = array('I', [0]) * self.size
+                    for position, row in enumerate(order):
+                        rank[row] = position
+                    cached = (array('I', order), rank)
+                    self._sort_cache[sort] = cached
+        return cached
+
+    def sorted_rows(self, rows: Set[int], sort: tuple) -> Iterable[int]:
+        """Matching rows in sort order, lazily when most of the segment matches."""
+        order, rank = self._order(sort)
+        if len(rows) * 4 < self.size:
+            return sorted(rows, key=rank.__getitem__)
+        return (row for row in order if row in rows)
+
+    # ------------------------------------------------------------------
+    # Facets
+    # ------------------------------------------------------------------
+
+    def facets(self, rows: Set[int], currency: str, counts: Optional[Dict[str, Dict[str, int]]],
+               prices: Dict[str, float]) -> None:
+        """Accumulate color/rarity/set/type counts (unless counts is None) and price stats for rows."""
+        price_values = self.numeric[currency]
+        for row in rows:
+            price = price_values[row]
+            if not math.isnan(price) and price > 0:
+                prices['count'] += 1
+                prices['sum'] += price
+                prices['min'] = min(prices['min'], price)
+                prices['max'] = max(prices['max'], price)
+
+            if counts is None:
+                continue
+            mask = self.colors[row]
+            if not mask:
+                counts['colors']['C'] = counts['colors'].get('C', 0) + 1
+            for color, bit in COLOR_BITS.items():
+                if mask & bit:
+                    counts['colors'][color] = counts['colors'].get(color, 0) + 1
+            rarity = self.rarity_values[self.rarity[row]]
+            counts['rarity'][rarity] = counts['rarity'].get(rarity, 0) + 1
+            set_code = self.set_values[self.set_code[row]]
+            counts['set'][set_code] = counts['set'].get(set_code, 0) + 1
+            main_type = self.type_lower[row].split(' — ')[0]
+            for card_type in ('creature', 'instant', 'sorcery', 'artifact', 'enchantment',
+                              'planeswalker', 'land', 'battle'):
+                if card_type in main_type:
+                    label = card_type.title()
+                    counts['type'][label] = counts['type'].get(label, 0) + 1
+
+
+class _Reversed:
+    """Wraps a string so it sorts descending inside a tuple key."""
+
+    __slots__ = ('value',)
+
+    def __init__(self, value: str):
+        self.value = value
+
+    def __lt__(self, other):
+        return self.value > other.value
+
+    def __eq__(self, other):
+        return self.value == other.value
+
+
+class CardSearchIndex:
+    """Process-wide search index with incremental refresh"""
+
+    def __init__(self):
+        self._main: Optional[_Segment] = None
+        self._delta: Optional[_Segment] = None
+        self._hidden: Set[Any] = set()       # main-segment ids superseded by the delta
+        self._touched: Set[Any] = set()      # ids to re-read on the next refresh
+        self._main_high_water = None
+        self._main_started_at: Optional[datetime] = None  # When the main segment's scan began
+        self._main_built_at = 0.0
+        self._refreshed_at = 0.0
+        # Bumped whenever a segment is swapped; facet results are cached per generation
+        self._generation = 0
+        self._facet_cache: 'OrderedDict[tuple, Dict[str, Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._rebuilding = False
+
+        self.refresh_interval = int(get_search_setting('refresh_interval', 60))
+        self.full_rebuild_interval = int(get_search_setting('full_rebuild_interval', 6 * 3600))
+        self.max_delta = int(get_search_setting('max_delta', 2000))
+        self.facet_cache_size = int(get_search_setting('facet_cache_size', 512))
+
+    @property
+    def cards(self):
+        return get_mongodb_collection('cards')
+
+    @property
+    def ready(self) -> bool:
+        return self._main is not None
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+
+    def build(self) -> int:
+        """Build the main segment from a full projected scan and reset the delta."""
+        started = time.time()
+        scan_started_at = datetime.now(timezone.utc)
+        cards = list(self.cards.find({}, INDEX_PROJECTION).sort('_id', 1))
+        main = _Segment(cards)
+        with self._lock:
+            self._main = main
+            self._delta = _Segment([])
+            self._hidden = set()
+            self._main_high_water = cards[-1]['_id'] if cards else None
+            self._main_started_at = scan_started_at
+            self._main_built_at = self._refreshed_at = time.time()
+            self._generation += 1
+        logger.info(f"Search index built: {main.size:,} cards in {time.time() - started:.1f}s")
+        return main.size
+
+    def touch(self, card_ids: Iterable[Any]) -> None:
+        """Mark cards whose indexed fields changed; picked up by the next refresh."""
+        with self._lock:
+            self._touched.update(card_ids)
+        self._refreshed_at = 0.0
+
+    def refresh(self) -> int:
+        """Rebuild the delta segment from new, updated and touched cards."""
+        with self._lock:
+            main = self._main
+            high_water = self._main_high_water
+            started_at = self._main_started_at
+            touched = set(self._touched) | set(self._hidden)
+            self._touched.clear()
+        clauses = []
+        if touched:
+            clauses.append({'_id': {'$in': list(touched)}})
+        if high_water is not None:
+            clauses.append({'_id': {'$gt': high_water}})
+        if started_at is not None:
+            clauses.append({UPDATED_AT_FIELD: {'$gte': started_at - UPDATE_CLOCK_SKEW}})
+        query = {'$or': clauses} if len(clauses) > 1 else (clauses[0] if clauses else {})
+        cards = list(self.cards.find(query, INDEX_PROJECTION).sort('_id', 1))
+        delta = _Segment(cards)
+        # Touched cards that no longer exist stay hidden, so they drop out
+        hidden = touched | delta.id_set
+        with self._lock:
+            if self._main is not main:
+                # A full rebuild landed meanwhile; re-read these against the new main segment
+                self._touched.update(touched)
+                return 0
+            self._delta = delta
+            self._hidden = hidden
+            self._refreshed_at = time.time()
+            self._generation += 1
+
+        # Fewer cards than the index serves means some were deleted without a touch()
+        live = main.size - len(hidden & main.id_set) + delta.size if main is not None else delta.size
+        if delta.size > self.max_delta or self.cards.estimated_document_count() < live:
+            self._rebuild_in_background()
+        return delta.size
+
+    def _rebuild_in_background(self) -> None:
+        with self._lock:
+            if self._rebuilding:
+                return
+            self._rebuilding = True
+
+        def rebuild():
+            try:
+                self.build()
+            except Exception as e:
+                logger.error(f"Search index rebuild failed: {e}")
+            finally:
+                self._rebuilding = False
+
+        threading.Thread(target=rebuild, name='search-index-rebuild', daemon=True).start()
+
+    def ensure_fresh(self) -> None:
+        """Refresh the delta and rebuild the main segment when due.
+
+        The first call only starts the initial build in the background and
+        raises, so callers fall back to Mongo until the index is ready.
+        """
+        if self._main is None:
+            self._rebuild_in_background()
+            raise RuntimeError('Search index is still building')
+        now = time.time()
+        if now - self._main_built_at > self.full_rebuild_interval:
+            self._rebuild_in_background()
+        # One request refreshes the delta; the rest keep using the current one
+        if now - self._refreshed_at > self.refresh_interval and self._refresh_lock.acquire(blocking=False):
+            try:
+                self.refresh()
+            finally:
+                self._refresh_lock.release()
+
+    # ------------------------------------------------------------------
+    # Querying
+    # ------------------------------------------------------------------
+
+    def search(self, query: Dict[str, Any], sort: List[tuple], offset: int = 0, limit: int = 24,
+               facets: bool = False, price_stats: bool = False) -> Dict[str, Any]:
+        """Filter, sort and paginate in-process.
+
+        query keys: q, colors, rarity, type, set, price_min, price_max,
+        price_currency, trend, collection. Returns the page's card _ids in
+        order, the total match count and, if asked, min/avg/max price over
+        the matches (price_stats or facets) and facet counts (facets).
+        """
+        self.ensure_fresh()
+        with self._lock:
+            main, delta, hidden, generation = self._main, self._delta, self._hidden, self._generation
+        sort = tuple((field, direction) for field, direction in sort)
+        for field, _ in sort:
+            if field != 'name' and field not in NUMERIC_FIELDS:
+                raise ValueError(f"Unsupported sort field: {field}")
+
+        main_rows = main.match(query)
+        if hidden:
+            main_rows = {row for row in main_rows if main.ids[row] not in hidden}
+        delta_rows = delta.match(query) if delta.size else set()
+
+        streams = [
+            self._stream(segment, rows, sort, index)
+            for index, (segment, rows) in enumerate(((main, main_rows), (delta, delta_rows)))
+            if rows
+        ]
+        page = list(islice(heapq.merge(*streams, key=lambda item: item[:2]), offset, offset + limit))
+
+        result = {
+            'ids': [segment.ids[row] for _, _, row, segment in page],
+            'total': len(main_rows) + len(delta_rows),
+        }
+        if facets or price_stats:
+            result.update(self._facets(query, main, main_rows, delta, delta_rows, generation, facets))
+        return result
+
+    def _facets(self, query: Dict[str, Any], main: _Segment, main_rows: Set[int], delta: _Segment,
+                delta_rows: Set[int], generation: int, with_counts: bool = True) -> Dict[str, Any]:
+        """Price stats and (with_counts) facet counts for the matches, cached per query and generation."""
+        currency = 'eur' if query.get('price_currency') == 'eur' else 'usd'
+        key = (generation, currency, with_counts,
+               tuple(sorted((k, v) for k, v in query.items() if k != 'price_currency')))
+        with self._lock:
+            cached = self._facet_cache.get(key)
+            if cached is not None:
+                self._facet_cache.move_to_end(key)
+                return cached
+
+        counts = {'colors': {}, 'rarity': {}, 'set': {}, 'type': {}} if with_counts else None
+        prices = {'count': 0, 'sum': 0.0, 'min': math.inf, 'max': -math.inf}
+        main.facets(main_rows, currency, counts, prices)
+        delta.facets(delta_rows, currency, counts, prices)
+        stats = {
+            'facets': counts or {'colors': {}, 'rarity': {}, 'set': {}, 'type': {}},
+            'price_stats': {
+                'count_with_price': prices['count'],
+                'average': prices['sum'] / prices['count'] if prices['count'] else None,
+                'minimum': prices['min'] if prices['count'] else None,
+                'maximum': prices['max'] if prices['count'] else None,
+            },
+        }
+        with self._lock:
+            self._facet_cache[key] = stats
+            if len(self._facet_cache) > self.facet_cache_size:
+                self._facet_cache.popitem(last=False)
+        return stats
+
+    @staticmethod
+    def _stream(segment: _Segment, rows: Set[int], sort: tuple, index: int):
+        for row in segment.sorted_rows(rows, sort):
+            yield segment.sort_key(row, sort), index, row, segment
+
+    def fetch_page(self, ids: List[Any], projection: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Load the page's cards by _id, in result order."""
+        if not ids:
+            return []
+        by_id = {card['_id']: card for card in self.cards.find({'_id': {'$in': ids}}, projection)}
+        return [by_id[card_id] for card_id in ids if card_id in by_id]
+
+
+# Global instance
+card_search = CardSearchIndex()
@@ -21,6 +21,7 @@ from collections import deque
 import threading
 
 from .swarm_logging import get_swarm_logger
+from .detail_cache import invalidate_card_details
 
 # Simple MongoDB connection
 from pymongo import MongoClient
@@ -139,6 +140,7 @@ class SimpleSwarmManager:
                     {'_id': card_id},
                     {'$set': update_data}
                 )
+            invalidate_card_details([card_id])
             
             logger.info(f"✅ Results submitted: {card_id} by {worker_id}")
             return True
@@ -0,0 +1,169 @@
+"""
+Pre-rendered card detail pages.
+
+Crawlers walk every card URL in the sitemap, and each hit used to cost a
+Mongo lookup and a full template render in the same processes that serve
+the swarm API. The export_static_cards command renders fully analyzed card
+pages (as an anonymous visitor sees them) to
+
+    <root>/card/<uuid>/index.html  (+ index.html.gz, + index.html.br)
+
+and StaticCardMiddleware answers anonymous GETs for those URLs straight
+from disk, before sessions, auth or the URL resolver run. Behind nginx the
+same files are served without reaching Django at all (see
+claude/scripts/configure_services.sh).
+
+Exports are incremental: the command remembers the newest
+analysis.last_updated it exported and only re-renders cards changed since.
+"""
+
+import gzip
+import json
+import logging
+import os
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpRequest, HttpResponse, QueryDict
+from django.template.loader import render_to_string
+from django.utils.http import http_date
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    brotli = None
+    BROTLI_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+CARD_PATH_RE = re.compile(r'^/card/([0-9A-Fa-f-]{8,64})/$')
+
+STATE_FILE = 'export_state.json'
+
+
+def get_static_cards_setting(name: str, default: Any) -> Any:
+    """Read a value from settings.STATIC_CARDS_SETTINGS with a default."""
+    return getattr(settings, 'STATIC_CARDS_SETTINGS', {}).get(name, default)
+
+
+def export_root() -> Path:
+    return Path(get_static_cards_setting('root', settings.BASE_DIR / 'data' / 'static_cards'))
+
+
+def page_path(card_uuid: str) -> Path:
+    return export_root() / 'card' / card_uuid / 'index.html'
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    tmp = path.with_name(f'.{path.name}.tmp')
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def render_card_page(card_uuid: str) -> Optional[str]:
+    """The card detail page as an anonymous visitor gets it (None if unavailable)."""
+    from .urls_working import CARD_DETAIL_TEMPLATE, card_detail_context
+
+    context = card_detail_context(card_uuid)
+    if context.get('error'):
+        return None
+
+    request = HttpRequest()
+    request.method = 'GET'
+    request.path = request.path_info = f'/card/{card_uuid}/'
+    request.GET = QueryDict()
+    request.user = AnonymousUser()
+    return render_to_string(CARD_DETAIL_TEMPLATE, context, request=request)
+
+
+def write_card_page(card_uuid: str, html: str) -> int:
+    """Write a page and its compressed side files; returns the uncompressed size."""
+    path = page_path(card_uuid)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = html.encode('utf-8')
+    _write_atomic(path.with_name('index.html.gz'), gzip.compress(data, compresslevel=9, mtime=0))
+    if BROTLI_AVAILABLE:
+        _write_atomic(path.with_name('index.html.br'), brotli.compress(data, mode=brotli.MODE_TEXT))
+    # The plain file goes last: its presence is what the fast path checks
+    _write_atomic(path, data)
+    return len(data)
+
+
+def remove_card_page(card_uuid: str) -> None:
+    path = page_path(card_uuid)
+    for name in ('index.html', 'index.html.gz', 'index.html.br'):
+        try:
+            path.with_name(name).unlink()
+        except FileNotFoundError:
+            pass
+
+
+def load_state() -> Dict[str, Any]:
+    try:
+        state = json.loads((export_root() / STATE_FILE).read_text())
+    except (FileNotFoundError, ValueError):
+        return {}
+    if state.get('high_water_mark'):
+        state['high_water_mark'] = datetime.fromisoformat(state['high_water_mark'])
+    return state
+
+
+def save_state(state: Dict[str, Any]) -> None:
+    root = export_root()
+    root.mkdir(parents=True, exist_ok=True)
+    data = dict(state)
+    if isinstance(data.get('high_water_mark'), datetime):
+        data['high_water_mark'] = data['high_water_mark'].isoformat()
+    _write_atomic(root / STATE_FILE, json.dumps(data, indent=2).encode('utf-8'))
+
+
+class StaticCardMiddleware:
+    """Serve exported card pages to anonymous visitors without touching Django views.
+
+    Requests with a session cookie or a query string always go to the view,
+    so logged-in users and cache-busting links get a live render.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = bool(get_static_cards_setting('enabled', True))
+
+    def __call__(self, request):
+        response = self._serve(request) if self.enabled else None
+        return response if response is not None else self.get_response(request)
+
+    def _serve(self, request) -> Optional[HttpResponse]:
+        if request.method not in ('GET', 'HEAD') or request.META.get('QUERY_STRING'):
+            return None
+        if settings.SESSION_COOKIE_NAME in request.COOKIES:
+            return None
+        match = CARD_PATH_RE.match(request.path_info)
+        if not match:
+            return None
+
+        path = page_path(match.group(1))
+        accepted = request.META.get('HTTP_ACCEPT_ENCODING', '')
+        encoding = None
+        for candidate, suffix in (('br', '.br'), ('gzip', '.gz')):
+            if candidate in accepted and path.with_name(path.name + suffix).exists():
+                path, encoding = path.with_name(path.name + suffix), candidate
+                break
+        try:
+            data = path.read_bytes()
+            modified = path.stat().st_mtime
+        except FileNotFoundError:
+            return None
+
+        response = HttpResponse(b'' if request.method == 'HEAD' else data,
+                                content_type='text/html; charset=utf-8')
+        response['Content-Length'] = str(len(data))
+        response['Last-Modified'] = http_date(modified)
+        response['Vary'] = 'Accept-Encoding, Cookie'
+        if encoding:
+            response['Content-Encoding'] = encoding
+        return response
@@ -11,6 +11,8 @@ import os
 from bson import ObjectId
 from datetime import datetime, timezone
 
+from .detail_cache import invalidate_card_details
+
 # Custom JSON encoder to handle MongoDB ObjectId and datetime objects
 class MongoJSONEncoder(json.JSONEncoder):
     def default(self, obj):
@@ -97,6 +99,7 @@ def submit_results(request):
                 {'_id': ObjectId(card_id)},
                 {'$set': update_data}
             )
+        invalidate_card_details([ObjectId(card_id)])
         
         # Update worker stats
         swarm.workers.update_one(
@@ -0,0 +1,263 @@
+"""
+Claim-based work queue for the enhanced swarm.
+
+Each card that still needs analysis has exactly one entry in the swarm_queue
+collection, keyed by the card's _id. Workers lease entries with an atomic
+find_one_and_update on the (status, priority) index, so a poll is an indexed
+claim instead of a collection scan and no card can be handed out twice.
+Leases that are not completed before lease_expires_at go back to the queue.
+"""
+
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from django.conf import settings
+from pymongo import ASCENDING, DESCENDING, ReturnDocument, UpdateOne
+
+from .models import get_mongodb_collection
+from .mongo_indexes import ensure_collection_indexes
+from .projections import WORKER_CARD_FIELDS, card_projection
+from .swarm_logging import enhanced_swarm_logger
+
+
+# All 20 analysis components, in the order the swarm hands them out
+ALL_COMPONENTS = [
+    'play_tips', 'mulligan_considerations', 'rules_clarifications',
+    'combo_suggestions', 'format_analysis', 'synergy_analysis',
+    'competitive_analysis', 'tactical_analysis',
+    'thematic_analysis', 'historical_context', 'art_flavor_analysis',
+    'design_philosophy', 'advanced_interactions', 'meta_positioning',
+    'budget_alternatives', 'deck_archetypes', 'new_player_guide',
+    'sideboard_guide', 'power_level_assessment', 'investment_outlook'
+]
+
+
+def get_swarm_setting(name: str, default: Any) -> Any:
+    """Read a value from settings.SWARM_SETTINGS with a default."""
+    return getattr(settings, 'SWARM_SETTINGS', {}).get(name, default)
+
+
+class SwarmWorkQueue:
+    """Leases cards needing analysis to swarm workers"""
+
+    QUEUED = 'queued'
+    LEASED = 'leased'
+    DONE = 'done'
+
+    STATE_ID = 'swarm_queue'
+
+    # Card fields copied into each entry so a claim needs no extra card read
+    CARD_DATA_FIELDS = WORKER_CARD_FIELDS
+
+    def __init__(self, priority_fn: Optional[Callable[[Dict[str, Any]], float]] = None):
+        self.queue = get_mongodb_collection('swarm_queue')
+        self.cards = get_mongodb_collection('cards')
+        self.swarm_state = get_mongodb_collection('swarm_state')
+        self.priority_fn = priority_fn or (lambda card: 0.0)
+
+        self.lease_seconds = int(get_swarm_setting('lease_seconds', 1800))
+        self.refill_batch_size = int(get_swarm_setting('queue_refill_batch_size', 500))
+        self.low_water_mark = int(get_swarm_setting('queue_low_water_mark', 100))
+        self.maintenance_interval = int(get_swarm_setting('queue_maintenance_interval', 30))
+
+        self._indexes_ready = False
+        self._last_maintenance = 0.0
+
+    def _ensure_indexes(self):
+        """Create the indexes the claim and requeue queries rely on (once per process)."""
+        if self._indexes_ready:
+            return
+        ensure_collection_indexes('swarm_queue')
+        self._indexes_ready = True
+
+    # ------------------------------------------------------------------
+    # Claiming
+    # ------------------------------------------------------------------
+
+    def claim(self, worker_id: str, task_id: str,
+              lease_seconds: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """Atomically lease the highest-priority queued card to a worker."""
+        self._ensure_indexes()
+        self._maintain_if_due()
+
+        entry = self._claim_one(worker_id, task_id, lease_seconds)
+        if entry is None:
+            # Queue ran dry - pull in the next slice of cards and try once more
+            if self.refill() or self.requeue_expired():
+                entry = self._claim_one(worker_id, task_id, lease_seconds)
+        return entry
+
+    def _claim_one(self, worker_id: str, task_id: str,
+                   lease_seconds: Optional[int]) -> Optional[Dict[str, Any]]:
+        now = datetime.now(timezone.utc)
+        lease = timedelta(seconds=lease_seconds or self.lease_seconds)
+        return self.queue.find_one_and_update(
+            {'status': self.QUEUED},
+            {
+                '$set': {
+                    'status': self.LEASED,
+                    'leased_to': worker_id,
+                    'task_id': task_id,
+                    'leased_at': now,
+                    'lease_expires_at': now + lease
+                },
+                '$inc': {'attempts': 1}
+            },
+            sort=[('priority', DESCENDING), ('shuffle', ASCENDING)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    def complete(self, card_id, task_id: str, remaining_components: List[str]) -> None:
+        """Close a lease after its results were stored.
+
+        The entry is finished once the card has every component; otherwise it
+        goes straight back to the queue with only the missing components. The
+        task_id guard keeps a late submission from releasing a newer lease.
+        """
+        self.queue.update_one(*self._complete_operation(card_id, task_id, remaining_components))
+
+    def complete_many(self, completions: List[tuple]) -> None:
+        """Close several leases in one round trip; takes (card_id, task_id, remaining_components) tuples."""
+        if completions:
+            self.queue.bulk_write(
+                [UpdateOne(*self._complete_operation(*completion)) for completion in completions],
+                ordered=False
+            )
+
+    def _complete_operation(self, card_id, task_id: str, remaining_components: List[str]) -> tuple:
+        return (
+            {'_id': card_id, 'task_id': task_id},
+            {
+                '$set': {
+                    'status': self.DONE if not remaining_components else self.QUEUED,
+                    'components': remaining_components,
+                    'updated_at': datetime.now(timezone.utc)
+                },
+                '$unset': {'leased_to': '', 'task_id': '', 'lease_expires_at': '', 'leased_at': ''}
+            }
+        )
+
+    def release(self, worker_id: str, task_ids: List[str]) -> int:
+        """Return leases a worker gave up on to the queue before they expire.
+
+        Only leases still held by that worker under those task_ids are
+        touched, so a lease that already expired and went to another worker
+        stays with it.
+        """
+        if not task_ids:
+            return 0
+        result = self.queue.update_many(
+            {'status': self.LEASED, 'leased_to': worker_id, 'task_id': {'$in': list(task_ids)}},
+            {
+                '$set': {'status': self.QUEUED, 'shuffle': random.random()},
+                '$unset': {'leased_to': '', 'task_id': '', 'lease_expires_at': '', 'leased_at': ''}
+            }
+        )
+        return result.modified_count
+
+    def requeue_expired(self) -> int:
+        """Return leases whose deadline has passed to the queue."""
+        self._ensure_indexes()
+        result = self.queue.update_many(
+            {'status': self.LEASED, 'lease_expires_at': {'$lt': datetime.now(timezone.utc)}},
+            {
+                '$set': {'status': self.QUEUED, 'shuffle': random.random()},
+                '$unset': {'leased_to': '', 'task_id': '', 'lease_expires_at': '', 'leased_at': ''}
+            }
+        )
+        if result.modified_count:
+            enhanced_swarm_logger.info(f"♻️ Requeued {result.modified_count} expired leases")
+        return result.modified_count
+
+    def _maintain_if_due(self) -> None:
+        """Requeue expired leases and top up the queue, at most once per interval."""
+        now = time.monotonic()
+        if now - self._last_maintenance < self.maintenance_interval:
+            return
+        self._last_maintenance = now
+
+        self.requeue_expired()
+        queued = self.queue.count_documents({'status': self.QUEUED}, limit=self.low_water_mark)
+        if queued < self.low_water_mark:
+            self.refill()
+
+    # ------------------------------------------------------------------
+    # Refilling
+    # ------------------------------------------------------------------
+
+    def refill(self, limit: Optional[int] = None) -> int:
+        """Enqueue the next slice of cards that still need analysis.
+
+        Cards are walked in _id order from a persisted cursor, so each call
+        costs one indexed range scan. When the walk reaches the end it wraps
+        around, which also re-opens entries for cards whose analysis was
+        reset after they were marked done.
+        """
+        self._ensure_indexes()
+        limit = limit or self.refill_batch_size
+        state = self.swarm_state.find_one({'_id': self.STATE_ID}) or {}
+        last_card_id = state.get('last_card_id')
+
+        card_query = {'analysis.fully_analyzed': {'$ne': True}}
+        if last_card_id is not None:
+            card_query['_id'] = {'$gt': last_card_id}
+
+        cards = list(self.cards.aggregate([
+            {'$match': card_query},
+            {'$sort': {'_id': 1}},
+            {'$limit': limit},
+            {'$project': card_projection('worker_task')}
+        ]))
+
+        now = datetime.now(timezone.utc)
+        operations = []
+        for card in cards:
+            existing = set(card.get('component_names') or [])
+            missing = [component for component in ALL_COMPONENTS if component not in existing]
+            if not missing:
+                continue
+            card_uuid = card.get('uuid') or card.get('id') or str(card['_id'])
+            entry = {
+                'card_uuid': card_uuid,
+                'card_name': card.get('name', 'Unknown'),
+                'card_data': {field: card.get(field, '') for field in self.CARD_DATA_FIELDS},
+                'components': missing,
+                'priority': self.priority_fn(card),
+                'shuffle': random.random(),
+                'status': self.QUEUED,
+                'attempts': 0,
+                'enqueued_at': now
+            }
+            # New cards are inserted; finished entries for cards that need
+            # work again are reopened; queued/leased entries are left alone.
+            operations.append(UpdateOne({'_id': card['_id']}, {'$setOnInsert': entry}, upsert=True))
+            operations.append(UpdateOne(
+                {'_id': card['_id'], 'status': self.DONE},
+                {'$set': {'status': self.QUEUED, 'components': missing, 'updated_at': now}}
+            ))
+
+        enqueued = 0
+        if operations:
+            result = self.queue.bulk_write(operations, ordered=False)
+            enqueued = result.upserted_count + result.modified_count
+
+        # Advance the cursor, or wrap around once we've walked every card
+        next_card_id = cards[-1]['_id'] if len(cards) >= limit else None
+        self.swarm_state.update_one(
+            {'_id': self.STATE_ID},
+            {'$set': {'last_card_id': next_card_id, 'last_refill_at': now}},
+            upsert=True
+        )
+
+        if enqueued:
+            enhanced_swarm_logger.info(f"📥 Enqueued {enqueued} cards for analysis")
+        return enqueued
+
+    def get_stats(self) -> Dict[str, int]:
+        """Entry counts per status."""
+        counts = {self.QUEUED: 0, self.LEASED: 0, self.DONE: 0}
+        for row in self.queue.aggregate([{'$group': {'_id': '$status', 'count': {'$sum': 1}}}]):
+            counts[row['_id']] = row['count']
+        return counts
@@ -2,11 +2,11 @@
 Custom template filters for the cards app.
 """
 
-import re
-import markdown
 from django import template
 from django.utils.safestring import mark_safe
 
+from cards.markdown_renderer import mana_cost_html, oracle_text_html, render_markdown
+
 register = template.Library()
 
 @register.filter
@@ -62,23 +62,7 @@ def markdown_to_html(value):
     if not value:
         return ""
     
-    # Convert markdown to HTML
-    md = markdown.Markdown(extensions=['extra', 'codehilite'])
-    html_content = md.convert(value)
-    
-    # Convert [[card name]] to links
-    # Pattern matches [[anything]] and creates a search link
-    card_link_pattern = r'\[\[([^\]]+)\]\]'
-    
-    def replace_card_link(match):
-        card_name = match.group(1).strip()
-        # Create a link to search for this card
-        return f'<a href="/browse/?q={card_name}" class="card-link" title="Search for {card_name}"><strong>{card_name}</strong></a>'
-    
-    # Replace all [[card name]] patterns with links
-    html_content = re.sub(card_link_pattern, replace_card_link, html_content)
-    
-    return mark_safe(html_content)
+    return render_markdown(value)
 
 @register.filter
 def component_icon(component_type):
@@ -145,47 +129,7 @@ def scryfall_mana_symbols(mana_cost):
     if '<img' in cost_str and 'mana-symbol' in cost_str:
         return mark_safe(cost_str)
     
-    import re
-    
-    # Pattern to match {X} style mana symbols
-    symbol_pattern = r'\{([^}]+)\}'
-    
-    def replace_symbol(match):
-        symbol = match.group(1).upper()
-          # Handle hybrid mana (like W/U, 2/W, etc.)
-        if '/' in symbol:
-            # For hybrid symbols, create proper name
-            parts = symbol.split('/')
-            if len(parts) == 2:
-                hybrid_name = ''.join(part.lower() for part in parts)
-                return f'<img src="https://svgs.scryfall.io/card-symbols/{hybrid_name}.svg" alt="{{{symbol}}}" class="mana-symbol" title="Mana cost: {{{symbol}}}">'
-        
-        # Handle numeric symbols (0-20)
-        if symbol.isdigit():
-            num = int(symbol)
-            if 0 <= num <= 20:
-                return f'<img src="https://svgs.scryfall.io/card-symbols/{num}.svg" alt="{{{symbol}}}" class="mana-symbol" title="Mana cost: {{{symbol}}}">'
-        
-        # Handle basic mana symbols
-        symbol_map = {
-            'W': 'w', 'U': 'u', 'B': 'b', 'R': 'r', 'G': 'g',  # Basic colors
-            'C': 'c',  # Colorless
-            'X': 'x',  # Variable
-            'S': 's',  # Snow
-            'T': 't',  # Tap
-            'Q': 'q',  # Untap
-            'E': 'e',  # Energy
-        }
-        
-        # Get the symbol or use lowercase version
-        scryfall_symbol = symbol_map.get(symbol, symbol.lower())
-        
-        return f'<img src="https://svgs.scryfall.io/card-symbols/{scryfall_symbol}.svg" alt="{{{symbol}}}" class="mana-symbol" title="Mana cost: {{{symbol}}}">'
-    
-    # Replace all {X} patterns with symbol images
-    html_with_symbols = re.sub(symbol_pattern, replace_symbol, cost_str)
-    
-    return mark_safe(html_with_symbols)
+    return mana_cost_html(cost_str)
 
 
 @register.filter
@@ -199,50 +143,7 @@ def scryfall_parse_text(card_text):
     if '<img' in text_str and 'mana-symbol' in text_str:
         return mark_safe(text_str)
     
-    import re
-    
-    # Pattern to match {X} style mana symbols in card text
-    symbol_pattern = r'\{([^}]+)\}'
-    
-    def replace_symbol(match):
-        symbol = match.group(1).upper()
-        
-        # Handle hybrid mana (e.g., {W/U})
-        if '/' in symbol:
-            # For hybrid symbols, use the format like "wu" for {W/U}
-            parts = symbol.split('/')
-            if len(parts) == 2:
-                hybrid_name = ''.join(part.lower() for part in parts)
-                return f'<img src="https://svgs.scryfall.io/card-symbols/{hybrid_name}.svg" alt="{{{symbol}}}" class="mana-symbol-text" title="{{{symbol}}}">'
-            
-        # Handle numeric symbols (0-20)
-        if symbol.isdigit():
-            num = int(symbol)
-            if 0 <= num <= 20:
-                return f'<img src="https://svgs.scryfall.io/card-symbols/{num}.svg" alt="{{{symbol}}}" class="mana-symbol-text" title="{{{symbol}}}">'
-        
-        # Handle common symbols in card text
-        symbol_map = {
-            'W': 'w', 'U': 'u', 'B': 'b', 'R': 'r', 'G': 'g',  # Basic colors
-            'C': 'c',  # Colorless
-            'X': 'x',  # Variable
-            'T': 't',  # Tap
-            'Q': 'q',  # Untap
-            'E': 'e',  # Energy
-            'S': 's',  # Snow
-            'CHAOS': 'chaos',
-            'PW': 'pw'
-        }
-        
-        # Get the appropriate symbol name
-        scryfall_symbol = symbol_map.get(symbol, symbol.lower())
-        
-        return f'<img src="https://svgs.scryfall.io/card-symbols/{scryfall_symbol}.svg" alt="{{{symbol}}}" class="mana-symbol-text" title="{{{symbol}}}">'
-    
-    # Replace all {X} patterns with symbol images
-    html_with_symbols = re.sub(symbol_pattern, replace_symbol, text_str)
-    
-    return mark_safe(html_with_symbols)
+    return oracle_text_html(text_str)
 
 
 @register.filter  
@@ -20,60 +20,73 @@ except ImportError:
 
 app_name = 'cards'
 
-def home(request):
-    """Simple home view with fully analyzed cards"""
-    from django.shortcuts import render
+# Also rendered to disk by the export_static_cards command
+CARD_DETAIL_TEMPLATE = 'cards/card_detail_test.html'
+
+def _build_home_context():
+    """Fully analyzed cards and statistics for the home page"""
     from cards.models import get_cards_collection
+    from cards.projections import card_projection, to_tiles
     
-    try:
-        cards_collection = get_cards_collection()
-        
-        # Get fully analyzed cards with exactly 20 components
-        fully_analyzed_cards = list(cards_collection.aggregate([
-            {
-                '$match': {
-                    'analysis.components': {'$exists': True}
-                }
-            },
-            {
-                '$addFields': {
-                    'component_count': {
-                        '$cond': {
-                            'if': {'$eq': [{'$type': '$analysis.components'}, 'object']},
-                            'then': {'$size': {'$objectToArray': '$analysis.components'}},
-                            'else': 0
-                        }
+    cards_collection = get_cards_collection()
+    
+    # Get fully analyzed cards with exactly 20 components
+    fully_analyzed_cards = list(cards_collection.aggregate([
+        {
+            '$match': {
+                'analysis.components': {'$exists': True}
+            }
+        },
+        {
+            # Tile fields only: the component text never leaves the server
+            '$project': {
+                **card_projection('tile'),
+                'component_count': {
+                    '$cond': {
+                        'if': {'$eq': [{'$type': '$analysis.components'}, 'object']},
+                        'then': {'$size': {'$objectToArray': '$analysis.components'}},
+                        'else': 0
                     }
                 }
-            },
-            {
-                '$match': {
-                    'component_count': {'$eq': 20}  # Exactly 20 components = fully analyzed
-                }
-            },
-            {
-                '$sort': {
-                    'edhrecRank': 1  # Sort by popularity
-                }
-            },
-            {'$limit': 20}  # Show up to 20 cards
-        ]))
-        
-        # Calculate statistics
-        total_cards = cards_collection.count_documents({})
-        analyzed_cards_count = len(fully_analyzed_cards)
-        total_components = analyzed_cards_count * 20
-        avg_components = 20 if analyzed_cards_count > 0 else 0
-        
-        context = {
-            'fully_analyzed_cards': fully_analyzed_cards,
-            'statistics': {
-                'total_cards': f"{total_cards:,}",
-                'fully_analyzed': analyzed_cards_count,
-                'total_components': f"{total_components:,}",
-                'avg_components': avg_components,
             }
+        },
+        {
+            '$match': {
+                'component_count': {'$eq': 20}  # Exactly 20 components = fully analyzed
+            }
+        },
+        {
+            '$sort': {
+                'edhrecRank': 1  # Sort by popularity
+            }
+        },
+        {'$limit': 20}  # Show up to 20 cards
+    ]))
+    fully_analyzed_cards = to_tiles(fully_analyzed_cards)
+    
+    # Calculate statistics
+    total_cards = cards_collection.count_documents({})
+    analyzed_cards_count = len(fully_analyzed_cards)
+    total_components = analyzed_cards_count * 20
+    avg_components = 20 if analyzed_cards_count > 0 else 0
+    
+    return {
+        'fully_analyzed_cards': fully_analyzed_cards,
+        'statistics': {
+            'total_cards': f"{total_cards:,}",
+            'fully_analyzed': analyzed_cards_count,
+            'total_components': f"{total_components:,}",
+            'avg_components': avg_components,
         }
+    }
+
+def home(request):
+    """Simple home view with fully analyzed cards (served from the page cache)"""
+    from django.shortcuts import render
+    from cards.page_cache import get_cached_context
+    
+    try:
+        context = get_cached_context('page:home:working', _build_home_context)
         
     except Exception as e:
         print(f"Error in home view: {e}")
@@ -89,39 +102,38 @@ def home(request):
     
     return render(request, 'cards/home.html', context)
 
-def card_detail(request, card_uuid):
-    """Enhanced card detail page with real data"""
+def card_detail_context(card_uuid):
+    """Context for the card detail page ('error' is set when it cannot be shown)"""
     from cards.analysis_manager import analysis_manager
+    from cards.detail_cache import get_rendered_analysis
     import logging
     
     logger = logging.getLogger(__name__)
     
     try:
-        card = analysis_manager.get_card_by_uuid(card_uuid)
+        card = analysis_manager.get_card_by_uuid(card_uuid, shape='detail_header')
         
         if not card:
-            return render(request, 'cards/card_detail_test.html', {
-                'error': "Card not found in database"
-            })
+            return {'error': "Card not found in database"}
         
-        # Get analysis data
-        analysis = card.get('analysis', {})
-        components = analysis.get('components', {})
+        # Get analysis data (components pre-rendered by the detail cache)
+        components = get_rendered_analysis(card)['components']
+        analysis = {**card.get('analysis', {}), 'components': components}
         
-        context = {
+        return {
             'card': card,
             'analysis': analysis,
             'components': components,
             'completion_percentage': (len(components) / 20) * 100 if components else 0
         }
         
-        return render(request, 'cards/card_detail_test.html', context)
-        
     except Exception as e:
         logger.error(f"Error in card_detail view for {card_uuid}: {e}")
-        return render(request, 'cards/card_detail_test.html', {
-            'error': f"Error loading card: {str(e)}"
-        })
+        return {'error': f"Error loading card: {str(e)}"}
+
+def card_detail(request, card_uuid):
+    """Enhanced card detail page with real data"""
+    return render(request, CARD_DETAIL_TEMPLATE, card_detail_context(card_uuid))
 
 def the_abyss(request):
     """Import the real the_abyss function"""
@@ -133,6 +145,11 @@ def art_gallery(request):
     from . import views as real_views
     return real_views.art_gallery(request)
 
+def gallery_api(request):
+    """Import the real gallery API function"""
+    from . import views as real_views
+    return real_views.gallery_api(request)
+
 def autocomplete_api(request):
     """Import the real autocomplete API function"""
     from . import views as real_views
@@ -202,6 +219,7 @@ urlpatterns = [
     path('card-list/', the_abyss, name='card_list'),  # Legacy compatibility
       # Art Gallery
     path('gallery/', art_gallery, name='art_gallery'),
+    path('api/gallery/', gallery_api, name='gallery_api'),
     
     # Search API
     path('api/autocomplete/', autocomplete_api, name='autocomplete_api'),
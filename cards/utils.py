@@ -1,50 +1,23 @@
 from datetime import datetime, timedelta
 from .models import get_cards_collection
+from .analysis_stats import analysis_stats
+from .projections import card_projection, to_tiles
 
 def get_home_page_stats():
-    """Get statistics for the home page stats blocks"""
-    collection = get_cards_collection()
-    
-    # Total Cards (you already have this working)
-    total_cards = collection.count_documents({})
-    
-    # Fully Analyzed - cards with complete analysis (synthesis)
-    fully_analyzed = collection.count_documents({
-        "complete_analysis": {"$exists": True, "$ne": ""}
-    })
-    
-    # In Process - cards with components assigned to workers
-    in_process = collection.count_documents({
-        "analysis.components": {"$exists": True, "$ne": {}}
-    })
-    
-    # Analyzed Today - cards with components generated today
-    today_start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-    today_end = today_start + timedelta(days=1)
-    
-    # Count cards that have been analyzed today
-    analyzed_today = collection.count_documents({
-        "$or": [
-            {
-                "analysis.last_updated": {
-                    "$gte": today_start,
-                    "$lt": today_end
-                }
-            },
-            {
-                "complete_analysis_metadata.generated_at": {
-                    "$gte": today_start,
-                    "$lt": today_end
-                }
-            }
-        ]
-    })
+    """Get statistics for the home page stats blocks (from the analysis_stats document)"""
+    stats = analysis_stats.get()
     
     return {
-        'total_cards': total_cards,
-        'fully_analyzed': fully_analyzed,
-        'in_process': in_process,
-        'analyzed_today': analyzed_today
+        'total_cards': stats['total_cards'],
+        # Fully Analyzed - cards with a synthesized analysis.complete_analysis (the field
+        # synthesis_manager writes; the legacy top-level complete_analysis is not counted)
+        'fully_analyzed': stats['synthesized'],
+        # In Process - cards with at least one component
+        'in_process': stats['cards_with_components'],
+        # Analyzed Today - cards whose analysis was updated since midnight UTC
+        # (the shared daily buckets are UTC, not the server's local day)
+        'analyzed_today': stats['analyzed_today'],
+        'components_generated': stats['components_generated']
     }
 
 def get_recent_cards_with_analysis(limit=60):
@@ -54,10 +27,10 @@ def get_recent_cards_with_analysis(limit=60):
     # Get cards with analysis, sorted by most recent analysis
     cards = list(collection.find({
         "analysis.components": {"$exists": True, "$ne": {}}
-    }).sort([
+    }, card_projection('tile')).sort([
         ("complete_analysis_metadata.generated_at", -1),
         ("analysis.last_updated", -1),
         ("_id", -1)
     ]).limit(limit))
     
-    return cards
+    return to_tiles(cards)
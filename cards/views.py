@@ -17,6 +17,15 @@ from .analysis_manager import analysis_manager
 from .ollama_client import ALL_COMPONENT_TYPES
 from .job_queue import job_queue
 from .utils import get_home_page_stats, get_recent_cards_with_analysis
+from .page_cache import get_cached_context
+from .analysis_stats import analysis_stats
+from .search_index import card_search, get_search_setting
+from .autocomplete import autocomplete_index
+from .pagination import cached_count, decode_cursor, fetch_keyset_page, page_cursors, with_tiebreak
+from .facets import faceted_page
+from .gallery_pool import gallery_pool
+from .projections import card_projection, to_tiles
+from .detail_cache import get_rendered_analysis
 
 # Import enhanced swarm components
 try:
@@ -40,177 +49,149 @@ logger = logging.getLogger(__name__)
 if not ENHANCED_FEATURES_AVAILABLE and views_logger is None:
     logger.warning("Enhanced features not available")
 
+# the_abyss.html shows no color/rarity/type/set counts, so don't compute them
+ABYSS_FACETS = False
+
 class HomeView(TemplateView):
     """Home page with recent cards and analysis stats."""
     template_name = 'cards/home.html'
     
+    def _build_home_context(self):
+        """Build the (cacheable) home page context."""
+        context = {}
+        cards_collection = get_cards_collection()
+          # Get analysis progress
+        if ENHANCED_FEATURES_AVAILABLE:
+            # Use enhanced swarm manager for better metrics
+            progress = enhanced_swarm.get_enhanced_swarm_status()
+            
+            # Quality metrics come from the global coherence accumulator in analysis_stats
+            try:
+                quality_stats = analysis_stats.get()
+                context['quality_metrics'] = {
+                    'avg_coherence_score': quality_stats['avg_coherence_score'],
+                    'high_quality_percentage': quality_stats['high_quality_percentage'],
+                    'total_components': quality_stats['components_generated']
+                }
+            except Exception as e:
+                logger.error(f"Error calculating quality metrics: {e}")
+                context['quality_metrics'] = {
+                    'avg_coherence_score': 0.0,
+                    'high_quality_percentage': 0,
+                    'total_components': 0
+                }
+        else:
+            # Fallback to basic analysis manager
+            progress = analysis_manager.get_analysis_progress()            # Get cards with at least 1 component for homepage display (increased to 60)
+        fully_analyzed_cards = get_recent_cards_with_analysis(limit=60)
+        
+        # Get home page statistics using our utility function
+        stats = get_home_page_stats()
+        
+        # Get some featured cards with high EDHREC rank
+        featured_cards = list(cards_collection.aggregate([
+            {
+                '$match': {
+                    'analysis.fully_analyzed': True,
+                    'edhrecRank': {'$exists': True, '$lte': 5000}  # Popular cards
+                }
+            },
+            {
+                '$sort': {'edhrecRank': 1}
+            },
+            {'$limit': 6},
+            {'$project': card_projection('tile')}
+        ]))
+        
+        # Get some recent analysis completions
+        recent_cards = list(cards_collection.aggregate([
+            {
+                '$match': {
+                    'analysis.fully_analyzed': True,
+                    'analysis.analysis_completed_at': {'$exists': True}
+                }
+            },
+            {
+                '$sort': {'analysis.analysis_completed_at': -1}
+            },
+            {'$limit': 12},
+            {'$project': card_projection('tile')}
+        ]))            # Analysis statistics - use our utility function
+        total_cards = stats['total_cards']
+        fully_analyzed_count = stats['fully_analyzed']
+        in_process_count = stats['in_process']
+        analyzed_today = stats['analyzed_today']
+        
+        # Additional calculations for backward compatibility
+        cards_with_components = in_process_count + fully_analyzed_count
+          # Get enhanced metrics - workers active, analysis speed, etc.
+        # (analyzed_today is now calculated in get_home_page_stats)
+        total_components = stats['components_generated']
+        avg_components = round(total_components / in_process_count, 1) if in_process_count else 0
+        
+        # Enhanced statistics if available
+        enhanced_stats = {}
+        if ENHANCED_FEATURES_AVAILABLE:
+            try:
+                # Get priority queue info
+                high_priority_count = enhanced_swarm.priority_cache.count_documents({
+                    'priority_score': {'$gte': 0.7}
+                })
+                
+                # Get recent batch processing stats
+                recent_batch_tasks = enhanced_swarm.tasks.count_documents({
+                    'batch_processing': True,
+                    'completed_at': {'$gte': datetime.now() - timedelta(hours=24)}
+                })
+                
+                enhanced_stats = {
+                    'high_priority_cards': high_priority_count,
+                    'batch_processed_today': recent_batch_tasks,
+                    'coherence_enabled': True,
+                    'smart_prioritization': True
+                }
+            except Exception as e:
+                logger.error(f"Error getting enhanced stats: {e}")
+                enhanced_stats = {
+                    'high_priority_cards': 0,
+                    'batch_processed_today': 0,
+                    'coherence_enabled': False,
+                    'smart_prioritization': False
+                }
+          # Get synthesis statistics
+        try:
+            from synthesis_manager import synthesis_manager
+            synthesis_stats = synthesis_manager.get_synthesis_stats()
+        except ImportError:
+            synthesis_stats = {                    'cards_with_synthesis': 0,
+                'synthesis_completion_rate': 0.0
+            }
+        context.update({
+            'fully_analyzed_cards': fully_analyzed_cards,
+            'stats': stats,  # Add our new stats object
+            'statistics': {
+                'total_cards': f"{total_cards:,}",
+                'fully_analyzed': fully_analyzed_count,
+                'in_process': in_process_count,
+                'analyzed_today': analyzed_today,
+                'total_components': f"{total_components:,}",
+                'avg_components': avg_components,
+            },
+            'synthesis_stats': synthesis_stats,
+            'enhanced_stats': enhanced_stats,
+            'enhanced_features_available': ENHANCED_FEATURES_AVAILABLE,
+            'analysis_progress': progress,
+        })
+        
+        return context
+    
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         
         try:
-            cards_collection = get_cards_collection()
-              # Get analysis progress
-            if ENHANCED_FEATURES_AVAILABLE:
-                # Use enhanced swarm manager for better metrics
-                progress = enhanced_swarm.get_enhanced_swarm_status()
-                
-                # Get quality metrics for display
-                try:
-                    quality_pipeline = [
-                        {
-                            '$match': {
-                                'analysis.components': {'$exists': True, '$ne': {}}
-                            }
-                        },
-                        {
-                            '$project': {
-                                'components': {'$objectToArray': '$analysis.components'},
-                                'total_components': {'$size': {'$objectToArray': '$analysis.components'}}
-                            }
-                        },
-                        {
-                            '$unwind': '$components'
-                        },
-                        {
-                            '$group': {
-                                '_id': None,
-                                'total_components_generated': {'$sum': 1},
-                                'avg_coherence_score': {
-                                    '$avg': '$components.v.coherence_score'
-                                },
-                                'high_coherence_count': {
-                                    '$sum': {
-                                        '$cond': [
-                                            {'$gte': ['$components.v.coherence_score', 0.8]},
-                                            1, 0
-                                        ]
-                                    }
-                                }
-                            }
-                        }
-                    ]
-                    
-                    quality_result = list(cards_collection.aggregate(quality_pipeline))
-                    if quality_result:
-                        quality_stats = quality_result[0]
-                        quality_percentage = (quality_stats.get('high_coherence_count', 0) / 
-                                            max(quality_stats.get('total_components_generated', 1), 1)) * 100
-                    else:
-                        quality_stats = {}
-                        quality_percentage = 0
-                        
-                    context['quality_metrics'] = {
-                        'avg_coherence_score': quality_stats.get('avg_coherence_score', 0.0),
-                        'high_quality_percentage': quality_percentage,
-                        'total_components': quality_stats.get('total_components_generated', 0)
-                    }
-                except Exception as e:
-                    logger.error(f"Error calculating quality metrics: {e}")
-                    context['quality_metrics'] = {
-                        'avg_coherence_score': 0.0,
-                        'high_quality_percentage': 0,
-                        'total_components': 0
-                    }
-            else:
-                # Fallback to basic analysis manager
-                progress = analysis_manager.get_analysis_progress()            # Get cards with at least 1 component for homepage display (increased to 60)
-            fully_analyzed_cards = get_recent_cards_with_analysis(limit=60)
-            
-            # Get home page statistics using our utility function
-            stats = get_home_page_stats()
-            
-            # Get some featured cards with high EDHREC rank
-            featured_cards = list(cards_collection.aggregate([
-                {
-                    '$match': {
-                        'analysis.fully_analyzed': True,
-                        'edhrecRank': {'$exists': True, '$lte': 5000}  # Popular cards
-                    }
-                },
-                {
-                    '$sort': {'edhrecRank': 1}
-                },
-                {'$limit': 6}
-            ]))
-            
-            # Get some recent analysis completions
-            recent_cards = list(cards_collection.aggregate([
-                {
-                    '$match': {
-                        'analysis.fully_analyzed': True,
-                        'analysis.analysis_completed_at': {'$exists': True}
-                    }
-                },
-                {
-                    '$sort': {'analysis.analysis_completed_at': -1}
-                },
-                {'$limit': 12}
-            ]))            # Analysis statistics - use our utility function
-            total_cards = stats['total_cards']
-            fully_analyzed_count = stats['fully_analyzed']
-            in_process_count = stats['in_process']
-            analyzed_today = stats['analyzed_today']
-            
-            # Additional calculations for backward compatibility
-            cards_with_components = in_process_count + fully_analyzed_count
-              # Get enhanced metrics - workers active, analysis speed, etc.
-            # (analyzed_today is now calculated in get_home_page_stats)
-            total_components = fully_analyzed_count * 20  # Each fully analyzed card has exactly 20 components
-            avg_components = 20 if fully_analyzed_count > 0 else 0
-            
-            # Enhanced statistics if available
-            enhanced_stats = {}
-            if ENHANCED_FEATURES_AVAILABLE:
-                try:
-                    # Get priority queue info
-                    high_priority_count = enhanced_swarm.priority_cache.count_documents({
-                        'priority_score': {'$gte': 0.7}
-                    })
-                    
-                    # Get recent batch processing stats
-                    recent_batch_tasks = enhanced_swarm.tasks.count_documents({
-                        'batch_processing': True,
-                        'completed_at': {'$gte': datetime.now() - timedelta(hours=24)}
-                    })
-                    
-                    enhanced_stats = {
-                        'high_priority_cards': high_priority_count,
-                        'batch_processed_today': recent_batch_tasks,
-                        'coherence_enabled': True,
-                        'smart_prioritization': True
-                    }
-                except Exception as e:
-                    logger.error(f"Error getting enhanced stats: {e}")
-                    enhanced_stats = {
-                        'high_priority_cards': 0,
-                        'batch_processed_today': 0,
-                        'coherence_enabled': False,
-                        'smart_prioritization': False
-                    }
-              # Get synthesis statistics
-            try:
-                from synthesis_manager import synthesis_manager
-                synthesis_stats = synthesis_manager.get_synthesis_stats()
-            except ImportError:
-                synthesis_stats = {                    'cards_with_synthesis': 0,
-                    'synthesis_completion_rate': 0.0
-                }
-            context.update({
-                'fully_analyzed_cards': fully_analyzed_cards,
-                'stats': stats,  # Add our new stats object
-                'statistics': {
-                    'total_cards': f"{total_cards:,}",
-                    'fully_analyzed': fully_analyzed_count,
-                    'in_process': in_process_count,
-                    'analyzed_today': analyzed_today,
-                    'total_components': f"{total_components:,}",
-                    'avg_components': avg_components,
-                },
-                'synthesis_stats': synthesis_stats,
-                'enhanced_stats': enhanced_stats,
-                'enhanced_features_available': ENHANCED_FEATURES_AVAILABLE,
-                'analysis_progress': progress,
-            })
+            # Served from the page cache; rebuilt on TTL expiry or when
+            # submissions/synthesis invalidate it (see cards.page_cache)
+            context.update(get_cached_context('page:home:view', self._build_home_context))
             
         except Exception as e:
             logger.error(f"Error in home view: {e}")
@@ -261,7 +242,8 @@ class CardDetailView(TemplateView):
             return context
         
         try:
-            card = analysis_manager.get_card_by_uuid(card_uuid)
+            # Header fields only: the component text comes pre-rendered from the detail cache
+            card = analysis_manager.get_card_by_uuid(card_uuid, shape='detail_header')
             if views_logger:
                 views_logger.debug(f"Card found: {card['name'] if card else 'None'}")
             
@@ -270,77 +252,26 @@ class CardDetailView(TemplateView):
                     views_logger.warning("Card not found in database")
                 context['error'] = "Card not found in database"
                 return context
-              # Get analysis data
-            analysis = card.get('analysis', {})
-            components = analysis.get('components', {})
             
-            # Enhanced component processing
-            enhanced_components = {}
-            coherence_summary = {'high': 0, 'medium': 0, 'low': 0}
-            
-            if ENHANCED_FEATURES_AVAILABLE and components:
-                for comp_type, comp_data in components.items():
-                    if isinstance(comp_data, dict):
-                        coherence_score = comp_data.get('coherence_score', 0.0)
-                        enhanced_components[comp_type] = {
-                            'content': comp_data.get('content', ''),
-                            'coherence_score': coherence_score,
-                            'generated_by': comp_data.get('generated_by', 'Unknown'),
-                            'generated_at': comp_data.get('generated_at'),
-                            'batch_processed': comp_data.get('batch_processed', False)
-                        }
-                        
-                        # Categorize coherence level
-                        if coherence_score >= 0.8:
-                            coherence_summary['high'] += 1
-                        elif coherence_score >= 0.6:
-                            coherence_summary['medium'] += 1
-                        else:
-                            coherence_summary['low'] += 1
-                    else:
-                        # Legacy format - just content string
-                        enhanced_components[comp_type] = {
-                            'content': str(comp_data),
-                            'coherence_score': 0.0,
-                            'generated_by': 'Legacy',
-                            'generated_at': None,
-                            'batch_processed': False
-                        }
-            else:
-                # Basic fallback
-                for comp_type, comp_data in components.items():
-                    enhanced_components[comp_type] = {                        'content': str(comp_data) if not isinstance(comp_data, dict) else comp_data.get('content', ''),
-                        'coherence_score': 0.0,
-                        'generated_by': 'Unknown',
-                        'generated_at': None,
-                        'batch_processed': False
-                    }
+            rendered = get_rendered_analysis(card)
+            enhanced_components = rendered['components']
+            analysis = {**card.get('analysis', {}), 'components': enhanced_components}
             
             if views_logger:
                 views_logger.debug(f"Analysis components count: {len(enhanced_components)}")
-              # Get complete analysis (synthesis)
-            complete_analysis = analysis.get('complete_analysis', '')
-            has_complete_analysis = bool(complete_analysis)
-            synthesis_metadata = {}
-            
-            if has_complete_analysis:
-                synthesis_metadata = {
-                    'generated_at': analysis.get('synthesis_generated_at'),
-                    'generated_by': analysis.get('synthesis_generated_by', 'Unknown'),
-                    'version': analysis.get('synthesis_version', 1.0)
-                }
             
             context.update({
                 'card': card,
                 'analysis': analysis,
-                'components': components,  # Keep original for compatibility
+                'components': enhanced_components,  # Same components, kept for older templates
                 'enhanced_components': enhanced_components,
-                'coherence_summary': coherence_summary,
+                'coherence_summary': rendered['coherence_summary'],
                 'enhanced_features_available': ENHANCED_FEATURES_AVAILABLE,
-                'completion_percentage': (len(components) / 20) * 100 if components else 0,
-                'complete_analysis': complete_analysis,
-                'has_complete_analysis': has_complete_analysis,
-                'synthesis_metadata': synthesis_metadata
+                'completion_percentage': (len(enhanced_components) / 20) * 100 if enhanced_components else 0,
+                'complete_analysis': rendered['complete_analysis'],
+                'complete_analysis_html': rendered['complete_analysis_html'],
+                'has_complete_analysis': bool(rendered['complete_analysis']),
+                'synthesis_metadata': rendered['synthesis_metadata']
             })
             
             if views_logger:
@@ -378,7 +309,7 @@ def browse_cards(request):
 def start_analysis(request, card_uuid):
     """Start analysis for a specific card (AJAX endpoint)."""
     try:
-        card = analysis_manager.get_card_by_uuid(card_uuid)
+        card = analysis_manager.get_card_by_uuid(card_uuid, shape='detail_header')
         if not card:
             return JsonResponse({'error': 'Card not found'}, status=404)
         
@@ -401,7 +332,7 @@ def start_analysis(request, card_uuid):
         
         if success:
             # Get updated analysis
-            updated_card = analysis_manager.get_card_by_uuid(card_uuid)
+            updated_card = analysis_manager.get_card_by_uuid(card_uuid, shape='detail_header')
             updated_analysis = updated_card.get('analysis', {})
             
             return JsonResponse({
@@ -471,30 +402,43 @@ def admin_card_list(request):
         else:
             mongo_query = {}
         
-        # Get total count for pagination info
-        total_cards = cards_collection.count_documents(mongo_query)
+        # Get total count for pagination info (cached per query)
+        total_cards = cached_count(cards_collection, mongo_query)
         
-        # Pagination
-        page = request.GET.get('page', 1)
+        # Pagination: Previous/Next follow keyset cursors, ?page=N jumps use skip
         per_page = 50
-        skip = (int(page) - 1) * per_page
+        sort_criteria = [('name', 1)]
+        cursor = decode_cursor(request.GET.get('cursor', ''), sort_criteria)
+        page = cursor['page'] if cursor else int(request.GET.get('page', 1))
         
         # Get cards
-        cards = list(cards_collection.find(mongo_query).skip(skip).limit(per_page))
+        if cursor or page == 1:
+            result = fetch_keyset_page(cards_collection, mongo_query, sort_criteria, per_page, cursor,
+                                       card_projection('tile'))
+            cards = result['docs']
+            cursors = {key: result[key] for key in ('next_cursor', 'previous_cursor')}
+        else:
+            skip = (page - 1) * per_page
+            cards = list(cards_collection.find(mongo_query, card_projection('tile'))
+                         .sort(with_tiebreak(sort_criteria)).skip(skip).limit(per_page))
+            cursors = page_cursors(cards, sort_criteria, page, True, skip + len(cards) < total_cards)
+        cards = to_tiles(cards)
         
         # Simple pagination context
-        total_pages = (total_cards + per_page - 1) // per_page
+        total_pages = max((total_cards + per_page - 1) // per_page, page)
         
         context = {
             'cards': cards,
             'search_query': search_query,
-            'current_page': int(page),
+            'current_page': page,
             'total_pages': total_pages,
             'total_cards': total_cards,
-            'has_previous': int(page) > 1,
-            'has_next': int(page) < total_pages,
-            'previous_page': int(page) - 1 if int(page) > 1 else None,
-            'next_page': int(page) + 1 if int(page) < total_pages else None,
+            'has_previous': cursors['previous_cursor'] is not None,
+            'has_next': cursors['next_cursor'] is not None,
+            'previous_page': page - 1 if page > 1 else None,
+            'next_page': page + 1 if cursors['next_cursor'] else None,
+            'previous_cursor': cursors['previous_cursor'],
+            'next_cursor': cursors['next_cursor'],
         }
         
         return render(request, 'admin/cards/card_list.html', context)
@@ -658,6 +602,14 @@ def worker_control_panel(request):
         messages.error(request, "Error loading worker control panel")
         return render(request, 'cards/worker_control_panel.html', {})
 
+def _parse_price(value):
+    """Price filter value as a float, or None if blank or invalid."""
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
 def the_abyss(request):
     """
     The Abyss - Ultimate card discovery and search experience.
@@ -803,51 +755,71 @@ def the_abyss(request):
                     'prices.price_trend_30d': {'$gte': -5, '$lte': 5}
                 })
         
-        # Get total count
-        total_cards = cards_collection.count_documents(query)
+        # Pagination: a cursor token carries the position (and page number) of
+        # Previous/Next links; plain ?page=N is kept for the numbered links
+        per_page = 24
+        cursor = decode_cursor(request.GET.get('cursor', ''), sort_criteria)
+        if cursor:
+            page = cursor['page']
+        skip = (page - 1) * per_page
         
-        # Get pricing statistics for the current result set
-        price_stats = None
-        if total_cards > 0 and total_cards < 10000:  # Only for manageable result sets
+        # Answer from the in-memory search index; fall back to Mongo if it is off or fails
+        search_result = None
+        if get_search_setting('enabled', True):
             try:
-                price_field = f'prices.{price_currency}'
-                pipeline = [
-                    {'$match': query},
-                    {'$match': {price_field: {'$exists': True, '$ne': None, '$gt': 0}}},
-                    {'$group': {
-                        '_id': None,
-                        'avg_price': {'$avg': f'${price_field}'},
-                        'min_price': {'$min': f'${price_field}'},
-                        'max_price': {'$max': f'${price_field}'},
-                        'count_with_price': {'$sum': 1}
-                    }}
-                ]
-                price_result = list(cards_collection.aggregate(pipeline))
-                if price_result and price_result[0].get('count_with_price', 0) > 0:
-                    stats = price_result[0]
-                    price_stats = {
-                        'average': round(stats.get('avg_price', 0), 2),
-                        'minimum': round(stats.get('min_price', 0), 2),
-                        'maximum': round(stats.get('max_price', 0), 2),
-                        'count_with_price': stats.get('count_with_price', 0),
-                        'currency': '€' if price_currency == 'eur' else '$'
-                    }
+                search_result = card_search.search({
+                    'q': search_query,
+                    'colors': color_filter,
+                    'rarity': rarity_filter,
+                    'type': type_filter,
+                    'set': set_filter,
+                    'price_min': _parse_price(price_min),
+                    'price_max': _parse_price(price_max),
+                    'price_currency': price_currency,
+                    'trend': trend_filter,
+                    'collection': collection,
+                }, sort_criteria, offset=skip, limit=per_page, facets=ABYSS_FACETS, price_stats=True)
             except Exception as e:
-                logger.warning(f"Error calculating price stats: {e}")
-                price_stats = None
+                logger.warning(f"Search index unavailable, using Mongo for The Abyss: {e}")
         
-        # Pagination
-        per_page = 24
-        skip = (page - 1) * per_page
+        if search_result is not None:
+            total_cards = search_result['total']
+            cards = card_search.fetch_page(search_result['ids'], card_projection('tile'))
+            cursors = page_cursors(cards, sort_criteria, page, page > 1, skip + len(cards) < total_cards)
+            stats = search_result['price_stats']
+        else:
+            # A keyset find for the rows plus one $facet pass for total and price stats
+            # (the statistics are cached per query, so later pages only fetch rows)
+            result = faceted_page(cards_collection, query, sort_criteria, per_page, cursor,
+                                  skip=skip, price_field=f'prices.{price_currency}',
+                                  projection=card_projection('tile'), facets=ABYSS_FACETS)
+            cards = result['docs']
+            cursors = {key: result[key] for key in ('next_cursor', 'previous_cursor')}
+            total_cards = result['total']
+            stats = result['price_stats']
         
-        # Execute query with sorting
-        cards_cursor = cards_collection.find(query).sort(sort_criteria).skip(skip).limit(per_page)
-        cards = list(cards_cursor)
+        price_stats = None
+        if stats and stats['count_with_price']:
+            price_stats = {
+                'average': round(stats['average'], 2),
+                'minimum': round(stats['minimum'], 2),
+                'maximum': round(stats['maximum'], 2),
+                'count_with_price': stats['count_with_price'],
+                'currency': '€' if price_currency == 'eur' else '$'
+            }
+        
+        cards = to_tiles(cards)
         
         # Calculate pagination info
-        total_pages = (total_cards + per_page - 1) // per_page
-        has_previous = page > 1
-        has_next = page < total_pages
+        total_pages = max((total_cards + per_page - 1) // per_page, page)
+        has_previous = cursors['previous_cursor'] is not None
+        has_next = cursors['next_cursor'] is not None
+        
+        # Filters carried by every pagination link
+        link_params = request.GET.copy()
+        for param in ('page', 'cursor'):
+            link_params.pop(param, None)
+        pagination_query = f'{link_params.urlencode()}&' if link_params else ''
         
         # Enhanced featured collections with more pricing options
         featured_collections = []
@@ -937,6 +909,9 @@ def the_abyss(request):
             'has_next': has_next,
             'previous_page': page - 1 if has_previous else None,
             'next_page': page + 1 if has_next else None,
+            'previous_cursor': cursors['previous_cursor'],
+            'next_cursor': cursors['next_cursor'],
+            'pagination_query': pagination_query,
             'featured_collections': featured_collections,
             'is_search': is_search
         }
@@ -973,11 +948,38 @@ def enhanced_search(request):
             'total_cards': 'N/A',
         })
 
+GALLERY_PAGE_SIZE = 100
+
+
+def _parse_seed(value):
+    """Gallery seed from the query string, or None for a fresh random one."""
+    try:
+        return int(value) if value else None
+    except ValueError:
+        return None
+
+
 def art_gallery(request):
     """
     MTG Art Gallery - Simple random art gallery.
     """
     try:
+        # Served from the in-memory gallery pool; $sample below only until it is built
+        try:
+            seed = _parse_seed(request.GET.get('seed'))
+            result = gallery_pool.page(seed=seed, page=1, per_page=GALLERY_PAGE_SIZE)
+            gallery_cards = result['cards']
+            return render(request, 'cards/art_gallery.html', {
+                'gallery_cards': gallery_cards,
+                'total_cards': len(gallery_cards),
+                'analyzed_count': sum(1 for card in gallery_cards if card['is_analyzed']),
+                'gallery_seed': result['seed'],
+                'gallery_next_url': f"/api/gallery/?seed={result['seed']}&page=2" if result['has_next'] else None,
+                'page_title': 'MTG Art Gallery'
+            })
+        except RuntimeError as e:
+            logger.info(f"Art gallery falling back to $sample: {e}")
+        
         cards_collection = get_cards_collection()
         
         # Just get 100 random cards with art_crop images - simple!
@@ -993,7 +995,7 @@ def art_gallery(request):
                 'setName': 1,
                 'rarity': 1,
                 'type': 1,
-                'analysis': 1            }}
+                'analysis.component_count': 1            }}
         ]
         
         cards_cursor = cards_collection.aggregate(pipeline)
@@ -1036,6 +1038,25 @@ def art_gallery(request):
         })
 
 # API endpoints for enhanced user experience
+def gallery_api(request):
+    """Infinite-scroll pages of the art gallery: ?seed=<int>&page=<n>."""
+    try:
+        page = max(int(request.GET.get('page', 1)), 1)
+    except ValueError:
+        page = 1
+    try:
+        result = gallery_pool.page(seed=_parse_seed(request.GET.get('seed')), page=page,
+                                   per_page=GALLERY_PAGE_SIZE)
+    except RuntimeError as e:
+        response = JsonResponse({'cards': [], 'error': str(e)}, status=503)
+        response['Retry-After'] = '5'
+        return response
+
+    result['next_url'] = (
+        f"/api/gallery/?seed={result['seed']}&page={result['page'] + 1}" if result['has_next'] else None
+    )
+    return JsonResponse(result)
+
 def autocomplete_api(request):
     """API endpoint for search autocomplete suggestions."""
     try:
@@ -1043,6 +1064,11 @@ def autocomplete_api(request):
         if len(query) < 2:
             return JsonResponse({'suggestions': []})
             
+        try:
+            return JsonResponse({'suggestions': autocomplete_index.suggest(query, limit=10)})
+        except Exception as e:
+            logger.warning(f"Autocomplete index unavailable, using Mongo: {e}")
+
         cards_collection = get_cards_collection()
         
         # Search for card names that match the query
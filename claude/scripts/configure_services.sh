@@ -57,6 +57,31 @@ server {
         add_header Cache-Control "public, immutable";
     }
 
+    # Pre-rendered card pages (manage.py export_static_cards) for visitors
+    # without a session; everything else falls through to Django.
+    # gzip_static serves index.html.gz; add "brotli_static on;" if the
+    # ngx_brotli module is installed to use index.html.br as well.
+    location ~ ^/card/[0-9A-Fa-f-]+/$ {
+        error_page 418 = @django;
+        if (\$cookie_sessionid) { return 418; }
+        if (\$args) { return 418; }
+
+        root /home/emteegee/emteegee/data/static_cards;
+        gzip_static on;
+        default_type text/html;
+        gzip_vary on;
+        try_files \$uri/index.html @django;
+    }
+
+    location @django {
+        include proxy_params;
+        proxy_pass http://unix:/home/emteegee/emteegee/emteegee.sock;
+        proxy_set_header Host \$host;
+        proxy_set_header X-Real-IP \$remote_addr;
+        proxy_set_header X-Forwarded-For \$proxy_add_x_forwarded_for;
+        proxy_set_header X-Forwarded-Proto \$scheme;
+    }
+
     # Main application
     location / {
         include proxy_params;
@@ -144,6 +169,11 @@ RestartSec=10
 WantedBy=multi-user.target
 EOF
 
+# Refresh pre-rendered card pages every 10 minutes (only changed cards are re-rendered)
+echo "⏰ Scheduling static card page export..."
+(crontab -u emteegee -l 2>/dev/null | grep -v export_static_cards; \
+ echo "*/10 * * * * cd /home/emteegee/emteegee && venv/bin/python manage.py export_static_cards >> /home/emteegee/logs/export_static_cards.log 2>&1") | crontab -u emteegee -
+
 # Reload systemd and start services
 echo "🚀 Starting services..."
 systemctl daemon-reload
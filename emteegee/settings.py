@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 from pathlib import Path
 import os
+import tempfile
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -57,6 +58,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    # Exported card pages for anonymous visitors, ahead of sessions/auth
+    'cards.static_cards.StaticCardMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -155,6 +158,116 @@ else:
         'auth_source': 'admin'
     }
 
+# Connection pool sizing for the shared per-process MongoClient
+# (see cards.models.get_mongodb_client). Unset values use pymongo defaults.
+MONGODB_SETTINGS.update({
+    'max_pool_size': os.getenv('MONGODB_MAX_POOL_SIZE', 50),
+    'min_pool_size': os.getenv('MONGODB_MIN_POOL_SIZE', 0),
+    'wait_queue_timeout_ms': os.getenv('MONGODB_WAIT_QUEUE_TIMEOUT_MS', 5000),
+})
+
+# Enhanced swarm work queue
+SWARM_SETTINGS = {
+    # Seconds a leased card stays reserved for a worker before it is requeued
+    'lease_seconds': int(os.getenv('SWARM_LEASE_SECONDS', 1800)),
+    # Most cards a worker can lease in one get_work call
+    'max_lease_batch': int(os.getenv('SWARM_MAX_LEASE_BATCH', 10)),
+    # Cards pulled from the cards collection into swarm_queue per refill
+    'queue_refill_batch_size': int(os.getenv('SWARM_QUEUE_REFILL_BATCH_SIZE', 500)),
+    # Refill when fewer than this many cards are queued
+    'queue_low_water_mark': int(os.getenv('SWARM_QUEUE_LOW_WATER_MARK', 100)),
+    # Minimum seconds between lease expiry sweeps / refill checks per process
+    'queue_maintenance_interval': int(os.getenv('SWARM_QUEUE_MAINTENANCE_INTERVAL', 30)),
+}
+
+# Cache - shared Redis when REDIS_URL is set (needs the redis package),
+# otherwise a file cache shared by all processes on this host.
+# Production should set REDIS_URL: the file cache lists its directory on every
+# set and, once full, deletes a random 1/CULL_FREQUENCY of its entries.
+# Rendered card detail HTML (cards/detail_cache.py) has its own 'card_details'
+# alias, sized to the card count, so crawler traffic over card pages cannot
+# evict the page contexts and stampede locks kept in 'default'.
+if os.getenv('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+        },
+        'card_details': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+            'KEY_PREFIX': 'card_details',
+        },
+    }
+else:
+    CACHE_DIR = os.getenv('DJANGO_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'emteegee_cache'))
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': CACHE_DIR,
+            'OPTIONS': {
+                # Page contexts, locks and per-query counts/facets
+                'MAX_ENTRIES': int(os.getenv('DJANGO_CACHE_MAX_ENTRIES', 10000)),
+            },
+        },
+        'card_details': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': f'{CACHE_DIR}_card_details',
+            'OPTIONS': {
+                # One entry per card; above the card count nothing is culled
+                'MAX_ENTRIES': int(os.getenv('CARD_DETAIL_CACHE_MAX_ENTRIES', 120000)),
+                'CULL_FREQUENCY': 10,
+            },
+        },
+    }
+
+# Server-side page context cache (see cards.page_cache)
+PAGE_CACHE_SETTINGS = {
+    # Seconds the home page context is served before a rebuild
+    'home_ttl': int(os.getenv('HOME_PAGE_CACHE_TTL', 60)),
+    # Seconds an expired context may still be served while it is rebuilt
+    'stale_ttl': int(os.getenv('PAGE_CACHE_STALE_TTL', 3600)),
+    # Seconds a rebuild holds the stampede lock
+    'lock_seconds': int(os.getenv('PAGE_CACHE_LOCK_SECONDS', 30)),
+    # Data changes never expire a context younger than this
+    'min_fresh': int(os.getenv('PAGE_CACHE_MIN_FRESH', 10)),
+    # Seconds rendered card detail HTML is kept (entries are also versioned by analysis stamp)
+    'detail_ttl': int(os.getenv('CARD_DETAIL_CACHE_TTL', 86400)),
+}
+
+# In-memory search index behind The Abyss (cards/search_index.py)
+SEARCH_INDEX_SETTINGS = {
+    'enabled': os.getenv('SEARCH_INDEX_ENABLED', 'true').lower() == 'true',
+    # Seconds between delta refreshes (new and touched cards)
+    'refresh_interval': int(os.getenv('SEARCH_INDEX_REFRESH_INTERVAL', 60)),
+    # Seconds before the main segment is rebuilt from a full scan
+    'full_rebuild_interval': int(os.getenv('SEARCH_INDEX_REBUILD_INTERVAL', 6 * 3600)),
+    # Delta size that triggers an early full rebuild
+    'max_delta': int(os.getenv('SEARCH_INDEX_MAX_DELTA', 2000)),
+}
+
+# Autocomplete index for /api/autocomplete/ (cards/autocomplete.py)
+AUTOCOMPLETE_SETTINGS = {
+    # Written by `manage.py build_autocomplete_index`, loaded on first use
+    'snapshot_path': os.getenv('AUTOCOMPLETE_SNAPSHOT', str(BASE_DIR / 'data' / 'autocomplete.json.gz')),
+    # Snapshots older than this are rebuilt from Mongo
+    'max_age': int(os.getenv('AUTOCOMPLETE_MAX_AGE', 24 * 3600)),
+    # Cached responses for hot prefixes
+    'cache_size': int(os.getenv('AUTOCOMPLETE_CACHE_SIZE', 2048)),
+}
+
+# In-memory art gallery pool (cards/gallery_pool.py)
+GALLERY_POOL_SETTINGS = {
+    # Seconds between background rebuilds of the shuffled pool
+    'refresh_interval': int(os.getenv('GALLERY_POOL_REFRESH_INTERVAL', 3600)),
+}
+
+# Pre-rendered card pages for anonymous visitors (cards/static_cards.py)
+STATIC_CARDS_SETTINGS = {
+    'enabled': os.getenv('STATIC_CARDS_ENABLED', 'true').lower() == 'true',
+    'root': os.getenv('STATIC_CARDS_ROOT', str(BASE_DIR / 'data' / 'static_cards')),
+}
+
 # Disable migrations for MongoDB apps
 MIGRATION_MODULES = {
     'cards': None,
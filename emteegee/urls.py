@@ -16,7 +16,7 @@ Including another URLconf
 """
 import os
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path, include
 from django.conf import settings
 from django.conf.urls.static import static
 from django.views.static import serve
@@ -25,6 +25,8 @@ urlpatterns = [
     path('abyss/', admin.site.urls),    path('', include('cards.urls_working')),  # Using working version temporarily while debugging
     path('api/enhanced_swarm/', include('cards.enhanced_api_urls')),  # Enhanced Swarm API - v2.0
     path('sitemap.xml', serve, {'path': 'sitemap.xml', 'document_root': os.path.join(settings.BASE_DIR, 'static')}),
+    # Gzipped shards listed by the sitemap index (generate_sitemap.py)
+    re_path(r'^(?P<path>sitemap-(?:pages|\d+)\.xml\.gz)$', serve, {'document_root': os.path.join(settings.BASE_DIR, 'static')}),
 ]
 
 # Serve static files during development
@@ -1,239 +1,305 @@
 #!/usr/bin/env python3
 """
 MTG Card Sitemap Generator
-Generates XML sitemap for all cards in the database
+Generates a sharded XML sitemap for all cards in the database
+
+Cards are streamed in _id order (keyset batches, no skip) and written
+straight to gzipped shards of at most 50,000 URLs each, listed by
+static/sitemap.xml (a sitemap index). lastmod comes from each card's
+analysis.last_updated / synthesis time.
+
+Shard contents are hashed and recorded in a manifest; a shard whose URLs
+did not change since the previous run is left untouched (and keeps its
+lastmod in the index), so crawlers only refetch shards that changed. New
+cards get larger _ids and land in the last shard.
+
+    python generate_sitemap.py [--base-url https://mtgabyss.com] [--full]
 """
 
+import argparse
+import gzip
+import hashlib
+import json
 import os
 import sys
 import django
 from datetime import datetime
-import xml.etree.ElementTree as ET
 from urllib.parse import urljoin
+from xml.sax.saxutils import escape
 
 # Setup Django
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'emteegee.settings')
 django.setup()
 
+from django.conf import settings
 from cards.models import get_mongodb_collection
 
-def generate_sitemap():
-    """Generate XML sitemap for all cards"""
+BASE_URL = "https://mtgabyss.com"  # Change this to your actual domain
+
+# Sitemap protocol limit per file
+URLS_PER_SHARD = 50000
+BATCH_SIZE = 1000
+
+OUTPUT_DIR = os.path.join(settings.BASE_DIR, 'static')
+INDEX_FILE = 'sitemap.xml'
+MANIFEST_FILE = 'sitemap-manifest.json'
+PAGES_SHARD = 'sitemap-pages.xml.gz'
+
+# Site sections listed ahead of the cards
+PAGES = [
+    ('', 'daily', '1.0'),
+    # /abyss/ itself resolves to the Django admin (emteegee/urls.py), so list the Abyss by its alias
+    ('card-list/', 'daily', '0.9'),
+    ('search/', 'daily', '0.8'),
+    ('gallery/', 'daily', '0.7'),
+]
+
+CARD_PROJECTION = {
+    'name': 1,
+    'uuid': 1,
+    'analysis.fully_analyzed': 1,
+    'analysis.last_updated': 1,
+    'analysis.synthesis_generated_at': 1,
+}
+
+URLSET_OPEN = ('<?xml version="1.0" encoding="UTF-8"?>\n'
+               '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n')
+URLSET_CLOSE = '</urlset>\n'
+
+
+def iter_cards(cards, batch_size=BATCH_SIZE):
+    """Stream every card in _id order, one keyset batch at a time."""
+    last_id = None
+    while True:
+        query = {'_id': {'$gt': last_id}} if last_id is not None else {}
+        batch = list(cards.find(query, CARD_PROJECTION).sort('_id', 1).limit(batch_size))
+        if not batch:
+            return
+        yield from batch
+        last_id = batch[-1]['_id']
+
+
+def card_lastmod(card):
+    """Newest analysis timestamp of a card as a W3C date (None if never analyzed)."""
+    analysis = card.get('analysis') or {}
+    stamps = [
+        value for value in (analysis.get('last_updated'), analysis.get('synthesis_generated_at'))
+        if hasattr(value, 'strftime')
+    ]
+    return max(stamps).strftime('%Y-%m-%d') if stamps else None
+
+
+def url_entry(loc, lastmod, changefreq, priority):
+    lastmod_tag = f'<lastmod>{lastmod}</lastmod>' if lastmod else ''
+    return (f'  <url><loc>{escape(loc)}</loc>{lastmod_tag}'
+            f'<changefreq>{changefreq}</changefreq><priority>{priority}</priority></url>\n')
+
+
+def iter_card_entries(cards, base_url):
+    """(xml entry, lastmod) for every listable card, in _id order."""
+    for card in iter_cards(cards):
+        card_name = (card.get('name') or '').strip()
+        card_uuid = (card.get('uuid') or '').strip()
+        if not card_name or not card_uuid:
+            continue
+
+        # Analyzed cards change more often and matter more
+        if (card.get('analysis') or {}).get('fully_analyzed', False):
+            changefreq, priority = 'weekly', '0.8'
+        else:
+            changefreq, priority = 'monthly', '0.6'
+        lastmod = card_lastmod(card)
+        yield url_entry(urljoin(base_url, f'card/{card_uuid}/'), lastmod, changefreq, priority), lastmod
+
+
+class ShardWriter:
+    """Writes one gzipped urlset to a temp file, hashing the entries as it goes."""
+
+    def __init__(self, output_dir, name):
+        self.path = os.path.join(output_dir, name)
+        self.tmp_path = os.path.join(output_dir, f'.{name}.tmp')
+        self.name = name
+        self.digest = hashlib.sha256()
+        self.count = 0
+        self.lastmod = None
+        # mtime=0 keeps the gzip bytes identical for identical content
+        self._file = gzip.GzipFile(self.tmp_path, 'wb', compresslevel=9, mtime=0)
+        self._file.write(URLSET_OPEN.encode('utf-8'))
+
+    def add(self, entry, lastmod=None):
+        data = entry.encode('utf-8')
+        self._file.write(data)
+        self.digest.update(data)
+        self.count += 1
+        if lastmod and (self.lastmod is None or lastmod > self.lastmod):
+            self.lastmod = lastmod
+
+    def finish(self, previous):
+        """Replace the shard if its contents changed; returns its manifest entry."""
+        self._file.write(URLSET_CLOSE.encode('utf-8'))
+        self._file.close()
+        digest = self.digest.hexdigest()
+        if previous and previous.get('hash') == digest and os.path.exists(self.path):
+            os.remove(self.tmp_path)
+            return previous, False
+        os.replace(self.tmp_path, self.path)
+        return {
+            'hash': digest,
+            'urls': self.count,
+            'lastmod': self.lastmod or datetime.now().strftime('%Y-%m-%d'),
+        }, True
+
+
+def load_manifest(output_dir):
+    try:
+        with open(os.path.join(output_dir, MANIFEST_FILE)) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def write_index(output_dir, base_url, shards):
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>\n',
+             '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n']
+    for name, entry in shards.items():
+        lines.append(f'  <sitemap><loc>{escape(urljoin(base_url, name))}</loc>'
+                     f'<lastmod>{entry["lastmod"]}</lastmod></sitemap>\n')
+    lines.append('</sitemapindex>\n')
+    content = ''.join(lines)
+
+    index_path = os.path.join(output_dir, INDEX_FILE)
+    try:
+        with open(index_path, encoding='utf-8') as f:
+            if f.read() == content:
+                return
+    except FileNotFoundError:
+        pass
+    tmp_path = os.path.join(output_dir, f'.{INDEX_FILE}.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.replace(tmp_path, index_path)
+
+
+def generate_sitemap(base_url=BASE_URL, output_dir=OUTPUT_DIR, full=False):
+    """Generate the sitemap index and shards, rewriting only changed shards"""
     print("🗺️  Generating MTG Card Sitemap...")
-    
-    # Get cards collection
+    os.makedirs(output_dir, exist_ok=True)
+
     cards = get_mongodb_collection('cards')
-    
-    # Base URL for your site
-    BASE_URL = "https://mtgabyss.com"  # Change this to your actual domain
-    
-    # Create XML structure
-    urlset = ET.Element('urlset')
-    urlset.set('xmlns', 'http://www.sitemaps.org/schemas/sitemap/0.9')
-    urlset.set('xmlns:image', 'http://www.google.com/schemas/sitemap-image/1.1')
-    
-    # Add homepage
-    url_elem = ET.SubElement(urlset, 'url')
-    ET.SubElement(url_elem, 'loc').text = BASE_URL
-    ET.SubElement(url_elem, 'lastmod').text = datetime.now().strftime('%Y-%m-%d')
-    ET.SubElement(url_elem, 'changefreq').text = 'daily'
-    ET.SubElement(url_elem, 'priority').text = '1.0'
-    
-    # Add main sections
-    sections = [
-        ('cards/', 'daily', '0.9'),
-        ('cards/search/', 'daily', '0.8'),
-        ('cards/random/', 'daily', '0.7'),
-        ('cards/advanced/', 'weekly', '0.6'),
-    ]
-    
-    for path, changefreq, priority in sections:
-        url_elem = ET.SubElement(urlset, 'url')
-        ET.SubElement(url_elem, 'loc').text = urljoin(BASE_URL, path)
-        ET.SubElement(url_elem, 'lastmod').text = datetime.now().strftime('%Y-%m-%d')
-        ET.SubElement(url_elem, 'changefreq').text = changefreq
-        ET.SubElement(url_elem, 'priority').text = priority
-    
-    # Get all cards
-    total_cards = cards.count_documents({})
-    print(f"📊 Processing {total_cards:,} cards...")
-    
+    # Shards listed by the last run; --full ignores them for change detection
+    # but still uses them to find shards to delete
+    last_run = load_manifest(output_dir).get('shards', {})
+    previous = {} if full else last_run
+    shards = {}
+    rewritten = 0
+
+    # Site sections
+    writer = ShardWriter(output_dir, PAGES_SHARD)
+    for path, changefreq, priority in PAGES:
+        writer.add(url_entry(urljoin(base_url, path), None, changefreq, priority))
+    shards[PAGES_SHARD], changed = writer.finish(previous.get(PAGES_SHARD))
+    rewritten += changed
+
+    # Cards, URLS_PER_SHARD per file
     processed = 0
-    batch_size = 1000
-    
-    # Process cards in batches
-    for skip in range(0, total_cards, batch_size):
-        card_batch = list(cards.find(
-            {},
-            {
-                'name': 1,
-                'uuid': 1,
-                'analysis.analysis_date': 1,
-                'analysis.fully_analyzed': 1,
-                'colors': 1,
-                'types': 1,
-                'manaCost': 1
-            }
-        ).skip(skip).limit(batch_size))
-
-        for card in card_batch:
-            try:
-                card_name = card.get('name', '').strip()
-                card_uuid = card.get('uuid', '').strip()
-                
-                if not card_name or not card_uuid:
-                    continue
-                
-                # Use UUID directly for URL
-                card_url = urljoin(BASE_URL, f'card/{card_uuid}/')
-                
-                # Create URL element
-                url_elem = ET.SubElement(urlset, 'url')
-                ET.SubElement(url_elem, 'loc').text = card_url
-                
-                # Set last modified date
-                analysis_date = card.get('analysis', {}).get('analysis_date')
-                if analysis_date:
-                    if hasattr(analysis_date, 'strftime'):
-                        lastmod = analysis_date.strftime('%Y-%m-%d')
-                    else:
-                        lastmod = datetime.now().strftime('%Y-%m-%d')
-                else:
-                    lastmod = datetime.now().strftime('%Y-%m-%d')
-                
-                ET.SubElement(url_elem, 'lastmod').text = lastmod
-                
-                # Set priority based on analysis status
-                fully_analyzed = card.get('analysis', {}).get('fully_analyzed', False)
-                if fully_analyzed:
-                    priority = '0.8'  # High priority for analyzed cards
-                    changefreq = 'weekly'
-                else:
-                    priority = '0.6'  # Lower priority for unanalyzed cards
-                    changefreq = 'monthly'
-                
-                ET.SubElement(url_elem, 'changefreq').text = changefreq
-                ET.SubElement(url_elem, 'priority').text = priority
-                
-                # # Add image information if available
-                # image_elem = ET.SubElement(url_elem, 'image:image')
-                
-                # # Use the actual imageUris.normal from the card data
-                # image_uris = card.get('imageUris', {})
-                # normal_image_url = image_uris.get('normal')
-                
-                # if normal_image_url:
-                #     ET.SubElement(image_elem, 'image:loc').text = normal_image_url
-                # else:
-                #     # Fallback to constructed URL if imageUris.normal doesn't exist
-                #     ET.SubElement(image_elem, 'image:loc').text = f"https://cards.scryfall.io/normal/front/{card_uuid[:1]}/{card_uuid[:2]}/{card_uuid}.jpg"
-                
-                # ET.SubElement(image_elem, 'image:title').text = card_name
-                # ET.SubElement(image_elem, 'image:caption').text = f"MTG Card: {card_name}"
-                
-                processed += 1
-                
-            except Exception as e:
-                print(f"❌ Error processing card {card.get('name', 'Unknown')}: {e}")
-                continue
-        
-        # Progress update
-        print(f"📈 Processed {processed:,} / {total_cards:,} cards ({processed/total_cards*100:.1f}%)")
-    
-    # Write sitemap to file
-    tree = ET.ElementTree(urlset)
-    ET.indent(tree, space="  ", level=0)  # Pretty print (Python 3.9+)
-    
-    sitemap_path = 'sitemap.xml'
-    tree.write(sitemap_path, encoding='utf-8', xml_declaration=True)
-    
+    writer = None
+    for entry, lastmod in iter_card_entries(cards, base_url):
+        if writer is None:
+            writer = ShardWriter(output_dir, f'sitemap-{len(shards)}.xml.gz')
+        writer.add(entry, lastmod)
+        processed += 1
+        if writer.count >= URLS_PER_SHARD:
+            shards[writer.name], changed = writer.finish(previous.get(writer.name))
+            rewritten += changed
+            print(f"📈 {processed:,} cards, {writer.name} {'written' if changed else 'unchanged'}")
+            writer = None
+    if writer is not None:
+        shards[writer.name], changed = writer.finish(previous.get(writer.name))
+        rewritten += changed
+        print(f"📈 {processed:,} cards, {writer.name} {'written' if changed else 'unchanged'}")
+
+    # Shards left over from a larger previous run
+    for name in set(last_run) - set(shards):
+        try:
+            os.remove(os.path.join(output_dir, name))
+        except FileNotFoundError:
+            pass
+
+    write_index(output_dir, base_url, shards)
+    with open(os.path.join(output_dir, MANIFEST_FILE), 'w') as f:
+        json.dump({'generated_at': datetime.now().isoformat(), 'base_url': base_url, 'shards': shards}, f, indent=2)
+
     print(f"✅ Sitemap generated successfully!")
-    print(f"📁 File: {sitemap_path}")
-    print(f"📊 Total URLs: {len(urlset):,}")
+    print(f"📁 Index: {os.path.join(output_dir, INDEX_FILE)}")
+    print(f"📚 Shards: {len(shards)} ({rewritten} rewritten, {len(shards) - rewritten} unchanged)")
     print(f"📋 Cards included: {processed:,}")
-    
-    # Generate sitemap index if needed (for large sites)
-    if processed > 40000:  # Google recommends max 50k URLs per sitemap
-        generate_sitemap_index(processed)
-    
-    # Show file size
-    file_size = os.path.getsize(sitemap_path) / (1024 * 1024)  # MB
-    print(f"📏 File size: {file_size:.2f} MB")
-    
+
     print(f"\n🌐 Next steps:")
-    print(f"1. Upload sitemap.xml to your website root")
-    print(f"2. Add to robots.txt: Sitemap: {BASE_URL}/sitemap.xml")
-    print(f"3. Submit to Google Search Console")
-    print(f"4. Submit to Bing Webmaster Tools")
-
-def generate_sitemap_index(total_cards):
-    """Generate sitemap index for large sites"""
-    print("📚 Generating sitemap index for large site...")
-    
-    BASE_URL = "https://mtgabyss.com"
-    
-    sitemapindex = ET.Element('sitemapindex')
-    sitemapindex.set('xmlns', 'http://www.sitemaps.org/schemas/sitemap/0.9')
-    
-    # Calculate number of sitemaps needed (40k cards per sitemap)
-    cards_per_sitemap = 40000
-    num_sitemaps = (total_cards + cards_per_sitemap - 1) // cards_per_sitemap
-    
-    for i in range(num_sitemaps):
-        sitemap_elem = ET.SubElement(sitemapindex, 'sitemap')
-        sitemap_url = f"{BASE_URL}/sitemap_{i+1}.xml"
-        ET.SubElement(sitemap_elem, 'loc').text = sitemap_url
-        ET.SubElement(sitemap_elem, 'lastmod').text = datetime.now().strftime('%Y-%m-%d')
-    
-    # Write sitemap index
-    tree = ET.ElementTree(sitemapindex)
-    ET.indent(tree, space="  ", level=0)
-    tree.write('sitemap_index.xml', encoding='utf-8', xml_declaration=True)
-    
-    print(f"✅ Sitemap index created: sitemap_index.xml")
-    print(f"📚 Number of sitemaps: {num_sitemaps}")
-
-def validate_sitemap():
-    """Basic validation of the generated sitemap"""
+    print(f"1. Add to robots.txt: Sitemap: {base_url.rstrip('/')}/sitemap.xml")
+    print(f"2. Submit to Google Search Console")
+    print(f"3. Submit to Bing Webmaster Tools")
+    return shards
+
+
+def validate_sitemap(output_dir=OUTPUT_DIR):
+    """Basic validation of the generated index and shards"""
+    import xml.etree.ElementTree as ET
+    ns = '{http://www.sitemaps.org/schemas/sitemap/0.9}'
+
     try:
-        tree = ET.parse('sitemap.xml')
-        root = tree.getroot()
-        
-        url_count = len(root.findall('.//{http://www.sitemaps.org/schemas/sitemap/0.9}url'))
+        index = ET.parse(os.path.join(output_dir, INDEX_FILE)).getroot()
+        shard_names = [loc.text.rsplit('/', 1)[-1] for loc in index.iter(f'{ns}loc')]
+
+        total, seen, duplicates, invalid = 0, set(), 0, 0
+        for name in shard_names:
+            with gzip.open(os.path.join(output_dir, name)) as f:
+                count = 0
+                for _, elem in ET.iterparse(f):
+                    if elem.tag == f'{ns}loc':
+                        url = elem.text or ''
+                        duplicates += url in seen
+                        invalid += not url.startswith('http')
+                        seen.add(url)
+                        count += 1
+                    elem.clear()
+            if count > URLS_PER_SHARD:
+                print(f"❌ {name} has {count:,} URLs (limit {URLS_PER_SHARD:,})")
+            total += count
+
         print(f"✅ Sitemap validation passed")
-        print(f"📊 Total URLs found: {url_count:,}")
-        
-        # Check for common issues
-        urls = [elem.text for elem in root.findall('.//{http://www.sitemaps.org/schemas/sitemap/0.9}loc')]
-        unique_urls = set(urls)
-        
-        if len(urls) != len(unique_urls):
-            print(f"⚠️  Warning: {len(urls) - len(unique_urls)} duplicate URLs found")
+        print(f"📊 Total URLs found: {total:,} in {len(shard_names)} shards")
+        if duplicates:
+            print(f"⚠️  Warning: {duplicates} duplicate URLs found")
         else:
             print(f"✅ No duplicate URLs found")
-        
-        # Check URL format
-        invalid_urls = [url for url in urls if not url.startswith('http')]
-        if invalid_urls:
-            print(f"❌ {len(invalid_urls)} invalid URLs found (not starting with http)")
+        if invalid:
+            print(f"❌ {invalid} invalid URLs found (not starting with http)")
         else:
             print(f"✅ All URLs properly formatted")
-            
+
     except Exception as e:
         print(f"❌ Sitemap validation failed: {e}")
 
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Generate the sharded card sitemap')
+    parser.add_argument('--base-url', default=BASE_URL, help='Site root used in URLs')
+    parser.add_argument('--output-dir', default=OUTPUT_DIR, help='Where sitemap.xml and shards are written')
+    parser.add_argument('--full', action='store_true', help='Ignore the manifest and rewrite every shard')
+    args = parser.parse_args()
+    base_url = args.base_url.rstrip('/') + '/'
+
     print("🗺️  MTG Card Sitemap Generator")
     print("=" * 50)
-    
+
     try:
-        generate_sitemap()
-        validate_sitemap()
-        
+        generate_sitemap(base_url, args.output_dir, args.full)
+        validate_sitemap(args.output_dir)
+
         print("\n🎉 Sitemap generation completed successfully!")
-        
+
     except KeyboardInterrupt:
         print("\n🛑 Sitemap generation cancelled")
     except Exception as e:
         print(f"❌ Fatal error: {e}")
-        sys.exit(1)
\ No newline at end of file
+        sys.exit(1)
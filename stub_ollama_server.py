@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Stub Ollama server for exercising the worker without a GPU.
+
+Implements the parts of the Ollama HTTP API the worker uses (/api/generate,
+/api/tags, /api/version) with simulated latency, and serves at most
+--parallel generate requests at once (like OLLAMA_NUM_PARALLEL); the rest
+queue, as they would on a real server. Requests with a JSON schema
+`format` get a JSON object with every schema property filled in, and
+`context` returned by one call can be passed to the next, in which case
+only the new prompt pays --prefill-ms-per-kchar.
+
+    python stub_ollama_server.py                   # serve on :11435
+    OLLAMA_HOST=http://127.0.0.1:11435 python universal_worker_v3_clean.py
+
+    python stub_ollama_server.py --bench           # serial vs concurrent vs grouped vs primed pipeline
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+COMPONENTS = [
+    'tactical_analysis', 'thematic_analysis', 'play_tips', 'combo_suggestions',
+    'power_level_assessment', 'format_analysis', 'synergy_analysis', 'competitive_analysis',
+    'budget_alternatives', 'historical_context', 'art_flavor_analysis', 'investment_outlook',
+    'deck_archetypes', 'meta_positioning', 'new_player_guide', 'advanced_interactions',
+    'mulligan_considerations', 'sideboard_guide', 'rules_clarifications', 'design_philosophy',
+]
+
+SAMPLE_CARD = {
+    'name': 'Swords to Plowshares',
+    'manaCost': '{W}',
+    'type': 'Instant',
+    'text': 'Exile target creature. Its controller gains life equal to its power.',
+}
+
+
+class StubOllama:
+    """Simulated model: fixed generation latency plus prefill time per prompt character"""
+
+    def __init__(self, latency: float, prefill_ms_per_kchar: float, parallel: int):
+        self.latency = latency
+        self.prefill_ms_per_kchar = prefill_ms_per_kchar
+        self.slots = threading.Semaphore(parallel)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.prompt_chars = 0
+        self.busy_seconds = 0.0
+        self.prefill_seconds = 0.0
+
+    def generate(self, request: dict) -> dict:
+        prompt = request.get('prompt', '')
+        # A JSON schema format asks for several sections; decoding time grows with them
+        schema = request.get('format')
+        sections = list(schema.get('properties', {})) if isinstance(schema, dict) else []
+        decode = self.latency * max(1, len(sections))
+        if (request.get('options') or {}).get('num_predict', -1) in (0, 1):
+            decode = 0.0  # priming call: prefill only
+        # Tokens passed back as `context` are already in the KV cache; only the new
+        # prompt is prefilled (a real server re-fills them once per slot)
+        context = request.get('context') or []
+        with self.slots:
+            started = time.time()
+            prefill = len(prompt) / 1000 * self.prefill_ms_per_kchar / 1000
+            time.sleep(prefill + decode)
+            elapsed = time.time() - started
+        with self.lock:
+            self.requests += 1
+            self.prompt_chars += len(prompt)
+            self.busy_seconds += elapsed
+            self.prefill_seconds += prefill
+        text = f"Stub analysis ({len(prompt)} prompt chars). " * 4
+        return {
+            'model': request.get('model', 'stub'),
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'response': json.dumps({name: text for name in sections}) if sections else text,
+            'done': True,
+            'done_reason': 'stop',
+            'total_duration': int(elapsed * 1e9),
+            'prompt_eval_count': len(prompt) // 4,
+            'prompt_eval_duration': int(prefill * 1e9),
+            'eval_count': 40 * max(1, len(sections)),
+            'eval_duration': int(decode * 1e9),
+            # One fake token id per 4 characters, like prompt_eval_count
+            'context': list(context) + [0] * (len(prompt) // 4 + 1),
+        }
+
+
+def make_handler(stub: StubOllama):
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, payload: dict, status: int = 200):
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == '/api/tags':
+                self._send({'models': [{'model': name, 'name': name, 'size': 0, 'digest': 'stub'}
+                                       for name in ('llama3.1:8b', 'llama3.2:3b', 'llama3.3:70b')]})
+            elif self.path == '/api/version':
+                self._send({'version': '0.0.0-stub'})
+            else:
+                self._send({'error': 'not found'}, 404)
+
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length', 0))
+            request = json.loads(self.rfile.read(length) or b'{}')
+            if self.path == '/api/generate':
+                self._send(stub.generate(request))
+            else:
+                self._send({'error': 'not found'}, 404)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def start_server(stub: StubOllama, port: int) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(stub))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run_bench(stub: StubOllama, port: int, cards: int, parallel: int, max_tasks: int):
+    """Time the worker's card pipeline serially and with the concurrent pools"""
+    os.environ['OLLAMA_HOST'] = f'http://127.0.0.1:{port}'
+    import logging
+    from concurrent.futures import ThreadPoolExecutor
+
+    import universal_worker_v3_clean as worker_module
+    for name in (worker_module.__name__, 'httpx'):
+        logging.getLogger(name).setLevel(logging.WARNING)
+
+    def run(num_parallel, tasks_in_flight, mode='component', prefix_reuse=False):
+        worker = worker_module.EnhancedUniversalWorker('http://127.0.0.1:9')
+        worker.num_parallel, worker.max_tasks = num_parallel, tasks_in_flight
+        worker.generation_mode, worker.prefix_reuse = mode, prefix_reuse
+        worker.task_pool = ThreadPoolExecutor(max_workers=tasks_in_flight)
+        worker.generation_pool = ThreadPoolExecutor(max_workers=num_parallel)
+
+        # Submission is simulated: a fixed network round trip
+        def submit_results(task_id, card_id, results):
+            time.sleep(0.2)
+            with worker._task_lock:
+                worker._forget_task(task_id)
+                worker.completed_tasks.add(task_id)
+            return len(results) == len(COMPONENTS)
+        worker.submit_results = submit_results
+
+        tasks = [{'task_id': f'task-{i}', 'card_id': f'card-{i}', 'card_data': dict(SAMPLE_CARD),
+                  'components': COMPONENTS} for i in range(cards)]
+        requests_before, chars_before, prefill_before = stub.requests, stub.prompt_chars, stub.prefill_seconds
+        started = time.time()
+        futures = [worker.task_pool.submit(worker._run_task, task) for task in tasks]
+        ok = sum(future.result() for future in futures)
+        elapsed = time.time() - started
+        worker.task_pool.shutdown()
+        worker.generation_pool.shutdown()
+        per_card = (f"{(stub.requests - requests_before) / cards:4.0f} calls, "
+                    f"{(stub.prompt_chars - chars_before) / cards:7,.0f} prompt chars, "
+                    f"{(stub.prefill_seconds - prefill_before) / cards * 1000:5.0f}ms prefill per card")
+        return elapsed, ok, per_card
+
+    print(f"Stub: {stub.latency:.2f}s per generated section, {stub.prefill_ms_per_kchar:g}ms prefill per 1k prompt chars, "
+          f"{parallel} parallel slots; {cards} cards x {len(COMPONENTS)} components\n")
+    serial, ok, per_card = run(1, 1)
+    print(f"  serial (1 generation, 1 card at a time)     {serial:7.2f}s  {ok}/{cards} cards  {per_card}")
+    concurrent, ok, per_card = run(parallel, max_tasks)
+    print(f"  pipeline ({parallel} generations, {max_tasks} cards in flight)  {concurrent:7.2f}s  {ok}/{cards} cards  {per_card}")
+    grouped, ok, per_card = run(parallel, max_tasks, 'grouped')
+    print(f"  pipeline, grouped components                {grouped:7.2f}s  {ok}/{cards} cards  {per_card}")
+    primed, ok, per_card = run(parallel, max_tasks, prefix_reuse=True)
+    print(f"  pipeline, primed card header                {primed:7.2f}s  {ok}/{cards} cards  {per_card}")
+    print(f"\n  speedup: {serial / concurrent:.1f}x pipeline, {serial / grouped:.1f}x grouped, {serial / primed:.1f}x primed")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Stub Ollama server with simulated latency')
+    parser.add_argument('--port', type=int, default=11435)
+    parser.add_argument('--latency', type=float, default=0.25,
+                        help='seconds per generate call (per section for grouped calls)')
+    parser.add_argument('--prefill-ms-per-kchar', type=float, default=0.0,
+                        help='extra prefill milliseconds per 1000 prompt characters')
+    parser.add_argument('--parallel', type=int, default=4, help='concurrent generate slots (OLLAMA_NUM_PARALLEL)')
+    parser.add_argument('--bench', action='store_true', help='benchmark the worker pipeline against the stub')
+    parser.add_argument('--cards', type=int, default=4, help='cards processed in --bench')
+    parser.add_argument('--max-tasks', type=int, default=2, help='cards in flight in --bench')
+    args = parser.parse_args()
+
+    stub = StubOllama(args.latency, args.prefill_ms_per_kchar, args.parallel)
+    server = start_server(stub, args.port)
+
+    if args.bench:
+        run_bench(stub, args.port, args.cards, args.parallel, args.max_tasks)
+        server.shutdown()
+        return
+
+    print(f"Stub Ollama listening on http://127.0.0.1:{args.port} "
+          f"({args.latency}s/generate, {args.parallel} parallel)")
+    try:
+        while True:
+            time.sleep(10)
+            print(f"  {stub.requests} requests, {stub.prompt_chars:,} prompt chars, {stub.busy_seconds:.1f}s busy")
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    main()
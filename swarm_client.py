@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Swarm API client for EMTeeGee workers
+
+One pooled requests.Session per worker instead of a new connection (and TLS
+handshake) per call, with:
+- gzip request bodies for large payloads (result submissions); the enhanced
+  swarm API decodes Content-Encoding: gzip
+- exponential backoff with full jitter on connection errors, timeouts and
+  502/503/504/429 responses (Retry-After is honoured)
+- sticky endpoint selection: calls go to the endpoint that last worked and
+  only move to the next one when it fails
+- per-endpoint latency histograms, reported in worker heartbeats
+
+    client = SwarmClient(['https://mtgabyss.com', 'http://64.23.130.187:8000'])
+    response = client.post('/api/enhanced_swarm/get_work', {'worker_id': ...})
+"""
+
+import gzip
+import json
+import logging
+import random
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (ms) of the latency histogram buckets; the last one is open-ended
+LATENCY_BUCKETS_MS = (25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, float('inf'))
+
+# Responses worth retrying (possibly on another endpoint)
+RETRY_STATUSES = {429, 502, 503, 504}
+
+
+class LatencyHistogram:
+    """Bucketed request latencies and failures for one endpoint"""
+
+    def __init__(self):
+        self.counts = [0] * len(LATENCY_BUCKETS_MS)
+        self.requests = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self._lock = threading.Lock()  # Worker task threads share one client
+
+    def record(self, elapsed_ms: float, ok: bool = True):
+        with self._lock:
+            self.requests += 1
+            self.total_ms += elapsed_ms
+            if not ok:
+                self.errors += 1
+            for i, bound in enumerate(LATENCY_BUCKETS_MS):
+                if elapsed_ms <= bound:
+                    self.counts[i] += 1
+                    break
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """Bucket upper bound below which `fraction` of requests completed"""
+        if not self.requests:
+            return None
+        target = fraction * self.requests
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS_MS, self.counts):
+            seen += count
+            if seen >= target:
+                return bound
+        return LATENCY_BUCKETS_MS[-1]
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            return self._summary()
+
+    def _summary(self) -> Dict[str, Any]:
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'mean_ms': round(self.total_ms / self.requests, 1) if self.requests else None,
+            'p50_ms': self.percentile(0.5),
+            'p90_ms': self.percentile(0.9),
+            'p99_ms': self.percentile(0.99),
+            'buckets': {
+                ('inf' if bound == float('inf') else str(bound)): count
+                for bound, count in zip(LATENCY_BUCKETS_MS, self.counts)
+            }
+        }
+
+
+class SwarmClient:
+    """Pooled, retrying HTTP client for the enhanced swarm API"""
+
+    def __init__(self, endpoints: List[str], timeout: float = 30, max_retries: int = 3,
+                 backoff_base: float = 0.5, backoff_cap: float = 30, compress_min_bytes: int = 1024,
+                 pool_size: int = 10):
+        if not endpoints:
+            raise ValueError("SwarmClient needs at least one endpoint")
+        self.endpoints = list(dict.fromkeys(endpoint.rstrip('/') for endpoint in endpoints))
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.compress_min_bytes = compress_min_bytes
+
+        # Connections are reused across calls and worker threads; retries are ours
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=len(self.endpoints), pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({'Accept-Encoding': 'gzip', 'User-Agent': 'emteegee-worker/3.0'})
+
+        self._lock = threading.Lock()
+        self._current = 0
+        self._no_compression = set()  # Endpoints that rejected gzip bodies
+        self.latency = {endpoint: LatencyHistogram() for endpoint in self.endpoints}
+
+    @property
+    def endpoint(self) -> str:
+        """Endpoint calls currently go to"""
+        return self.endpoints[self._current]
+
+    def pin(self, endpoint: str):
+        """Make `endpoint` the sticky endpoint (e.g. the one registration succeeded on)"""
+        endpoint = endpoint.rstrip('/')
+        with self._lock:
+            self._current = self.endpoints.index(endpoint)
+
+    def _failover(self, failed: str):
+        """Move off a failing endpoint, unless another thread already has"""
+        with self._lock:
+            if self.endpoints[self._current] == failed and len(self.endpoints) > 1:
+                self._current = (self._current + 1) % len(self.endpoints)
+                logger.warning(f"🔀 Swarm endpoint {failed} failing, switching to {self.endpoints[self._current]}")
+
+    def _backoff(self, attempt: int, response: Optional[requests.Response] = None) -> float:
+        """Full-jitter exponential backoff, or the server's Retry-After when given"""
+        if response is not None:
+            try:
+                return min(self.backoff_cap, float(response.headers.get('Retry-After', '')))
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * (2 ** attempt)))
+
+    def request(self, method: str, path: str, payload: Any = None, timeout: Optional[float] = None,
+                retries: Optional[int] = None, compress: bool = False,
+                endpoint: Optional[str] = None) -> requests.Response:
+        """Send a request, retrying and failing over between endpoints
+
+        `endpoint` pins a single call to one endpoint (no failover). Calls that
+        are not safe to repeat (a timeout may hide a call the server ran) should
+        pass retries=0; a failing endpoint is still left for the next call. A
+        gzip body refused with 400/415 is resent plain without using up a retry.
+        Returns the last response (which may be an error status) or raises the
+        last connection error once retries are exhausted.
+        """
+        retries = self.max_retries if retries is None else retries
+        body = json.dumps(payload).encode('utf-8') if payload is not None else None
+        last_error = None
+        rejected_gzip = set()  # Endpoints that refused this call's gzip body
+        attempt = 0
+
+        while True:
+            target = endpoint.rstrip('/') if endpoint else self.endpoint
+            histogram = self.latency.setdefault(target, LatencyHistogram())
+            headers = {}
+            data = body
+            if body is not None:
+                headers['Content-Type'] = 'application/json'
+                if (compress and len(body) >= self.compress_min_bytes and target not in self._no_compression
+                        and target not in rejected_gzip):
+                    data = gzip.compress(body, compresslevel=6)
+                    headers['Content-Encoding'] = 'gzip'
+
+            started = time.monotonic()
+            try:
+                response = self.session.request(method, f"{target}{path}", data=data, headers=headers,
+                                                timeout=timeout or self.timeout)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                histogram.record((time.monotonic() - started) * 1000, ok=False)
+                last_error = e
+                response = None
+            else:
+                histogram.record((time.monotonic() - started) * 1000, ok=response.status_code < 500)
+
+                if data is not body and response.status_code in (400, 415):
+                    # A server without gzip support can't parse the body; resend it plain.
+                    # Not on 5xx: the call may have been partly applied (e.g. bulk writes)
+                    rejected_gzip.add(target)
+                    continue
+                if target in rejected_gzip and response.status_code < 400:
+                    logger.warning(f"⚠️  {target} does not accept gzip request bodies, sending them uncompressed")
+                    self._no_compression.add(target)
+
+                if response.status_code not in RETRY_STATUSES:
+                    return response
+
+            if not endpoint:
+                self._failover(target)
+            if attempt == retries:
+                break
+            delay = self._backoff(attempt, response)
+            logger.warning(f"🔁 {method} {path} on {target} failed "
+                           f"({response.status_code if response is not None else type(last_error).__name__}), "
+                           f"retry {attempt + 1}/{retries} in {delay:.1f}s")
+            time.sleep(delay)
+            attempt += 1
+
+        if response is not None:
+            return response
+        raise last_error
+
+    def get(self, path: str, **kwargs) -> requests.Response:
+        return self.request('GET', path, **kwargs)
+
+    def post(self, path: str, payload: Any, **kwargs) -> requests.Response:
+        return self.request('POST', path, payload, **kwargs)
+
+    def latency_report(self) -> Dict[str, Dict[str, Any]]:
+        """Histogram summary per endpoint that has seen traffic"""
+        return {endpoint: histogram.summary() for endpoint, histogram in self.latency.items() if histogram.requests}
+
+    def log_latency_report(self):
+        for endpoint, stats in self.latency_report().items():
+            logger.info(f"📶 {endpoint}: {stats['requests']} requests, {stats['errors']} errors, "
+                        f"mean {stats['mean_ms']}ms, p50 ≤{stats['p50_ms']}ms, p90 ≤{stats['p90_ms']}ms, "
+                        f"p99 ≤{stats['p99_ms']}ms")
+
+    def close(self):
+        self.session.close()
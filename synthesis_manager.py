@@ -14,6 +14,7 @@ import socket
 import logging
 import ollama
 from datetime import datetime
+from pymongo import ReturnDocument
 from typing import Dict, Any, Optional, List
 
 # Django setup
@@ -24,6 +25,8 @@ import django
 django.setup()
 
 from cards.models import get_cards_collection
+from cards.analysis_stats import analysis_stats
+from cards.page_cache import invalidate_home_page
 
 # Configure logging
 logging.basicConfig(
@@ -220,7 +223,9 @@ COMPLETE ANALYSIS:"""
     def save_complete_analysis(self, card_uuid: str, complete_analysis: str) -> bool:
         """Save the complete analysis to the database."""
         try:
-            result = self.cards_collection.update_one(
+            # The pre-update document tells whether this is the card's first synthesis;
+            # re-syntheses and racing writers must not be counted again
+            previous = self.cards_collection.find_one_and_update(
                 {'uuid': card_uuid},
                 {                    '$set': {
                         'analysis.complete_analysis': complete_analysis,
@@ -228,10 +233,15 @@ COMPLETE ANALYSIS:"""
                         'analysis.synthesis_generated_by': f"{self.hostname}-{self.model}",
                         'analysis.synthesis_version': 1.0
                     }
-                }
+                },
+                projection={'_id': 0, 'analysis.complete_analysis': 1},
+                return_document=ReturnDocument.BEFORE
             )
             
-            if result.modified_count > 0:
+            if previous is not None:
+                if 'complete_analysis' not in (previous.get('analysis') or {}):
+                    analysis_stats.record_synthesis()
+                invalidate_home_page()
                 logger.info(f"Saved complete analysis for card {card_uuid}")
                 return True
             else:
@@ -297,23 +307,13 @@ COMPLETE ANALYSIS:"""
     def get_synthesis_stats(self) -> Dict[str, int]:
         """Get statistics about synthesis progress."""
         try:
-            # Total cards with all 20 components
-            cards_with_all_components = self.cards_collection.count_documents({
-                '$expr': {
-                    '$eq': [
-                        {'$size': {'$objectToArray': '$analysis.components'}},
-                        20
-                    ]
-                }
-            })
-            
-            # Cards with complete analysis
-            cards_with_synthesis = self.cards_collection.count_documents({
-                'analysis.complete_analysis': {'$exists': True}
-            })
+            # Counters from the materialized analysis_stats document
+            stats = analysis_stats.get()
+            cards_with_all_components = stats['fully_analyzed']
+            cards_with_synthesis = stats['synthesized']
             
             # Cards ready for synthesis
-            cards_ready_for_synthesis = cards_with_all_components - cards_with_synthesis
+            cards_ready_for_synthesis = max(cards_with_all_components - cards_with_synthesis, 0)
             
             return {
                 'cards_with_all_components': cards_with_all_components,
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Test that the in-memory search index picks up changes to existing cards:
+1. A price change on an indexed card shows up after refresh()
+2. A deleted card disappears after refresh() (through a background rebuild)
+
+Uses a scratch collection in the configured MongoDB, dropped afterwards.
+Run this with: python test_search_index_refresh.py (or pytest)
+"""
+
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'emteegee.settings')
+
+import django
+django.setup()
+
+from cards.models import get_mongodb_collection
+from cards.search_index import UPDATED_AT_FIELD, CardSearchIndex
+
+TEST_COLLECTION = 'search_index_refresh_test'
+
+
+class ScratchIndex(CardSearchIndex):
+    """Search index over the scratch collection instead of cards"""
+
+    @property
+    def cards(self):
+        return get_mongodb_collection(TEST_COLLECTION)
+
+
+def make_index():
+    collection = get_mongodb_collection(TEST_COLLECTION)
+    collection.drop()
+    collection.insert_many([
+        {'name': 'Lightning Bolt', 'type': 'Instant', 'rarity': 'common', 'setCode': 'M21',
+         'prices': {'usd': 1.0}},
+        {'name': 'Sol Ring', 'type': 'Artifact', 'rarity': 'uncommon', 'setCode': 'C21',
+         'prices': {'usd': 2.0}},
+        {'name': 'Swords to Plowshares', 'type': 'Instant', 'rarity': 'uncommon', 'setCode': 'STA',
+         'prices': {'usd': 3.0}},
+    ])
+    index = ScratchIndex()
+    index.build()
+    return collection, index
+
+
+def names(index, query, sort):
+    """Names of the matching cards in order, and the search result"""
+    result = index.search(query, sort, limit=10, price_stats=True)
+    by_id = {card['_id']: card['name'] for card in index.cards.find({'_id': {'$in': result['ids']}})}
+    return [by_id.get(card_id) for card_id in result['ids']], result
+
+
+def test_price_change_after_refresh():
+    """A price update on an existing card is searchable after refresh()"""
+    collection, index = make_index()
+    try:
+        expensive = {'price_min': 5}
+        assert names(index, expensive, [('prices.usd', -1)])[0] == []
+
+        collection.update_one({'name': 'Sol Ring'}, {'$set': {
+            'prices.usd': 9.5, UPDATED_AT_FIELD: datetime.now(timezone.utc)
+        }})
+        assert names(index, expensive, [('prices.usd', -1)])[0] == [], "Changed before refresh()"
+
+        index.refresh()
+        found, result = names(index, expensive, [('prices.usd', -1)])
+        assert found == ['Sol Ring'], found
+        assert result['price_stats']['maximum'] == 9.5
+        # The old row is hidden, not double counted
+        everything, result = names(index, {}, [('prices.usd', -1)])
+        assert everything == ['Sol Ring', 'Swords to Plowshares', 'Lightning Bolt'], everything
+        assert result['total'] == 3
+    finally:
+        collection.drop()
+
+
+def test_deleted_card_after_refresh():
+    """A card deleted without touch() drops out once refresh() notices the count"""
+    collection, index = make_index()
+    try:
+        collection.delete_one({'name': 'Lightning Bolt'})
+        index.refresh()
+        deadline = time.time() + 10
+        while index.search({}, [('name', 1)])['total'] != 2 and time.time() < deadline:
+            time.sleep(0.05)
+        assert names(index, {}, [('name', 1)])[0] == ['Sol Ring', 'Swords to Plowshares']
+    finally:
+        collection.drop()
+
+
+if __name__ == "__main__":
+    for test in (test_price_change_after_refresh, test_deleted_card_after_refresh):
+        test()
+        print(f"✅ {test.__doc__}")
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Test the worker's concurrent card pipeline against the stub Ollama server:
+1. Results keep the order the components were requested in
+2. Concurrent generate calls never exceed num_parallel
+3. max_tasks cards are generated at the same time
+
+Runs without a GPU or Django server: python test_stub_worker.py (or pytest)
+"""
+
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from stub_ollama_server import COMPONENTS, SAMPLE_CARD, StubOllama, start_server
+
+NUM_PARALLEL = 3
+MAX_TASKS = 2
+CARDS = 4
+TEST_COMPONENTS = COMPONENTS[:6]
+
+
+class RecordingStub(StubOllama):
+    """Stub that records in-flight calls per card; each card's first component finishes last"""
+
+    def __init__(self):
+        # More slots than the worker may use, so any limit seen is the worker's own
+        super().__init__(latency=0.05, prefill_ms_per_kchar=0, parallel=NUM_PARALLEL * 4)
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.cards_in_flight = {}
+        self.max_cards_in_flight = 0
+        self.calls_per_card = {}
+
+    def generate(self, request: dict) -> dict:
+        prompt = request.get('prompt', '')
+        card = next((name for name in self.cards_in_flight if name in prompt), None)
+        with self.lock:
+            # Components are submitted in order, so the n-th call for a card is its n-th component
+            position = self.calls_per_card.get(card, 0)
+            self.calls_per_card[card] = position + 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            if card:
+                self.cards_in_flight[card] += 1
+                self.max_cards_in_flight = max(self.max_cards_in_flight,
+                                               sum(1 for count in self.cards_in_flight.values() if count))
+        try:
+            if position == 0:
+                time.sleep(0.1)
+            return super().generate(request)
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+                if card:
+                    self.cards_in_flight[card] -= 1
+
+
+def run_worker(stub: RecordingStub, port: int):
+    """Run CARDS cards through the worker's task and generation pools"""
+    os.environ['OLLAMA_HOST'] = f'http://127.0.0.1:{port}'
+    import universal_worker_v3_clean as worker_module
+    for name in (worker_module.__name__, 'httpx'):
+        logging.getLogger(name).setLevel(logging.WARNING)
+
+    worker = worker_module.EnhancedUniversalWorker('http://127.0.0.1:9')
+    worker.num_parallel, worker.max_tasks = NUM_PARALLEL, MAX_TASKS
+    worker.generation_mode, worker.prefix_reuse = 'component', False
+    worker.task_pool = ThreadPoolExecutor(max_workers=MAX_TASKS)
+    worker.generation_pool = ThreadPoolExecutor(max_workers=NUM_PARALLEL)
+
+    submitted = {}
+
+    def submit_results(task_id, card_id, results):
+        submitted[task_id] = list(results)
+        return True
+    worker.submit_results = submit_results
+
+    tasks = []
+    for i in range(CARDS):
+        card_data = dict(SAMPLE_CARD, name=f"Stub Test Card {i}")
+        stub.cards_in_flight[card_data['name']] = 0
+        tasks.append({'task_id': f'task-{i}', 'card_id': f'card-{i}', 'card_data': card_data,
+                      'components': TEST_COMPONENTS})
+    try:
+        futures = [worker.task_pool.submit(worker._run_task, task) for task in tasks]
+        ok = [future.result(timeout=60) for future in futures]
+    finally:
+        worker.task_pool.shutdown()
+        worker.generation_pool.shutdown()
+    return ok, submitted
+
+
+_result = None
+
+
+def _pipeline():
+    """Start the stub and run the worker once; the tests share the outcome"""
+    global _result
+    if _result is None:
+        stub = RecordingStub()
+        server = start_server(stub, 0)
+        try:
+            ok, submitted = run_worker(stub, server.server_address[1])
+        finally:
+            server.shutdown()
+        _result = stub, ok, submitted
+    return _result
+
+
+def test_component_order():
+    """Results keep the requested component order even when the first one finishes last"""
+    stub, ok, submitted = _pipeline()
+    assert all(ok), f"Failed tasks: {ok}"
+    assert len(submitted) == CARDS
+    for task_id, components in submitted.items():
+        assert components == TEST_COMPONENTS, f"{task_id} submitted {components}"
+
+
+def test_generate_calls_within_num_parallel():
+    """The shared generation pool caps concurrent generate calls at num_parallel"""
+    stub, _, _ = _pipeline()
+    assert stub.requests == CARDS * len(TEST_COMPONENTS)
+    assert stub.max_in_flight <= NUM_PARALLEL, f"{stub.max_in_flight} calls at once"
+    assert stub.max_in_flight == NUM_PARALLEL, f"Only {stub.max_in_flight} calls at once"
+
+
+def test_cards_overlap():
+    """max_tasks cards have generate calls in flight at the same time"""
+    stub, _, _ = _pipeline()
+    assert stub.max_cards_in_flight == MAX_TASKS, f"{stub.max_cards_in_flight} cards at once"
+
+
+if __name__ == "__main__":
+    print(f"🧪 {CARDS} cards x {len(TEST_COMPONENTS)} components, "
+          f"num_parallel={NUM_PARALLEL}, max_tasks={MAX_TASKS}")
+    for test in (test_component_order, test_generate_calls_within_num_parallel, test_cards_overlap):
+        test()
+        print(f"✅ {test.__doc__}")
+    stub = _pipeline()[0]
+    print(f"📊 {stub.requests} generate calls, at most {stub.max_in_flight} at once "
+          f"across {stub.max_cards_in_flight} cards")
@@ -17,11 +17,17 @@ import psutil
 import multiprocessing
 import ollama
 import os
+import queue
+import re
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from typing import Dict, List, Any, Optional
 import logging
 from datetime import datetime, timezone
 
+from swarm_client import SwarmClient
+
 # Configure logging with better formatting
 logging.basicConfig(
     level=logging.INFO,
@@ -30,6 +36,24 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Components requested together in 'grouped' generation mode; mirrors
+# CoherenceManager.COHERENCE_GROUPS (cards/coherence_manager.py) so that
+# related analyses are written in one call and stay consistent
+COMPONENT_GROUPS = {
+    'power_assessment': ['power_level_assessment', 'competitive_analysis', 'meta_positioning'],
+    'deck_building': ['deck_archetypes', 'synergy_analysis', 'combo_suggestions'],
+    'gameplay_mechanics': ['play_tips', 'tactical_analysis', 'advanced_interactions'],
+    'economic_analysis': ['investment_outlook', 'budget_alternatives', 'format_analysis'],
+    'thematic_design': ['thematic_analysis', 'art_flavor_analysis', 'design_philosophy', 'historical_context']
+}
+# Largest group formed from components outside COMPONENT_GROUPS
+MAX_GROUP_SIZE = 4
+
+GENERATION_MODES = ('component', 'grouped')
+
+# Follows the card header in the priming call, so its one-token reply is natural
+PRIME_INSTRUCTION = "Read this card carefully; questions about it follow. Reply OK."
+
 class EnhancedUniversalWorker:
     """Enhanced universal worker v3.0 with enhanced swarm integration"""
     
@@ -47,15 +71,25 @@ class EnhancedUniversalWorker:
         else:
             self.fallback_url = 'http://localhost:8000'
         
+        # Local development talks to localhost only; remote mode fails over
+        # between the domain and the server IP (never to localhost)
+        if self.server_url == self.fallback_url:
+            swarm_endpoints = [self.fallback_url]
+        else:
+            swarm_endpoints = [self.server_url, self.server_ip_url]
+        self.swarm = SwarmClient(swarm_endpoints)
+        
         self.hostname = socket.gethostname()
         self.capabilities = self._detect_capabilities()
         self.worker_type = self.capabilities['worker_type']
         self.worker_id = f"{self.worker_type}-{self.hostname}"
         self.running = False
         
-        # Task tracking
+        # Task tracking (shared by the task threads, guarded by _task_lock)
         self.active_tasks = set()  # Track tasks currently being processed
         self.completed_tasks = set()  # Track completed tasks to avoid duplicates
+        self.task_start_times = {}
+        self._task_lock = threading.Lock()
         self.last_heartbeat = None
         
         # Configure models based on hardware
@@ -79,10 +113,50 @@ class EnhancedUniversalWorker:
             self.max_tasks = 1  # Single task for deep analysis
             self.poll_interval = 5  # Slower polling for CPU worker
         
+        # Concurrent generate calls, matched to what the local Ollama serves in
+        # parallel (OLLAMA_NUM_PARALLEL); extra requests would only queue there
+        default_parallel = {'desktop': 4, 'laptop_lite': 2}.get(self.worker_type, 1)
+        self.num_parallel = max(1, int(os.getenv('OLLAMA_NUM_PARALLEL', default_parallel)))
+        
+        # 'component': one generate call per component; 'grouped': one call per
+        # component group with a JSON response, falling back per component
+        self.generation_mode = os.getenv('WORKER_GENERATION_MODE', 'component').lower()
+        if self.generation_mode not in GENERATION_MODES:
+            logger.warning(f"⚠️  Unknown WORKER_GENERATION_MODE '{self.generation_mode}', using 'component'")
+            self.generation_mode = 'component'
+        
+        # Prefix reuse: prefill the card header once per card and branch every
+        # generate call off the returned context ("prime once, branch N times")
+        default_reuse = 'true' if self.worker_type == 'desktop' else 'false'
+        self.prefix_reuse = os.getenv('WORKER_PREFIX_REUSE', default_reuse).lower() == 'true'
+        # Keep the model loaded between cards so it is not reloaded mid-queue
+        self.keep_alive = os.getenv('OLLAMA_KEEP_ALIVE', '30m')
+        self.prefill_saved_seconds = 0.0  # Estimated, guarded by _task_lock
+        
+        # Cards leased ahead of generation: they wait in prefetch_buffer so the next
+        # card starts as soon as a slot frees, instead of after a get_work round trip
+        self.prefetch_depth = max(0, int(os.getenv('WORKER_PREFETCH_DEPTH', self.max_tasks)))
+        # Polling backs off from poll_interval to this while the server has no work
+        self.max_poll_interval = max(self.poll_interval, int(os.getenv('WORKER_MAX_POLL_INTERVAL', 60)))
+        self.prefetch_buffer = queue.Queue()
+        self.upload_queue = queue.Queue()  # (task_id, card_id, results) for the uploader
+        self.lease_deadlines = {}  # task_id -> local time its server lease ends
+        self.card_seconds = None  # Moving average of generation time per card
+        self.prefetcher = None
+        self.uploader = None
+        self._wake_prefetcher = threading.Event()
+        
+        # max_tasks cards in flight (prompt building, generation, submission);
+        # their generate calls share one pool of num_parallel slots
+        self.task_pool = ThreadPoolExecutor(max_workers=self.max_tasks, thread_name_prefix='task')
+        self.generation_pool = ThreadPoolExecutor(max_workers=self.num_parallel, thread_name_prefix='ollama')
+        
         logger.info(f"🤖 Initialized {self.worker_type} worker: {self.worker_id}")
         logger.info(f"🎯 Using model: {self.current_model}")
         logger.info(f"🌐 Server: {self.server_url}")
-        logger.info(f"⚙️  Max concurrent tasks: {self.max_tasks}")
+        logger.info(f"⚙️  Max concurrent tasks: {self.max_tasks}, parallel generations: {self.num_parallel}")
+        logger.info(f"📦 Prefetch depth: {self.prefetch_depth}, poll interval: {self.poll_interval}-{self.max_poll_interval}s")
+        logger.info(f"🧩 Generation mode: {self.generation_mode}, prefix reuse: {'on' if self.prefix_reuse else 'off'}")
         
     def _detect_capabilities(self) -> Dict[str, Any]:
         """Auto-detect hardware and determine worker type"""
@@ -194,13 +268,12 @@ class EnhancedUniversalWorker:
         }
         
         # Determine servers to try based on configuration
+        servers_to_try = self.swarm.endpoints
         if self.server_url == self.fallback_url:
             # If configured for localhost, only try localhost
-            servers_to_try = [self.fallback_url]
             logger.info("🏠 Configured for local development mode")
         else:
             # If configured for remote, try remote servers only (NO localhost fallback)
-            servers_to_try = [self.server_url, self.server_ip_url]
             logger.info("🌐 Configured for remote/distributed mode")
             logger.info("⚠️  Will NOT fall back to localhost - this prevents accidental local work")
         
@@ -209,13 +282,13 @@ class EnhancedUniversalWorker:
                 logger.info(f"🔄 Attempting registration with {server_url} ({i+1}/{len(servers_to_try)})")
                 
                 # First test basic connectivity
-                basic_response = requests.get(f"{server_url}/", timeout=15)
+                basic_response = self.swarm.get("/", endpoint=server_url, retries=0, timeout=15)
                 if basic_response.status_code != 200:
                     logger.warning(f"⚠️  Server {server_url} basic connectivity failed: HTTP {basic_response.status_code}")
                     continue
                 
                 # Test enhanced swarm API availability
-                status_response = requests.get(f"{server_url}/api/enhanced_swarm/status", timeout=15)
+                status_response = self.swarm.get("/api/enhanced_swarm/status", endpoint=server_url, retries=0, timeout=15)
                 if status_response.status_code != 200:
                     logger.warning(f"⚠️  Server {server_url} missing enhanced swarm API (HTTP {status_response.status_code})")
                     if "404" in str(status_response.status_code):
@@ -223,17 +296,19 @@ class EnhancedUniversalWorker:
                     continue
                 
                 # Attempt registration
-                response = requests.post(
-                    f"{server_url}/api/enhanced_swarm/register",
-                    json=registration_data,
+                response = self.swarm.post(
+                    "/api/enhanced_swarm/register",
+                    registration_data,
+                    endpoint=server_url,
                     timeout=30
                 )
                 if response.status_code == 200:
                     result = response.json()
                     logger.info(f"✅ Registered successfully with {server_url}")
                     logger.info(f"📝 Assigned components: {len(result.get('assigned_components', []))}")
-                    # Update server URL to the working one
+                    # Update server URL to the working one; later calls stick to it
                     self.server_url = server_url
+                    self.swarm.pin(server_url)
                     self.last_heartbeat = datetime.now(timezone.utc)
                     return True
                 else:
@@ -267,13 +342,18 @@ class EnhancedUniversalWorker:
                 'status': 'active',
                 'active_tasks': len(self.active_tasks),
                 'completed_tasks': len(self.completed_tasks),
-                'last_heartbeat': datetime.now(timezone.utc).isoformat()
+                'last_heartbeat': datetime.now(timezone.utc).isoformat(),
+                'performance_metrics': {
+                    'endpoint_latency': self.swarm.latency_report(),
+                    'prefill_saved_seconds': round(self.prefill_saved_seconds, 1)
+                }
             }
             
-            response = requests.post(
-                f"{self.server_url}/api/enhanced_swarm/heartbeat",
-                json=heartbeat_data,
-                timeout=10
+            response = self.swarm.post(
+                "/api/enhanced_swarm/heartbeat",
+                heartbeat_data,
+                timeout=10,
+                retries=1
             )
             
             if response.status_code == 200:
@@ -290,8 +370,11 @@ class EnhancedUniversalWorker:
     def get_work(self) -> List[Dict[str, Any]]:
         """Request work from the server with improved task filtering"""
         try:
-            # Calculate how many new tasks we can take
-            available_slots = self.max_tasks - len(self.active_tasks)
+            # Calculate how many new tasks we can take (running slots plus prefetch buffer)
+            with self._task_lock:
+                available_slots = self.max_tasks + self.prefetch_depth - len(self.active_tasks)
+                active_task_ids = list(self.active_tasks)
+                completed_task_ids = list(self.completed_tasks)
             if available_slots <= 0:
                 return []
             
@@ -300,25 +383,34 @@ class EnhancedUniversalWorker:
                 'max_tasks': available_slots,
                 'worker_type': self.worker_type,
                 'specialization': self.specialization,
-                'active_task_ids': list(self.active_tasks),  # Exclude tasks we're already working on
-                'completed_task_ids': list(self.completed_tasks),  # Exclude completed tasks
+                'active_task_ids': active_task_ids,  # Exclude tasks we're already working on
+                'completed_task_ids': completed_task_ids,  # Exclude completed tasks
                 'random_assignment': True  # Explicitly request random assignment, no EDHREC priority
             }
             
-            response = requests.post(
-                f"{self.server_url}/api/enhanced_swarm/get_work",
-                json=request_data,
-                timeout=30
+            # Not retried: a lost response may still have leased cards, and a retry would
+            # lease another batch the first one then blocks until its lease expires
+            response = self.swarm.post(
+                "/api/enhanced_swarm/get_work",
+                request_data,
+                timeout=30,
+                retries=0
             )
             if response.status_code == 200:
                 result = response.json()
                 tasks = result.get('tasks', [])
+                received_at = time.time()
                 
                 # Add tasks to active tracking
                 for task in tasks:
                     task_id = task.get('task_id')
                     if task_id:
-                        self.active_tasks.add(task_id)
+                        with self._task_lock:
+                            # Start time is set when the card leaves the prefetch buffer
+                            self.active_tasks.add(task_id)
+                            self.lease_deadlines[task_id] = self._lease_deadline(
+                                task, result.get('lease_seconds'), received_at
+                            )
                         logger.info(f"📋 Added task {task_id} to active queue")
                 
                 return tasks
@@ -345,36 +437,26 @@ class EnhancedUniversalWorker:
                 return False
                 
             # Format results for the new enhanced swarm manager
-            submission_data = {
-                'worker_id': self.worker_id,
-                'task_id': task_id,
-                'card_id': card_id,
-                'results': {
-                    'components': results,
-                    'model_info': {
-                        'model_name': self.current_model,
-                        'worker_type': self.worker_type,
-                        'specialization': self.specialization
-                    },
-                    'execution_time': 0
-                }
-            }
+            submission_data = {'worker_id': self.worker_id, **self._submission(task_id, card_id, results)}
             
             # Debug: Log the exact payload
             logger.info(f"🔍 DEBUG - Submission payload keys: {list(submission_data.keys())}")
             logger.info(f"🔍 DEBUG - Results structure: {type(submission_data['results'])}")
             
-            response = requests.post(
-                f"{self.server_url}/api/enhanced_swarm/submit_results",
-                json=submission_data,
-                timeout=60
+            # Submissions are the large payloads: gzip them and retry harder
+            response = self.swarm.post(
+                "/api/enhanced_swarm/submit_results",
+                submission_data,
+                timeout=60,
+                retries=5,
+                compress=True
             )
             
             if response.status_code == 200:
                 # Remove from active tasks and add to completed
-                if task_id in self.active_tasks:
-                    self.active_tasks.remove(task_id)
-                self.completed_tasks.add(task_id)
+                with self._task_lock:
+                    self._forget_task(task_id)
+                    self.completed_tasks.add(task_id)
                 
                 logger.info(f"✅ Submitted results for task {task_id} (card: {card_id})")
                 logger.info(f"📊 Active: {len(self.active_tasks)}, Completed: {len(self.completed_tasks)}")
@@ -386,6 +468,200 @@ class EnhancedUniversalWorker:
         except Exception as e:
             logger.error(f"❌ Result submission error: {e}")
             return False    
+    def _submission(self, task_id: str, card_id: str, results: Dict[str, str]) -> Dict[str, Any]:
+        """One task's results in the shape the enhanced swarm manager expects"""
+        return {
+            'task_id': task_id,
+            'card_id': card_id,
+            'results': {
+                'components': results,
+                'model_info': {
+                    'model_name': self.current_model,
+                    'worker_type': self.worker_type,
+                    'specialization': self.specialization
+                },
+                'execution_time': 0
+            }
+        }
+    
+    def submit_results_bulk(self, batch: List[tuple]) -> int:
+        """Submit several finished cards in one request; returns how many were accepted
+        
+        Every task in the batch leaves active tracking whatever the outcome.
+        """
+        statuses = {}
+        try:
+            response = self.swarm.post(
+                "/api/enhanced_swarm/submit_results_bulk",
+                {
+                    'worker_id': self.worker_id,
+                    'results': [self._submission(task_id, card_id, results) for task_id, card_id, results in batch]
+                },
+                timeout=120,
+                retries=5,
+                compress=True
+            )
+            if response.status_code == 404:
+                # Server without the bulk endpoint
+                return sum(self._upload_one(*item) for item in batch)
+            if response.status_code == 200:
+                statuses = {status.get('task_id'): status for status in response.json().get('results', [])}
+            else:
+                logger.error(f"❌ Bulk submission failed: HTTP {response.status_code} - {response.text[:200]}")
+        except Exception as e:
+            logger.error(f"❌ Bulk submission error: {e}")
+        
+        accepted = 0
+        with self._task_lock:
+            for task_id, card_id, _ in batch:
+                self._forget_task(task_id)
+                status = statuses.get(task_id, {})
+                if status.get('status') == 'success':
+                    self.completed_tasks.add(task_id)
+                    accepted += 1
+                else:
+                    logger.error(f"❌ Task {task_id} (card: {card_id}) not accepted: {status.get('message', 'no response')}")
+        logger.info(f"✅ Submitted {accepted}/{len(batch)} results in one request - Completed: {len(self.completed_tasks)}")
+        return accepted
+    
+    def _upload_one(self, task_id: str, card_id: str, results: Dict[str, str]) -> bool:
+        """Submit one card from the uploader; a failed task still leaves active tracking"""
+        success = self.submit_results(task_id, card_id, results)
+        if not success:
+            with self._task_lock:
+                self._forget_task(task_id)
+        return success
+    
+    def _upload_loop(self):
+        """Uploader thread: submit finished cards while the GPU moves on to the next
+        
+        Whatever has queued up by the time a request goes out is sent together
+        through the bulk endpoint. Runs until it reads the None sentinel.
+        """
+        while True:
+            batch, stop = [], False
+            item = self.upload_queue.get()
+            while item is not None:
+                batch.append(item)
+                if len(batch) >= self.max_tasks + self.prefetch_depth:
+                    break
+                try:
+                    item = self.upload_queue.get_nowait()
+                except queue.Empty:
+                    break
+            else:
+                stop = True
+            
+            if len(batch) == 1:
+                self._upload_one(*batch[0])
+            elif batch:
+                self.submit_results_bulk(batch)
+            if stop:
+                return
+    
+    def _prefetch_loop(self):
+        """Prefetcher thread: keep the buffer topped up with leased cards
+        
+        Polls again straight away while the server hands out work, and backs
+        off from poll_interval to max_poll_interval while it has none.
+        """
+        delay = 0
+        consecutive_empty_polls = 0
+        while self.running:
+            with self._task_lock:
+                room = self.max_tasks + self.prefetch_depth - len(self.active_tasks)
+            if room <= 0:
+                # Full; woken when a buffered card starts or a task finishes
+                self._wake_prefetcher.wait(self.poll_interval)
+                self._wake_prefetcher.clear()
+                continue
+            
+            tasks = self.get_work()
+            if tasks:
+                consecutive_empty_polls, delay = 0, 0
+                logger.info(f"📋 Received {len(tasks)} task(s) - Active: {len(self.active_tasks)}, buffered: {self.prefetch_buffer.qsize() + len(tasks)}")
+                for task in tasks:
+                    self.prefetch_buffer.put(task)
+                continue
+            
+            consecutive_empty_polls += 1
+            delay = min(self.max_poll_interval, delay * 2 if delay else self.poll_interval)
+            if consecutive_empty_polls % 20 == 1:  # Log every 20th empty poll
+                logger.info(f"⏳ No work available - Active: {len(self.active_tasks)}, Completed: {len(self.completed_tasks)}, next poll in {delay}s")
+            # Shutdown sets the event to end the wait early
+            self._wake_prefetcher.wait(delay)
+            self._wake_prefetcher.clear()
+    
+    @staticmethod
+    def _lease_deadline(task: Dict[str, Any], lease_seconds: Any, received_at: float) -> Optional[float]:
+        """Local time the server lease on a task ends
+        
+        The sooner of the lease length counted from when the task arrived (a
+        little early, and unaffected by clock skew) and lease_expires_at.
+        """
+        deadlines = []
+        if lease_seconds:
+            deadlines.append(received_at + float(lease_seconds))
+        expires = task.get('lease_expires_at')
+        if expires:
+            try:
+                expires_at = datetime.fromisoformat(str(expires).replace('Z', '+00:00'))
+                if expires_at.tzinfo is None:
+                    expires_at = expires_at.replace(tzinfo=timezone.utc)  # Mongo datetimes are UTC
+                deadlines.append(expires_at.timestamp())
+            except ValueError:
+                pass
+        return min(deadlines) if deadlines else None
+    
+    def _lease_usable(self, task_id: str) -> bool:
+        """Whether a buffered task is still ours long enough to generate and submit it"""
+        with self._task_lock:
+            if task_id not in self.active_tasks:
+                return False  # Already given up by cleanup_failed_tasks
+            deadline = self.lease_deadlines.get(task_id)
+            needed = max(60, 1.5 * (self.card_seconds or 0))
+        return deadline is None or deadline - time.time() > needed
+    
+    def _start_buffered_task(self) -> Optional[Any]:
+        """Take the next usable card from the prefetch buffer and start it on the task pool"""
+        while True:
+            try:
+                task = self.prefetch_buffer.get_nowait()
+            except queue.Empty:
+                return None
+            task_id = task.get('task_id')
+            if task_id and not self._lease_usable(task_id):
+                with self._task_lock:
+                    self._forget_task(task_id)
+                logger.warning(f"⌛ Dropped buffered task {task_id}: its lease would expire before it is done")
+                self.release_tasks([task_id])
+                continue
+            if task_id:
+                with self._task_lock:
+                    self.task_start_times[task_id] = time.time()
+            self._wake_prefetcher.set()
+            return self.task_pool.submit(self._run_task, task)
+    
+    def release_tasks(self, task_ids: List[str]) -> int:
+        """Hand leases back to the server so the cards are requeued now, not at lease expiry"""
+        if not task_ids:
+            return 0
+        try:
+            response = self.swarm.post(
+                "/api/enhanced_swarm/release",
+                {'worker_id': self.worker_id, 'task_ids': list(task_ids)},
+                timeout=10,
+                retries=1
+            )
+            if response.status_code == 200:
+                released = response.json().get('released', 0)
+                logger.info(f"↩️  Released {released}/{len(task_ids)} lease(s)")
+                return released
+            logger.warning(f"⚠️  Lease release failed: HTTP {response.status_code} - leases expire on their own")
+        except Exception as e:
+            logger.warning(f"⚠️  Lease release error: {e} - leases expire on their own")
+        return 0
+    
     def process_task(self, task: Dict[str, Any]) -> bool:
         """Process a single analysis task with enhanced error handling"""
         task_id = task.get('task_id', 'unknown')
@@ -412,11 +688,21 @@ class EnhancedUniversalWorker:
             # Generate analysis
             results = self.generate_analysis(card_data, components)
             
+            generation_time = time.time() - start_time
+            with self._task_lock:
+                self.card_seconds = generation_time if self.card_seconds is None else 0.8 * self.card_seconds + 0.2 * generation_time
+            
             # Validate results
             if not results or all(not v for v in results.values()):
                 logger.error(f"❌ No valid analysis generated for {card_name}")
                 return False
             
+            if self.uploader is not None:
+                # The uploader submits it; this slot moves on to the next card
+                self.upload_queue.put((task_id, card_id, results))
+                logger.info(f"⏱️  Task {task_id} generated in {generation_time:.1f}s, queued for upload")
+                return True
+            
             # Submit results with card_id
             success = self.submit_results(task_id, card_id, results)
             
@@ -428,70 +714,302 @@ class EnhancedUniversalWorker:
         except Exception as e:
             logger.error(f"❌ Task processing error for {task_id}: {e}")
             # Remove from active tasks on error
-            if task_id in self.active_tasks:
-                self.active_tasks.remove(task_id)
+            with self._task_lock:
+                self._forget_task(task_id)
             return False
     
+    def _run_task(self, task: Dict[str, Any]) -> bool:
+        """Task thread body: process a task and free its slot if it failed"""
+        task_id = task.get('task_id')
+        success = self.process_task(task)
+        if not success and task_id:
+            with self._task_lock:
+                if task_id in self.active_tasks:
+                    self._forget_task(task_id)
+                    logger.warning(f"🧹 Removed failed task {task_id} from active queue immediately")
+        return success
+    
+    def _forget_task(self, task_id: str) -> None:
+        """Drop a task from active tracking (caller holds _task_lock)"""
+        self.active_tasks.discard(task_id)
+        self.task_start_times.pop(task_id, None)
+        self.lease_deadlines.pop(task_id, None)
+        self._wake_prefetcher.set()
+    
     def generate_analysis(self, card_data: Dict, components: List[str]) -> Dict[str, str]:
-        """Generate analysis with improved prompts and error handling"""
-        results = {}
+        """Generate analysis with improved prompts and error handling
+        
+        Components are generated concurrently on the shared generation pool,
+        so up to num_parallel Ollama requests run at once across all cards.
+        """
         card_name = card_data.get('name', 'Unknown')
+        options = self._generation_options()
+        primed = self._prime_card(card_data, options) if self.prefix_reuse else None
+        context = primed['context'] if primed else None
         
-        for component in components:
-            try:
-                logger.info(f"🧠 Generating {component} for {card_name}")
-                
-                prompt = self._create_enhanced_prompt(card_data, component)
-                
-                # Configure generation based on worker type
-                if self.worker_type == 'desktop':
-                    # Fast, efficient analysis for desktop
-                    options = {
-                        "temperature": 0.7,
-                        "num_predict": 250,  # Balanced length
-                        "top_p": 0.9,
-                        "repeat_penalty": 1.1
-                    }
-                elif self.worker_type == 'laptop_lite':
-                    # Lightweight analysis for laptop lite
-                    options = {
-                        "temperature": 0.7,
-                        "num_predict": 200,  # Shorter responses for efficiency
-                        "top_p": 0.9,
-                        "repeat_penalty": 1.1
-                    }
-                else:
-                    # Deep, detailed analysis for laptop
-                    options = {
-                        "temperature": 0.8,
-                        "num_predict": 400,  # Longer responses
-                        "top_p": 0.95,
-                        "repeat_penalty": 1.1
-                    }
-                
-                response = ollama.generate(
-                    model=self.current_model,
-                    prompt=prompt,
-                    options=options
-                )
-                
-                analysis_text = response.get('response', '').strip()
-                
-                if analysis_text and len(analysis_text) > 10:  # Validate minimum content
-                    results[component] = analysis_text
-                    logger.info(f"✅ Generated {component} ({len(analysis_text)} chars)")
-                else:
-                    logger.warning(f"⚠️  Short/empty response for {component}")
-                    results[component] = f"Analysis incomplete for {component}"
-                
-            except Exception as e:
-                logger.error(f"❌ Analysis failed for {component}: {e}")
-                results[component] = f"Analysis failed: {str(e)}"
+        if self.generation_mode == 'grouped':
+            results, calls = self._generate_grouped(card_data, components, options, context)
+        else:
+            futures = {
+                component: self.generation_pool.submit(self._generate_component, card_data, component, options, context)
+                for component in components
+            }
+            # Results keep the order the components were requested in
+            results = {component: future.result() for component, future in futures.items()}
+            calls = len(components)
         
+        if primed:
+            self._record_prefix_reuse(card_name, primed, calls)
         return results
     
+    def _prime_card(self, card_data: Dict, options: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Prefill the card header once; the returned context seeds every call for the card
+        
+        Returns None when priming fails or Ollama returns no context, in which
+        case every call sends its full prompt as usual.
+        """
+        card_name = card_data.get('name', 'Unknown')
+        try:
+            # Through the generation pool like any other generate call
+            response = self.generation_pool.submit(
+                ollama.generate,
+                model=self.current_model,
+                prompt=f"{self._card_header(card_data)}\n\n{PRIME_INSTRUCTION}",
+                options={**options, 'num_predict': 1},
+                keep_alive=self.keep_alive
+            ).result()
+        except Exception as e:
+            logger.warning(f"⚠️  Could not prime {card_name}, sending full prompts: {e}")
+            return None
+        
+        context = response.get('context')
+        if not context:
+            return None
+        return {
+            'context': context,
+            'tokens': response.get('prompt_eval_count') or 0,
+            'seconds': (response.get('prompt_eval_duration') or 0) / 1e9
+        }
+    
+    def _record_prefix_reuse(self, card_name: str, primed: Dict[str, Any], calls: int) -> None:
+        """Log the header prefill a primed card avoided"""
+        # Without reuse each of the calls would have prefilled the header itself
+        saved = primed['seconds'] * max(0, calls - 1)
+        with self._task_lock:
+            self.prefill_saved_seconds += saved
+        logger.info(f"♻️  {card_name}: header prefilled once ({primed['tokens']} tokens, "
+                    f"{primed['seconds'] * 1000:.0f}ms) for {calls} calls, ~{saved * 1000:.0f}ms prefill saved")
+    
+    def _generate_grouped(self, card_data: Dict, components: List[str], options: Dict[str, Any],
+                          context: Optional[List[int]] = None) -> tuple:
+        """Generate each component group in one call, then fill gaps one component at a time
+        
+        Returns the results and the number of generate calls made.
+        """
+        card_name = card_data.get('name', 'Unknown')
+        groups = self._group_components(components)
+        group_futures = [
+            self.generation_pool.submit(self._generate_group, card_data, group, options, context)
+            for group in groups
+        ]
+        generated = {}
+        for future in group_futures:
+            generated.update(future.result())
+        
+        # Components a group response did not yield (bad JSON, missing or short sections).
+        # Submitted from here rather than from _generate_group so a group never waits
+        # on the pool it is running in
+        missing = [component for component in components if component not in generated]
+        if missing:
+            logger.warning(f"⚠️  {len(missing)} component(s) for {card_name} regenerated individually: {', '.join(missing)}")
+            fallback = {
+                component: self.generation_pool.submit(self._generate_component, card_data, component, options, context)
+                for component in missing
+            }
+            generated.update({component: future.result() for component, future in fallback.items()})
+        
+        return {component: generated[component] for component in components}, len(groups) + len(missing)
+    
+    def _group_components(self, components: List[str]) -> List[List[str]]:
+        """Split requested components into COMPONENT_GROUPS, chunking the rest"""
+        requested = set(components)
+        groups = [
+            [component for component in members if component in requested]
+            for members in COMPONENT_GROUPS.values()
+        ]
+        grouped = {component for group in groups for component in group}
+        ungrouped = [component for component in components if component not in grouped]
+        groups.extend(ungrouped[i:i + MAX_GROUP_SIZE] for i in range(0, len(ungrouped), MAX_GROUP_SIZE))
+        return [group for group in groups if group]
+    
+    def _generate_group(self, card_data: Dict, group: List[str], options: Dict[str, Any],
+                        context: Optional[List[int]] = None) -> Dict[str, str]:
+        """Generate several components in one call (runs on the generation pool)
+        
+        Returns only the components that parsed cleanly; the caller regenerates
+        the rest individually.
+        """
+        if len(group) == 1:
+            return {group[0]: self._generate_component(card_data, group[0], options, context)}
+        
+        card_name = card_data.get('name', 'Unknown')
+        try:
+            logger.info(f"🧠 Generating {len(group)} components for {card_name}: {', '.join(group)}")
+            
+            response = ollama.generate(
+                model=self.current_model,
+                prompt=self._create_group_prompt(card_data, group, include_header=not context),
+                context=context,
+                format={
+                    'type': 'object',
+                    'properties': {component: {'type': 'string'} for component in group},
+                    'required': group
+                },
+                # Room for every section, not just one
+                options={**options, 'num_predict': options['num_predict'] * len(group)},
+                keep_alive=self.keep_alive
+            )
+            
+            parsed = self._parse_group_response(response.get('response', ''), group)
+            logger.info(f"✅ Generated {len(parsed)}/{len(group)} components in one call for {card_name}")
+            return parsed
+            
+        except Exception as e:
+            logger.error(f"❌ Grouped analysis failed for {', '.join(group)}: {e}")
+            return {}
+    
+    def _create_group_prompt(self, card_data: Dict, group: List[str], include_header: bool = True) -> str:
+        """One prompt covering several components, answered as a JSON object"""
+        card_name = card_data.get('name', 'Unknown')
+        sections = "\n\n".join(
+            f"### {component}\n{self._component_instructions(card_data, component)}"
+            for component in group
+        )
+        prompt = f"""Write {len(group)} separate analyses of [[{card_name}]], one for each section below.
+Respond with a JSON object with exactly these keys: {', '.join(group)}.
+Each value is the complete analysis for that section as a string (markdown allowed).
+
+{sections}"""
+        return f"{self._card_header(card_data)}\n\n{prompt}" if include_header else prompt
+    
+    @staticmethod
+    def _parse_group_response(text: str, group: List[str]) -> Dict[str, str]:
+        """Pull per-component analyses out of a grouped response
+        
+        Accepts the requested JSON object (also when wrapped in a code fence or
+        surrounded by chatter) and falls back to '### component' style sections.
+        Components without usable text are left out.
+        """
+        def key(name: str) -> str:
+            return re.sub(r'[^a-z]+', '_', name.lower()).strip('_')
+        
+        def as_text(value: Any) -> str:
+            if isinstance(value, list):
+                return "\n".join(f"- {as_text(item)}" for item in value)
+            if isinstance(value, dict):
+                return "\n".join(f"**{k}**: {as_text(v)}" for k, v in value.items())
+            return str(value).strip() if value is not None else ''
+        
+        wanted = {key(component): component for component in group}
+        found = {}
+        
+        data = None
+        candidates = [text.strip()]
+        start, end = text.find('{'), text.rfind('}')
+        if 0 <= start < end:
+            candidates.append(text[start:end + 1])
+        for candidate in candidates:
+            try:
+                data = json.loads(candidate)
+                break
+            except ValueError:
+                continue
+        
+        if isinstance(data, dict):
+            for name, value in data.items():
+                if key(name) in wanted:
+                    found[wanted[key(name)]] = as_text(value)
+        else:
+            # Sectioned text: a heading line naming the component, then its analysis
+            heading = re.compile(r'^\s*(?:#+\s*|\*\*)?([A-Za-z][A-Za-z _-]*?)(?:\*\*)?\s*:?\s*$', re.MULTILINE)
+            matches = [m for m in heading.finditer(text) if key(m.group(1)) in wanted]
+            for match, following in zip(matches, matches[1:] + [None]):
+                body = text[match.end():following.start() if following else len(text)]
+                found[wanted[key(match.group(1))]] = body.strip()
+        
+        # Same minimum as single-component generation
+        return {component: analysis for component, analysis in found.items() if len(analysis) > 10}
+    
+    def _generation_options(self) -> Dict[str, Any]:
+        """Configure generation based on worker type"""
+        if self.worker_type == 'desktop':
+            # Fast, efficient analysis for desktop
+            return {
+                "temperature": 0.7,
+                "num_predict": 250,  # Balanced length
+                "top_p": 0.9,
+                "repeat_penalty": 1.1
+            }
+        elif self.worker_type == 'laptop_lite':
+            # Lightweight analysis for laptop lite
+            return {
+                "temperature": 0.7,
+                "num_predict": 200,  # Shorter responses for efficiency
+                "top_p": 0.9,
+                "repeat_penalty": 1.1
+            }
+        else:
+            # Deep, detailed analysis for laptop
+            return {
+                "temperature": 0.8,
+                "num_predict": 400,  # Longer responses
+                "top_p": 0.95,
+                "repeat_penalty": 1.1
+            }
+    
+    def _generate_component(self, card_data: Dict, component: str, options: Dict[str, Any],
+                            context: Optional[List[int]] = None) -> str:
+        """Generate one component (runs on the generation pool)
+        
+        With a primed context the card header is already in the model's
+        context, so only the component instructions are sent.
+        """
+        card_name = card_data.get('name', 'Unknown')
+        try:
+            logger.info(f"🧠 Generating {component} for {card_name}")
+            
+            if context:
+                prompt = self._component_instructions(card_data, component)
+            else:
+                prompt = self._create_enhanced_prompt(card_data, component)
+            
+            response = ollama.generate(
+                model=self.current_model,
+                prompt=prompt,
+                context=context,
+                options=options,
+                keep_alive=self.keep_alive
+            )
+            
+            analysis_text = response.get('response', '').strip()
+            
+            if analysis_text and len(analysis_text) > 10:  # Validate minimum content
+                logger.info(f"✅ Generated {component} ({len(analysis_text)} chars)")
+                return analysis_text
+            else:
+                logger.warning(f"⚠️  Short/empty response for {component}")
+                return f"Analysis incomplete for {component}"
+            
+        except Exception as e:
+            logger.error(f"❌ Analysis failed for {component}: {e}")
+            return f"Analysis failed: {str(e)}"
+    
     def _create_enhanced_prompt(self, card_data: Dict, component: str) -> str:
         """Create enhanced analysis prompts for all component types"""
+        return f"{self._card_header(card_data)}\n\n{self._component_instructions(card_data, component)}"
+    
+    def _card_header(self, card_data: Dict) -> str:
+        """Card details every prompt for this card starts with"""
         card_name = card_data.get('name', 'Unknown')
         mana_cost = card_data.get('manaCost', card_data.get('mana_cost', 'N/A'))
         type_line = card_data.get('type', card_data.get('type_line', 'N/A'))
@@ -508,13 +1026,16 @@ Type: {type_line}"""
             base_info += f"\nPower/Toughness: {power}/{toughness}"
         
         base_info += f"\nText: {oracle_text}"
+        return base_info
+    
+    def _component_instructions(self, card_data: Dict, component: str) -> str:
+        """Component-specific part of a prompt (follows the card header)"""
+        card_name = card_data.get('name', 'Unknown')
         
         # Enhanced component-specific prompts matching the new swarm manager structure
         component_prompts = {
             # GPU_COMPONENTS (Fast, efficient analysis)
-            'play_tips': f"""{base_info}
-
-Provide practical gameplay tips for [[{card_name}]]:
+            'play_tips': f"""Provide practical gameplay tips for [[{card_name}]]:
 1. Optimal timing and situations for play
 2. Best synergies and combinations  
 3. Key strategic considerations
@@ -522,9 +1043,7 @@ Provide practical gameplay tips for [[{card_name}]]:
 
 Be concise and actionable.""",
 
-            'mulligan_considerations': f"""{base_info}
-
-Analyze mulligan decisions for [[{card_name}]]:
+            'mulligan_considerations': f"""Analyze mulligan decisions for [[{card_name}]]:
 1. When to keep hands with this card
 2. When to mulligan it away
 3. Hand quality evaluation with this card
@@ -532,9 +1051,7 @@ Analyze mulligan decisions for [[{card_name}]]:
 
 Focus on practical decision-making.""",
 
-            'rules_clarifications': f"""{base_info}
-
-Provide rules analysis for [[{card_name}]]:
+            'rules_clarifications': f"""Provide rules analysis for [[{card_name}]]:
 1. Complex rules interactions and timing
 2. Common misconceptions  
 3. Edge cases and rulings
@@ -542,9 +1059,7 @@ Provide rules analysis for [[{card_name}]]:
 
 Be precise and comprehensive.""",
 
-            'combo_suggestions': f"""{base_info}
-
-Analyze combo potential for [[{card_name}]]:
+            'combo_suggestions': f"""Analyze combo potential for [[{card_name}]]:
 1. Direct combo pieces and interactions
 2. Synergistic packages and engines
 3. Win condition setups
@@ -552,9 +1067,7 @@ Analyze combo potential for [[{card_name}]]:
 
 Include specific card recommendations.""",
 
-            'format_analysis': f"""{base_info}
-
-Evaluate [[{card_name}]] across formats:
+            'format_analysis': f"""Evaluate [[{card_name}]] across formats:
 1. Standard viability and applications
 2. Modern/Pioneer positioning
 3. Legacy/Vintage considerations  
@@ -563,9 +1076,7 @@ Evaluate [[{card_name}]] across formats:
 
 Provide format-specific insights.""",
 
-            'synergy_analysis': f"""{base_info}
-
-Analyze synergies for [[{card_name}]]:
+            'synergy_analysis': f"""Analyze synergies for [[{card_name}]]:
 1. Cards that work well with this
 2. Archetype synergies and fit
 3. Anti-synergies to avoid
@@ -573,9 +1084,7 @@ Analyze synergies for [[{card_name}]]:
 
 Include specific card and strategy examples.""",
 
-            'competitive_analysis': f"""{base_info}
-
-Assess competitive viability of [[{card_name}]]:
+            'competitive_analysis': f"""Assess competitive viability of [[{card_name}]]:
 1. Current meta positioning
 2. Tournament results and trends
 3. Competitive advantages/weaknesses
@@ -583,9 +1092,7 @@ Assess competitive viability of [[{card_name}]]:
 
 Be analytical and data-driven.""",
 
-            'tactical_analysis': f"""{base_info}
-
-Provide tactical guidance for [[{card_name}]]:
+            'tactical_analysis': f"""Provide tactical guidance for [[{card_name}]]:
 1. Optimal timing and sequencing
 2. Key interactions and decision points
 3. Play patterns and lines
@@ -594,9 +1101,7 @@ Provide tactical guidance for [[{card_name}]]:
 Focus on in-game tactics.""",
 
             # CPU_HEAVY_COMPONENTS (Deep, detailed analysis)
-            'thematic_analysis': f"""{base_info}
-
-Analyze the thematic elements of [[{card_name}]]:
+            'thematic_analysis': f"""Analyze the thematic elements of [[{card_name}]]:
 1. Lore and story connections
 2. Flavor text significance
 3. Art and design theme coherence
@@ -604,9 +1109,7 @@ Analyze the thematic elements of [[{card_name}]]:
 
 Explore narrative and artistic depth.""",
 
-            'historical_context': f"""{base_info}
-
-Provide historical context for [[{card_name}]]:
+            'historical_context': f"""Provide historical context for [[{card_name}]]:
 1. Design evolution and precedents
 2. Meta impact when released
 3. Power level shifts over time
@@ -614,9 +1117,7 @@ Provide historical context for [[{card_name}]]:
 
 Include design and competitive history.""",
 
-            'art_flavor_analysis': f"""{base_info}
-
-Analyze the artistic and flavor elements of [[{card_name}]]:
+            'art_flavor_analysis': f"""Analyze the artistic and flavor elements of [[{card_name}]]:
 1. Art analysis and visual storytelling
 2. Flavor text analysis and meaning
 3. Creative design and aesthetic
@@ -624,9 +1125,7 @@ Analyze the artistic and flavor elements of [[{card_name}]]:
 
 Focus on creative and artistic elements.""",
 
-            'design_philosophy': f"""{base_info}
-
-Examine the design philosophy of [[{card_name}]]:
+            'design_philosophy': f"""Examine the design philosophy of [[{card_name}]]:
 1. Design goals and intentions
 2. Mechanical innovation and precedent
 3. Balance considerations and constraints
@@ -634,9 +1133,7 @@ Examine the design philosophy of [[{card_name}]]:
 
 Analyze from a design perspective.""",
 
-            'advanced_interactions': f"""{base_info}
-
-Analyze complex interactions for [[{card_name}]]:
+            'advanced_interactions': f"""Analyze complex interactions for [[{card_name}]]:
 1. Complex edge cases and scenarios
 2. Layer system interactions
 3. Timing and priority issues
@@ -644,9 +1141,7 @@ Analyze complex interactions for [[{card_name}]]:
 
 Cover advanced rules complexity.""",
 
-            'meta_positioning': f"""{base_info}
-
-Analyze meta positioning for [[{card_name}]]:
+            'meta_positioning': f"""Analyze meta positioning for [[{card_name}]]:
 1. Role in current metagame
 2. Matchup considerations
 3. Meta shifts that affect it
@@ -655,9 +1150,7 @@ Analyze meta positioning for [[{card_name}]]:
 Focus on competitive metagame analysis.""",
 
             # BALANCED_COMPONENTS (Accessible analysis)
-            'budget_alternatives': f"""{base_info}
-
-Provide budget analysis for [[{card_name}]]:
+            'budget_alternatives': f"""Provide budget analysis for [[{card_name}]]:
 1. Budget-friendly alternatives
 2. Cost-effective substitutions
 3. Budget deck considerations
@@ -665,9 +1158,7 @@ Provide budget analysis for [[{card_name}]]:
 
 Help players with limited budgets.""",
 
-            'deck_archetypes': f"""{base_info}
-
-Analyze deck archetype fit for [[{card_name}]]:
+            'deck_archetypes': f"""Analyze deck archetype fit for [[{card_name}]]:
 1. Primary deck types that want this
 2. Archetype-specific roles
 3. Deck building considerations
@@ -675,9 +1166,7 @@ Analyze deck archetype fit for [[{card_name}]]:
 
 Cover various competitive archetypes.""",
 
-            'new_player_guide': f"""{base_info}
-
-Create new player guidance for [[{card_name}]]:
+            'new_player_guide': f"""Create new player guidance for [[{card_name}]]:
 1. Basic functionality explanation
 2. Good/bad for beginners assessment
 3. Learning opportunities
@@ -685,9 +1174,7 @@ Create new player guidance for [[{card_name}]]:
 
 Make it accessible for new players.""",
 
-            'sideboard_guide': f"""{base_info}
-
-Provide sideboard guidance for [[{card_name}]]:
+            'sideboard_guide': f"""Provide sideboard guidance for [[{card_name}]]:
 1. Sideboard applications and timing
 2. Matchups where it's important
 3. Meta-specific considerations
@@ -695,9 +1182,7 @@ Provide sideboard guidance for [[{card_name}]]:
 
 Focus on competitive sideboarding.""",
 
-            'power_level_assessment': f"""{base_info}
-
-Assess the power level of [[{card_name}]]:
+            'power_level_assessment': f"""Assess the power level of [[{card_name}]]:
 1. Overall power rating and justification
 2. Comparison to similar cards
 3. Power level in different contexts
@@ -705,9 +1190,7 @@ Assess the power level of [[{card_name}]]:
 
 Provide objective power assessment.""",
 
-            'investment_outlook': f"""{base_info}
-
-Analyze investment potential for [[{card_name}]]:
+            'investment_outlook': f"""Analyze investment potential for [[{card_name}]]:
 1. Current market position
 2. Factors affecting value
 3. Long-term outlook
@@ -721,9 +1204,7 @@ Focus on financial and collectible aspects."""
             return component_prompts[component]
         else:
             # Default prompt for any unspecified components
-            return f"""{base_info}
-
-Analyze [[{card_name}]] for {component.replace('_', ' ')}.
+            return f"""Analyze [[{card_name}]] for {component.replace('_', ' ')}.
 Provide detailed insights and practical recommendations.
 Be thorough and specific in your analysis."""
     
@@ -744,98 +1225,116 @@ Be thorough and specific in your analysis."""
             return
         
         self.running = True
-        consecutive_empty_polls = 0
         last_heartbeat = time.time()
-        cleanup_counter = 0  # ADD: Counter for cleanup
+        last_latency_report = time.time()
+        last_cleanup = time.time()
+        in_flight = set()  # Futures of tasks running on the task pool
         
-        # Track task start times for cleanup
-        if not hasattr(self, 'task_start_times'):
-            self.task_start_times = {}
+        # Leasing and submitting happen on their own threads; this loop only
+        # moves buffered cards onto free slots
+        self.prefetcher = threading.Thread(target=self._prefetch_loop, name='prefetch', daemon=True)
+        self.uploader = threading.Thread(target=self._upload_loop, name='upload', daemon=True)
+        self.prefetcher.start()
+        self.uploader.start()
         
         logger.info("✅ Worker started successfully - entering main loop")
         
-        while self.running:
-            try:
-                current_time = time.time()
-                cleanup_counter += 1  # ADD: Increment cleanup counter
-                
-                # Send heartbeat every 30 seconds
-                if current_time - last_heartbeat > 30:
-                    self.send_heartbeat()
-                    last_heartbeat = current_time
-                
-                # ADD: Clean up stale tasks every 10 iterations (prevent capacity deadlock)
-                if cleanup_counter >= 10:
-                    self.cleanup_failed_tasks()
-                    cleanup_counter = 0
-                
-                # Get work only if we have available slots
-                available_slots = self.max_tasks - len(self.active_tasks)
-                
-                if available_slots > 0:
-                    tasks = self.get_work()
+        try:
+            while self.running:
+                try:
+                    current_time = time.time()
+                    
+                    # Send heartbeat every 30 seconds
+                    if current_time - last_heartbeat > 30:
+                        self.send_heartbeat()
+                        last_heartbeat = current_time
+                    
+                    # Swarm API latency per endpoint every 10 minutes
+                    if current_time - last_latency_report > 600:
+                        self.swarm.log_latency_report()
+                        last_latency_report = current_time
+                    
+                    # Clean up stale tasks every 30 seconds (prevent capacity deadlock)
+                    if current_time - last_cleanup > 30:
+                        self.cleanup_failed_tasks()
+                        last_cleanup = current_time
+                    
+                    # Start buffered cards on free slots; up to max_tasks run at once
+                    while len(in_flight) < self.max_tasks:
+                        future = self._start_buffered_task()
+                        if future is None:
+                            break
+                        in_flight.add(future)
                     
-                    if tasks:
-                        consecutive_empty_polls = 0
-                        logger.info(f"📋 Received {len(tasks)} task(s) - Active: {len(self.active_tasks)}")
-                        
-                        # Process tasks
-                        for task in tasks:
-                            if not self.running:
-                                break
-                            
-                            # ADD: Track task start time
-                            task_id = task.get('task_id')
-                            if task_id:
-                                self.task_start_times[task_id] = current_time
-                            
-                            # Process the task
-                            success = self.process_task(task)
-                            if not success:
-                                # ADD: Remove failed task from active queue immediately
-                                if task_id and task_id in self.active_tasks:
-                                    self.active_tasks.remove(task_id)
-                                    if task_id in self.task_start_times:
-                                        del self.task_start_times[task_id]
-                                    logger.warning(f"🧹 Removed failed task {task_id} from active queue immediately")
+                    # Wake when a task finishes and frees a slot, or shortly to check the buffer
+                    if in_flight:
+                        done, in_flight = wait(in_flight, timeout=0.5, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            if future.exception():
+                                logger.error(f"❌ Task thread error: {future.exception()}")
                     else:
-                        consecutive_empty_polls += 1
-                        if consecutive_empty_polls % 20 == 1:  # Log every 20th empty poll
-                            logger.info(f"⏳ No work available - Active: {len(self.active_tasks)}, Completed: {len(self.completed_tasks)}")
-                else:
-                    logger.info(f"🔄 Worker at capacity - Active: {len(self.active_tasks)}/{self.max_tasks}")
-                
-                # Sleep before next poll
-                time.sleep(self.poll_interval)
-                
-            except KeyboardInterrupt:
-                logger.info("🛑 Received interrupt signal")
-                self.running = False
-            except Exception as e:
-                logger.error(f"❌ Worker loop error: {e}")
-                time.sleep(10)  # Wait before retrying
+                        time.sleep(0.5)
+                    
+                except KeyboardInterrupt:
+                    logger.info("🛑 Received interrupt signal")
+                    self.running = False
+                except Exception as e:
+                    logger.error(f"❌ Worker loop error: {e}")
+                    time.sleep(10)  # Wait before retrying
+        finally:
+            self.running = False
+            self._wake_prefetcher.set()
+            # Let cards already being generated finish, then flush their uploads
+            if in_flight:
+                logger.info(f"⏳ Finishing {len(in_flight)} in-flight task(s)...")
+            self.task_pool.shutdown(wait=True, cancel_futures=True)
+            self.generation_pool.shutdown(wait=True)
+            self.upload_queue.put(None)
+            self.uploader.join()
+            self.prefetcher.join(timeout=self.max_poll_interval)
+            # Prefetched cards that never started go straight back to the queue
+            abandoned = []
+            while not self.prefetch_buffer.empty():
+                task_id = self.prefetch_buffer.get_nowait().get('task_id')
+                if task_id:
+                    abandoned.append(task_id)
+            if abandoned:
+                logger.info(f"📦 Releasing {len(abandoned)} prefetched task(s) that were not started")
+                with self._task_lock:
+                    for task_id in abandoned:
+                        self._forget_task(task_id)
+                self.release_tasks(abandoned)
         
         logger.info(f"👋 Worker stopped - Completed {len(self.completed_tasks)} tasks")
+        self.swarm.log_latency_report()
+        self.swarm.close()
+        if self.prefix_reuse:
+            logger.info(f"♻️  Prefix reuse saved ~{self.prefill_saved_seconds:.1f}s of prompt prefill")
     
     def cleanup_failed_tasks(self):
-        """Remove tasks that have been active too long (likely failed submissions)"""
-        if not hasattr(self, 'task_start_times'):
-            self.task_start_times = {}
+        """Remove tasks whose server lease has run out (likely failed submissions)
         
+        Tasks without a known lease deadline are stale 20 minutes after they
+        started; buffered tasks that have not started never are.
+        """
         current_time = time.time()
-        stale_tasks = []
         
-        for task_id in list(self.active_tasks):
-            # If task has been active for more than 20 minutes, consider it stale (submission likely failed)
-            start_time = self.task_start_times.get(task_id, current_time)
-            if current_time - start_time > 1200:  # 20 minutes (reduced from 30)
-                stale_tasks.append(task_id)
+        with self._task_lock:
+            stale_tasks = []
+            for task_id in self.active_tasks:
+                deadline = self.lease_deadlines.get(task_id)
+                if deadline is None:
+                    started = self.task_start_times.get(task_id)
+                    deadline = started + 1200 if started is not None else None
+                if deadline is not None and current_time > deadline:
+                    stale_tasks.append(task_id)
+            for task_id in stale_tasks:
+                self._forget_task(task_id)
         
         for task_id in stale_tasks:
-            self.active_tasks.remove(task_id)
-            if task_id in self.task_start_times:
-                del self.task_start_times[task_id]
             logger.warning(f"🧹 Cleaned up stale task (likely failed submission): {task_id}")
+        # Same effect as the server's expiry sweep, without waiting for it
+        self.release_tasks(stale_tasks)
         
         if stale_tasks:
             logger.info(f"🧹 Cleaned up {len(stale_tasks)} stale tasks - worker no longer at capacity")
@@ -860,8 +1359,11 @@ Worker ID: {worker.worker_id}
 Hardware: {worker.capabilities['cpu_cores']} cores, {worker.capabilities['ram_gb']}GB RAM
 Model: {worker.current_model}
 Server: {worker.server_url}
-Max Tasks: {worker.max_tasks}
-Poll Interval: {worker.poll_interval}s
+Max Tasks: {worker.max_tasks} (+{worker.prefetch_depth} prefetched)
+Parallel Generations: {worker.num_parallel} (OLLAMA_NUM_PARALLEL)
+Generation Mode: {worker.generation_mode} (WORKER_GENERATION_MODE)
+Prefix Reuse: {'✅ ON' if worker.prefix_reuse else 'OFF'} (WORKER_PREFIX_REUSE), keep_alive {worker.keep_alive}
+Poll Interval: {worker.poll_interval}-{worker.max_poll_interval}s (adaptive)
 Specialization: {worker.specialization}
 Enhanced Swarm: ✅ ENABLED
 Components: All 20 analysis components supported